@@ -2,18 +2,26 @@
 COLLIDE AI Platform - Flask Backend
 Web platform for brand consulting with admin controls
 """
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for
+from flask import Flask, Response, render_template, request, jsonify, session, redirect, url_for
 from flask_cors import CORS
 import logging
-import openai
 import os
-import json
 from datetime import datetime
 from functools import wraps
 import secrets
+import threading
+import metrics
+import compression
+import json_backend
+import assets
+import page_cache
 
 app = Flask(__name__)
 app.secret_key = os.getenv('SECRET_KEY', secrets.token_hex(32))
+json_backend.init_app(app)
+metrics.init_app(app)
+compression.init_app(app)
+assets.init_app(app)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='[%(asctime)s] %(levelname)s in %(module)s: %(message)s')
@@ -39,7 +47,7 @@ settings = {
      'model': 'gpt-4',
      'temperature': 0.7,
      'max_tokens': 800,
-     'use_api': False  # Toggle between API and rule-based
+     'use_api': os.getenv('USE_OPENAI_API', '').lower() in ('1', 'true', 'yes')  # Toggle between API and rule-based
 }
 
 # System prompt
@@ -237,24 +245,37 @@ What do you offer that no one else does quite like you?"""
 
 Share more details, and I'll provide targeted strategic advice."""
 
+# One OpenAI client (and HTTP connection pool) per API key; OPENAI_BASE_URL is honoured.
+# openai (and httpx) take ~0.4s to import, so they load with the first API-mode chat.
+_openai_clients = {}
+
+
+def get_openai_client(api_key):
+    client = _openai_clients.get(api_key)
+    if client is None:
+        import openai
+        client = _openai_clients[api_key] = openai.OpenAI(api_key=api_key)
+    return client
+
+
 def get_ai_response(message, conversation_history):
     """Get response from OpenAI API"""
     try:
         if not settings['openai_api_key']:
             return "OpenAI API key not configured. Please contact support."
         
-        openai.api_key = settings['openai_api_key']
-        
         messages = [{"role": "system", "content": SYSTEM_PROMPT}]
         messages.extend(conversation_history)
         messages.append({"role": "user", "content": message})
         
-        response = openai.ChatCompletion.create(
-            model=settings['model'],
-            messages=messages,
-            temperature=settings['temperature'],
-            max_tokens=settings['max_tokens']
-        )
+        with metrics.track('openai', 'chat.completions'):
+            response = get_openai_client(settings['openai_api_key']).chat.completions.create(
+                model=settings['model'],
+                messages=messages,
+                temperature=settings['temperature'],
+                max_tokens=settings['max_tokens']
+            )
+        metrics.record_openai_usage(settings['model'], response.usage)
         
         return response.choices[0].message.content
     except Exception as e:
@@ -266,7 +287,7 @@ def get_ai_response(message, conversation_history):
 @app.route('/')
 def index():
     """Main chat interface"""
-    return render_template('index.html')
+    return page_cache.page_response('index.html')
 
 
 @app.route('/api/chat', methods=['POST'])
@@ -323,11 +344,23 @@ def chat():
 @app.route('/health')
 def health():
     """Simple health check endpoint"""
-    return jsonify({
+    return jsonify(health_status())
+
+
+def health_status():
+    """Body of /health; also served by the Netlify function without Flask dispatch"""
+    return {
         'status': 'ok',
         'mode': 'api' if settings['use_api'] and settings['openai_api_key'] else 'rule-based',
         'model': settings['model']
-    })
+    }
+
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Prometheus scrape endpoint: request latency, dependency timings and OpenAI token usage"""
+    body, content_type = metrics.render()
+    return Response(body, content_type=content_type)
 
 
 # Admin Routes
@@ -419,148 +452,146 @@ def clear_conversations():
 # LEAD GENERATION ROUTES
 # ============================================================================
 
-from lead_gen import LeadGenerator
-import sqlite3
-import uuid
+# lead_gen (provider clients, sources) and quota load with the first route that uses them
+import outbox
+from campaign_store import CampaignStore
+import lead_export
+from outreach_templates import get_templates, text_to_html
+from jobs import FINISHED_STATUSES, init_jobs_db, enqueue_job, get_job, get_job_events
+import scheduler
+import tracing
 import time
-import os as _os
 
-_REDIS_URL = _os.getenv('REDIS_URL')
-if _REDIS_URL:
-    try:
-        import redis as _redis
-        from rq import Queue as _RQQueue
-        from rq.job import Job as _RQJob
-    except Exception:
-        _redis = None
-        _RQQueue = None
-        _RQJob = None
-
-# Jobs DB (simple SQLite queue for background processing)
-DB_PATH = os.path.join(os.path.dirname(__file__), 'jobs.db')
-
-
-def init_jobs_db():
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute('''
-    CREATE TABLE IF NOT EXISTS jobs (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        job_id TEXT UNIQUE,
-        status TEXT,
-        created_at TEXT,
-        updated_at TEXT,
-        payload TEXT,
-        result TEXT
-    )
-    ''')
-    conn.commit()
-    conn.close()
-
-
-def enqueue_job(payload_dict):
-    # If Redis is configured and rq is available, enqueue into RQ
-    if _REDIS_URL and _redis and _RQQueue:
-        redis_conn = _redis.from_url(_REDIS_URL)
-        q = _RQQueue(connection=redis_conn)
-        # Lazy import tasks to avoid circular imports
-        from tasks import process_lead_campaign
-        rq_job = q.enqueue(process_lead_campaign, payload_dict)
-        return rq_job.get_id()
-
-    # Fallback to SQLite queue
-    job_id = str(uuid.uuid4())
-    created = datetime.now().isoformat()
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute('INSERT INTO jobs (job_id, status, created_at, updated_at, payload) VALUES (?,?,?,?,?)',
-              (job_id, 'pending', created, created, json.dumps(payload_dict)))
-    conn.commit()
-    conn.close()
-    return job_id
-
-
-def get_job(job_id):
-    # If Redis + RQ used, fetch job info from RQ
-    if _REDIS_URL and _redis and _RQJob:
-        try:
-            redis_conn = _redis.from_url(_REDIS_URL)
-            rq_job = _RQJob.fetch(job_id, connection=redis_conn)
-            return {
-                'job_id': rq_job.get_id(),
-                'status': rq_job.get_status(),
-                'created_at': None,
-                'updated_at': None,
-                'payload': None,
-                'result': rq_job.result
-            }
-        except Exception:
-            # fall back to sqlite lookup
-            pass
-
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute('SELECT job_id, status, created_at, updated_at, payload, result FROM jobs WHERE job_id = ?', (job_id,))
-    row = c.fetchone()
-    conn.close()
-    if not row:
-        return None
-    return {
-        'job_id': row[0],
-        'status': row[1],
-        'created_at': row[2],
-        'updated_at': row[3],
-        'payload': json.loads(row[4]) if row[4] else None,
-        'result': json.loads(row[5]) if row[5] else None
-    }
+# Seconds the campaign endpoint streams progress before telling the client to poll;
+# kept under the 10s Netlify/Lambda function limit and gunicorn's worker timeout
+CAMPAIGN_STREAM_TIMEOUT = float(os.getenv('CAMPAIGN_STREAM_TIMEOUT', '8'))
+# A worker (scripts/worker.py with JOB_WORKER=1 on the web host, or RQ workers with REDIS_URL)
+# runs queued campaigns; without one a progress stream could only end in a timeout
+JOB_WORKER = os.getenv('JOB_WORKER', '0') == '1' or bool(os.getenv('REDIS_URL'))
+CAMPAIGN_POLL_INTERVAL = 0.5
+
+# Endpoints that never touch jobs.db, so a cold start serving them skips database setup
+NO_DATABASE_ENDPOINTS = {'health', 'metrics_endpoint', 'static', 'index', 'lead_gen_page', 'chat', 'assess_batch',
+                         'assessment_chart'}
+
+_databases_ready = False
+_databases_lock = threading.Lock()
 
 
-# Initialize the jobs DB at import time
-init_jobs_db()
+def init_databases():
+    """Create the jobs DB tables (jobs, outreach outbox, campaign schedules) once per process"""
+    global _databases_ready
+    if _databases_ready:
+        return
+    with _databases_lock:
+        if not _databases_ready:
+            init_jobs_db()
+            outbox.init_outbox()
+            scheduler.init_schedules()
+            _databases_ready = True
+
+
+@app.before_request
+def init_databases_on_first_use():
+    if request.endpoint not in NO_DATABASE_ENDPOINTS:
+        init_databases()
 
 @app.route('/lead-gen')
 def lead_gen_page():
     """Lead generation dashboard page"""
-    return render_template('lead_gen.html')
+    return page_cache.page_response('lead_gen.html')
+
+def _campaign_summary(results, max_leads):
+    """Final campaign response: counts plus the qualified leads read back from the store"""
+    qualified_leads = CampaignStore().query_leads(
+        campaign_id=results['campaign_id'], qualified=True, limit=max(max_leads, 1)
+    )
+    
+    return {
+        'success': True,
+        'campaign_id': results.get('campaign_id', 'unknown'),
+        'total_found': results.get('total_found', 0),
+        'skipped_known': results.get('skipped_known', 0),
+        'qualified': len(qualified_leads),
+        'outreach_sent': results.get('outreach_sent', 0),
+        'top_leads': qualified_leads[:10],
+        'all_leads': qualified_leads,
+        'timestamp': datetime.now().isoformat()
+    }
+
+
+def _campaign_events(job_id, max_leads, poll_url, timeout):
+    """Yield (event, data) for a queued campaign until it finishes or `timeout` passes"""
+    yield 'queued', {'job_id': job_id, 'poll_url': poll_url}
+    
+    deadline = time.monotonic() + timeout
+    last_event = 0
+    while True:
+        job = get_job(job_id)
+        for event in get_job_events(job_id, after=last_event):
+            last_event = event['id']
+            yield event['event'], event['data']
+        
+        status = job['status'] if job else None
+        if status in ('done', 'finished'):
+            yield 'result', _campaign_summary(job['result'], max_leads)
+            return
+        if status in FINISHED_STATUSES:
+            result = job.get('result')
+            error = result.get('error') if isinstance(result, dict) else None
+            yield 'error', {'success': False, 'job_id': job_id, 'error': error or f'Job {status}'}
+            return
+        if time.monotonic() >= deadline:
+            yield 'timeout', {'job_id': job_id, 'status': status, 'poll_url': poll_url}
+            return
+        time.sleep(CAMPAIGN_POLL_INTERVAL)
+
 
 @app.route('/api/lead-gen/campaign', methods=['POST'])
 def run_lead_campaign():
-    """Run a lead generation campaign"""
+    """
+    Queue a lead generation campaign and stream its progress.
+    Responds with NDJSON ({"event", "data"} per line), or SSE when the client
+    accepts text/event-stream. Events: queued, search, qualified, lead (one per
+    qualified lead), outreach, then result or error. If the campaign is still
+    running after CAMPAIGN_STREAM_TIMEOUT seconds a final timeout event tells
+    the client to poll /api/lead-gen/job/<job_id>.
+    When the response cannot stream (the Lambda adapter buffers whole bodies)
+    or no worker is configured, it answers 202 with job_id and poll_url at once.
+    """
     try:
         data = request.get_json() or {}
+        if not isinstance(data, dict):
+            return jsonify({'success': False, 'error': 'Invalid payload'}), 400
         
-        instagram_hashtags = data.get('instagram_hashtags', [])
-        linkedin_keywords = data.get('linkedin_keywords', [])
         max_leads = int(data.get('max_leads', 50))
-        auto_outreach = data.get('auto_outreach', False)
-        
-        generator = LeadGenerator()
-        
-        logger.info(f"Starting lead campaign: {len(instagram_hashtags)} hashtags, {len(linkedin_keywords)} keywords")
-        
-        results = generator.run_lead_generation_campaign(
-            instagram_hashtags=instagram_hashtags,
-            linkedin_keywords=linkedin_keywords,
-            max_leads=max_leads,
-            auto_outreach=auto_outreach
-        )
-        
-        qualified_leads = [lead for lead in results.get('leads', []) if lead.get('qualified', False)]
-        
-        return jsonify({
-            'success': True,
-            'campaign_id': results.get('campaign_id', 'unknown'),
-            'total_found': results.get('total_found', 0),
-            'qualified': len(qualified_leads),
-            'outreach_sent': results.get('outreach_sent', 0),
-            'top_leads': qualified_leads[:10],
-            'all_leads': qualified_leads,
-            'timestamp': datetime.now().isoformat()
-        })
-        
+        logger.info(f"Queueing lead campaign: {len(data.get('instagram_hashtags', []))} hashtags, "
+                    f"{len(data.get('linkedin_keywords', []))} keywords")
+        job_id = enqueue_job(data)
     except Exception as e:
         logger.error(f"Error in lead campaign: {str(e)}", exc_info=True)
         return jsonify({'success': False, 'error': str(e)}), 500
+    
+    poll_url = url_for('get_job_status', job_id=job_id)
+    if not JOB_WORKER or request.environ.get('lambda_adapter.buffered'):
+        response = jsonify({'success': True, 'job_id': job_id, 'poll_url': poll_url})
+        response.headers['Location'] = poll_url
+        return response, 202
+    
+    events = _campaign_events(job_id, max_leads, poll_url, CAMPAIGN_STREAM_TIMEOUT)
+    
+    if request.accept_mimetypes.best_match(['application/x-ndjson', 'text/event-stream']) == 'text/event-stream':
+        body = (f"event: {event}\ndata: {json_backend.dumps(payload)}\n\n" for event, payload in events)
+        mimetype = 'text/event-stream'
+    else:
+        body = (json_backend.dumps({'event': event, 'data': payload}) + '\n' for event, payload in events)
+        mimetype = 'application/x-ndjson'
+    
+    return Response(body, mimetype=mimetype, headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',
+        'X-Job-Id': job_id
+    })
 
 
 @app.route('/api/lead-gen/queue', methods=['POST'])
@@ -581,14 +612,118 @@ def queue_lead_campaign():
 
 @app.route('/api/lead-gen/job/<job_id>')
 def get_job_status(job_id):
+    """Job status, result and stage trace; `events` holds progress after ?after=<event id>"""
     job = get_job(job_id)
     if not job:
         return jsonify({'error': 'Job not found'}), 404
+    job['events'] = get_job_events(job_id, after=request.args.get('after', 0, type=int))
+    if job.get('trace'):
+        job['stages'] = tracing.stage_totals(job['trace'])
     return jsonify(job)
 
+@app.route('/api/lead-gen/schedules', methods=['GET', 'POST'])
+def lead_gen_schedules():
+    """List recurring campaigns, or create/replace one from {name, cron, payload, jitter_seconds}"""
+    if request.method == 'GET':
+        return jsonify({'schedules': scheduler.list_schedules()})
+
+    data = request.get_json(silent=True) or {}
+    if not data.get('name') or not data.get('cron'):
+        return jsonify({'success': False, 'error': 'name and cron are required'}), 400
+    if not isinstance(data.get('payload', {}), dict):
+        return jsonify({'success': False, 'error': 'payload must be an object'}), 400
+
+    try:
+        schedule = scheduler.add_schedule(
+            data['name'],
+            data['cron'],
+            data.get('payload', {}),
+            jitter_seconds=int(data.get('jitter_seconds', scheduler.DEFAULT_JITTER_SECONDS)),
+            enabled=bool(data.get('enabled', True))
+        )
+    except scheduler.CronError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return jsonify({'success': True, 'schedule': schedule}), 201
+
+
+@app.route('/api/lead-gen/schedules/<name>', methods=['DELETE'])
+def delete_lead_gen_schedule(name):
+    if not scheduler.delete_schedule(name):
+        return jsonify({'error': 'Schedule not found'}), 404
+    return jsonify({'success': True})
+
+
+@app.route('/api/lead-gen/quota')
+def provider_quota():
+    """API usage and remaining budget per provider for the current billing window"""
+    from quota import get_quota_manager
+    return jsonify({'providers': get_quota_manager().all_usage()})
+
+
+@app.route('/api/lead-gen/campaigns')
+@admin_required
+def list_campaigns():
+    """Recent campaigns from the campaign store"""
+    limit = min(request.args.get('limit', 50, type=int), 500)
+    offset = request.args.get('offset', 0, type=int)
+    return jsonify({'campaigns': CampaignStore().list_campaigns(limit=limit, offset=offset)})
+
+
+@app.route('/api/lead-gen/campaigns/<campaign_id>')
+@admin_required
+def get_campaign(campaign_id):
+    campaign = CampaignStore().get_campaign(campaign_id)
+    if not campaign:
+        return jsonify({'error': 'Campaign not found'}), 404
+    return jsonify(campaign)
+
+
+@app.route('/api/lead-gen/leads')
+@admin_required
+def query_leads():
+    """Query stored leads across campaigns by campaign_id, domain, email or min_score"""
+    qualified = request.args.get('qualified')
+    leads = CampaignStore().query_leads(
+        campaign_id=request.args.get('campaign_id'),
+        domain=request.args.get('domain'),
+        email=request.args.get('email'),
+        min_score=request.args.get('min_score', type=int),
+        qualified=None if qualified is None else qualified.lower() in ('1', 'true', 'yes'),
+        limit=min(request.args.get('limit', 100, type=int), 1000),
+        offset=request.args.get('offset', 0, type=int)
+    )
+    return jsonify({'leads': leads, 'count': len(leads)})
+
+
+@app.route('/api/lead-gen/export')
+@admin_required
+def export_leads():
+    """Stream stored leads as CSV, gzipped CSV or Parquet (?format=csv|csv.gz|parquet)"""
+    fmt = request.args.get('format', 'csv')
+    if fmt not in lead_export.FORMATS:
+        return jsonify({'error': f"format must be one of {', '.join(lead_export.FORMATS)}"}), 400
+    if fmt == 'parquet' and not lead_export.parquet_available():
+        return jsonify({'error': 'Parquet export requires pyarrow'}), 501
+    
+    qualified = request.args.get('qualified')
+    leads = CampaignStore().iter_leads(
+        campaign_id=request.args.get('campaign_id'),
+        domain=request.args.get('domain'),
+        min_score=request.args.get('min_score', type=int),
+        qualified=None if qualified is None else qualified.lower() in ('1', 'true', 'yes')
+    )
+    
+    filename = lead_export.export_filename(request.args.get('campaign_id'), fmt)
+    return Response(
+        lead_export.iter_export(leads, fmt),
+        mimetype=lead_export.FORMATS[fmt][0],
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
+
+
 @app.route('/api/lead-gen/outreach', methods=['POST'])
 def send_outreach():
-    """Send outreach to a specific lead"""
+    """Queue outreach to a specific lead; delivery happens in scripts/outbox_worker.py"""
     try:
         data = request.get_json() or {}
         lead = data.get('lead', {})
@@ -596,26 +731,143 @@ def send_outreach():
         if not lead or not lead.get('email'):
             return jsonify({'success': False, 'error': 'Lead email is required'}), 400
         
+        from lead_gen import LeadGenerator
         generator = LeadGenerator()
         
         message = generator.generate_personalized_message(lead)
-        success = generator.send_email(
+        # Retries of one request share its Idempotency-Key; a manual send without one is always new
+        client_key = request.headers.get('Idempotency-Key') or data.get('idempotency_key')
+        if not client_key and not data.get('campaign_id'):
+            client_key = secrets.token_hex(16)
+        queued = outbox.enqueue_message(
             to_email=lead['email'],
             subject=f"Elevate {lead.get('company', 'your brand')}'s strategy",
-            body=message,
-            lead_info=lead
+            body=message['body'],
+            campaign_id=data.get('campaign_id') or 'manual',
+            lead=lead,
+            client_key=client_key
         )
         
-        if success:
-            return jsonify({'success': True, 'message': 'Outreach sent successfully'})
-        else:
-            return jsonify({'success': False, 'error': 'Failed to send email'}), 500
+        return jsonify({
+            'success': True,
+            'message_id': queued['id'],
+            'status': queued['status'],
+            'duplicate': queued['duplicate']
+        }), 202
             
     except Exception as e:
-        logger.error(f"Error sending outreach: {str(e)}", exc_info=True)
+        logger.error(f"Error queueing outreach: {str(e)}", exc_info=True)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+@app.route('/api/lead-gen/outreach/preview', methods=['POST'])
+def preview_outreach():
+    """Render outreach for one lead or a batch of leads without queueing anything"""
+    data = request.get_json(silent=True) or {}
+    leads = data.get('leads') or ([data['lead']] if data.get('lead') else [])
+    channel = data.get('channel', 'email')
+    
+    if not leads:
+        return jsonify({'success': False, 'error': 'lead or leads is required'}), 400
+    if len(leads) > 100:
+        return jsonify({'success': False, 'error': 'Preview is limited to 100 leads'}), 400
+    
+    previews = get_templates().render_batch(leads, channel)
+    if channel == 'email':
+        for preview in previews:
+            preview['html'] = text_to_html(preview['body'])
+    
+    return jsonify({'success': True, 'channel': channel, 'previews': previews})
+
+
+@app.route('/api/lead-gen/outreach/<int:message_id>')
+def get_outreach_status(message_id):
+    """Delivery status of a queued outreach message"""
+    message = outbox.get_message(message_id)
+    if not message:
+        return jsonify({'error': 'Message not found'}), 404
+    return jsonify({
+        'message_id': message['id'],
+        'campaign_id': message['campaign_id'],
+        'to_email': message['to_email'],
+        'status': message['status'],
+        'attempts': message['attempts'],
+        'last_error': message['last_error'],
+        'sent_at': message['sent_at']
+    })
+
+
+# Brand Assessment
+
+# Brands accepted by one /api/collide/assess-batch call
+ASSESS_BATCH_MAX_BRANDS = int(os.getenv('ASSESS_BATCH_MAX_BRANDS', '50000'))
+
+
+@app.route('/api/collide/assess-batch', methods=['POST'])
+def assess_batch():
+    """
+    Assess a brand portfolio in one call.
+    Accepts a CSV upload (multipart field `file`, or the raw request body) with a
+    header row of checklist columns (the features in collide_core.PILLAR_SPEC) plus an
+    optional brand_name column, or JSON {"brands": [{...}, ...]}. Responds with
+    JSON, or CSV with ?format=csv.
+    """
+    from collide_core import COLLIDEAdvisor, read_portfolio_csv, write_assessments_csv
+    
+    if request.is_json:
+        brands = (request.get_json(silent=True) or {}).get('brands')
+        if not isinstance(brands, list) or not all(isinstance(b, dict) for b in brands):
+            return jsonify({'error': 'brands must be a list of objects'}), 400
+    else:
+        upload = request.files.get('file')
+        raw = upload.read() if upload else request.get_data()
+        try:
+            brands = read_portfolio_csv(raw.decode('utf-8-sig'))
+        except (UnicodeDecodeError, ValueError) as e:
+            return jsonify({'error': f'Invalid CSV: {e}'}), 400
+    
+    if not brands:
+        return jsonify({'error': 'No brands to assess'}), 400
+    if len(brands) > ASSESS_BATCH_MAX_BRANDS:
+        return jsonify({'error': f'At most {ASSESS_BATCH_MAX_BRANDS} brands per request'}), 413
+    
+    try:
+        results = COLLIDEAdvisor().assess_many(brands)
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': f'Checklist values must be numbers or booleans: {e}'}), 400
+    
+    if request.args.get('format') == 'csv':
+        return Response(write_assessments_csv(brands, results), mimetype='text/csv',
+                        headers={'Content-Disposition': 'attachment; filename="collide_assessments.csv"'})
+    for brand, result in zip(brands, results):
+        result['brand_name'] = brand.get('brand_name')
+    return jsonify({'count': len(results), 'results': results})
+
+
+@app.route('/api/collide/chart.<fmt>')
+def assessment_chart(fmt):
+    """
+    Radar chart of one assessment's pillar scores, passed as query parameters
+    named after the pillar keys (missing pillars count as 0). chart.svg is a
+    static image, chart.json the Plotly figure spec. Charts are cached per
+    process by a hash of the scores, which is also their ETag.
+    """
+    import visualization
+    
+    if fmt not in visualization.FORMATS:
+        return jsonify({'error': f'Unknown chart format: {fmt}'}), 404
+    try:
+        chart = visualization.render(request.args.to_dict(), fmt)
+    except ValueError:
+        return jsonify({'error': 'Pillar scores must be numbers'}), 400
+    
+    response = Response(chart.body, mimetype=chart.mimetype)
+    response.set_etag(chart.etag)
+    # The URL fixes the scores, so the chart only changes with a new deploy
+    response.headers['Cache-Control'] = 'public, max-age=86400'
+    return response.make_conditional(request)
+
+
 
 if __name__ == '__main__':
     # Create templates directory if it doesn't exist
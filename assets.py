@@ -0,0 +1,114 @@
+"""
+COLLIDE AI - Static Assets
+Fingerprinted asset URLs for the Jinja templates.
+
+scripts/build_assets.py minifies static/ into public/static under
+content-hashed names (style.3f2a9c1d0e.css) and writes
+public/static/manifest.json mapping each source name to its built name.
+Templates call `asset_url('style.css')`, which returns the fingerprinted URL
+when the manifest lists the file and the plain /static/style.css URL otherwise
+(for example before the first build). Because a fingerprinted name changes
+whenever its content does, those files are served with a year-long immutable
+Cache-Control, and from their precompressed .br/.gz siblings when the client
+accepts them.
+"""
+
+import os
+import json
+import mimetypes
+import threading
+from typing import Dict, Tuple
+
+from flask import request, send_from_directory, url_for
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+BUILD_DIR = os.getenv('ASSET_BUILD_DIR') or os.path.join(ROOT, 'public', 'static')
+MANIFEST_NAME = 'manifest.json'
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+# Preferred first; scripts/build_assets.py writes these next to each built file
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+_manifest = None
+_built = frozenset()
+_precompressed: Dict[str, Tuple[str, ...]] = {}
+_lock = threading.Lock()
+
+
+def load_manifest(build_dir: str = None) -> Dict[str, str]:
+    """{source name: fingerprinted name} from the build directory, or {} when it has not been built"""
+    path = os.path.join(build_dir or BUILD_DIR, MANIFEST_NAME)
+    try:
+        with open(path) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return manifest if isinstance(manifest, dict) else {}
+
+
+def manifest() -> Dict[str, str]:
+    """The manifest, read once per process"""
+    global _manifest, _built
+    if _manifest is None:
+        with _lock:
+            if _manifest is None:
+                loaded = load_manifest()
+                _built = frozenset(loaded.values())
+                _manifest = loaded
+    return _manifest
+
+
+def reload():
+    """Forget the cached manifest (after a rebuild, or in tests)"""
+    global _manifest, _built
+    with _lock:
+        _manifest = None
+        _built = frozenset()
+        _precompressed.clear()
+
+
+def is_fingerprinted(filename: str) -> bool:
+    manifest()
+    return filename in _built
+
+
+def asset_url(filename: str) -> str:
+    """URL for a static/ file, fingerprinted when the asset build has produced it"""
+    return url_for('static', filename=manifest().get(filename, filename))
+
+
+def _encodings(filename: str) -> Tuple[str, ...]:
+    """Content encodings with a precompressed sibling of a built file"""
+    found = _precompressed.get(filename)
+    if found is None:
+        found = _precompressed[filename] = tuple(
+            encoding for encoding, suffix in ENCODINGS if os.path.isfile(os.path.join(BUILD_DIR, filename + suffix)))
+    return found
+
+
+def send_fingerprinted(filename: str):
+    """A built file with immutable caching, precompressed when the client accepts it"""
+    available = _encodings(filename)
+    encoding = next((e for e in available if request.accept_encodings[e] > 0), None)
+    suffix = dict(ENCODINGS)[encoding] if encoding else ''
+    response = send_from_directory(BUILD_DIR, filename + suffix,
+                                   mimetype=mimetypes.guess_type(filename)[0] or 'application/octet-stream')
+    response.headers['Cache-Control'] = IMMUTABLE
+    if available:
+        response.vary.add('Accept-Encoding')
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def init_app(app):
+    """Expose asset_url() to templates and serve fingerprinted files from the build directory"""
+    app.jinja_env.globals['asset_url'] = asset_url
+    serve_source = app.view_functions['static']
+
+    def static(filename):
+        if is_fingerprinted(filename):
+            return send_fingerprinted(filename)
+        return serve_source(filename=filename)
+
+    app.view_functions['static'] = static
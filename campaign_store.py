@@ -0,0 +1,365 @@
+"""Campaign and lead store (SQLite).
+
+Replaces the timestamped leads_campaign_*.json files: every campaign run is
+saved here with its leads, indexed by campaign, domain, score, email and a
+normalized lead key so "have we seen this lead before" is an index lookup.
+Incremental campaigns also record every lead they see and per-source
+high-water marks here.
+
+Usage:
+    python campaign_store.py import leads_campaign_20251017_122541.json
+    python campaign_store.py export <campaign_id> out.json
+"""
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import json_backend
+import metrics
+
+DB_PATH = os.getenv('CAMPAIGN_DB_PATH') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'campaigns.db')
+
+# Database files whose tables this process has already created
+_ready_paths = set()
+_ready_lock = threading.Lock()
+
+
+def normalize_domain(url_or_email: str) -> str:
+    """'https://www.Brand.com/about' or 'hi@brand.com' -> 'brand.com'."""
+    value = (url_or_email or '').strip().lower()
+    if '@' in value and '/' not in value:
+        value = value.split('@', 1)[1]
+    value = value.replace('http://', '').replace('https://', '')
+    if value.startswith('www.'):
+        value = value[4:]
+    return value.split('/')[0]
+
+
+def lead_domain(lead: Dict) -> str:
+    return normalize_domain(lead.get('website') or lead.get('email') or '')
+
+
+def lead_key(lead: Dict) -> str:
+    """
+    Stable identity for a lead across campaigns: its profile URL when known,
+    otherwise its email, otherwise platform + name.
+    """
+    profile = (lead.get('profile_url') or '').strip().lower()
+    if profile:
+        return 'profile:' + profile.replace('https://', '').replace('http://', '').replace('www.', '').rstrip('/')
+    email = (lead.get('email') or '').strip().lower()
+    if email:
+        return 'email:' + email
+    name = (lead.get('username') or lead.get('name') or '').strip().lower()
+    return f"{lead.get('platform', 'unknown')}:{name}"
+
+
+class CampaignStore:
+    """SQLite-backed store for campaigns and their leads."""
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or DB_PATH
+        # Stores are cheap to build per request; the schema is created once per database file
+        if self.db_path not in _ready_paths:
+            with _ready_lock:
+                if self.db_path not in _ready_paths:
+                    self._init_db()
+                    _ready_paths.add(self.db_path)
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path)
+
+    def _init_db(self):
+        conn = self._connect()
+        # WAL is a property of the database file, so setting it once covers every later connection
+        conn.execute('PRAGMA journal_mode=WAL')
+        c = conn.cursor()
+        c.execute('''
+        CREATE TABLE IF NOT EXISTS campaigns (
+            campaign_id TEXT PRIMARY KEY,
+            created_at TEXT,
+            total_found INTEGER,
+            qualified INTEGER,
+            outreach_sent INTEGER,
+            params TEXT,
+            outreach_log TEXT
+        )
+        ''')
+        c.execute('''
+        CREATE TABLE IF NOT EXISTS leads (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            campaign_id TEXT,
+            lead_key TEXT,
+            name TEXT,
+            email TEXT,
+            domain TEXT,
+            platform TEXT,
+            industry TEXT,
+            score INTEGER,
+            qualified INTEGER,
+            data TEXT,
+            created_at TEXT
+        )
+        ''')
+        c.execute('CREATE INDEX IF NOT EXISTS idx_leads_campaign ON leads (campaign_id)')
+        c.execute('CREATE INDEX IF NOT EXISTS idx_leads_domain ON leads (domain)')
+        c.execute('CREATE INDEX IF NOT EXISTS idx_leads_score ON leads (score)')
+        c.execute('CREATE INDEX IF NOT EXISTS idx_leads_email ON leads (email)')
+        c.execute('CREATE INDEX IF NOT EXISTS idx_leads_key ON leads (lead_key)')
+        # Every lead ever found (qualified or not), for incremental campaigns
+        c.execute('''
+        CREATE TABLE IF NOT EXISTS seen_leads (
+            lead_key TEXT PRIMARY KEY,
+            first_seen TEXT,
+            last_seen TEXT
+        )
+        ''')
+        # Per-source high-water marks (newest post timestamp seen per hashtag/keyword)
+        c.execute('''
+        CREATE TABLE IF NOT EXISTS source_marks (
+            source TEXT,
+            query TEXT,
+            mark REAL,
+            updated_at TEXT,
+            PRIMARY KEY (source, query)
+        )
+        ''')
+        conn.commit()
+        conn.close()
+
+    @metrics.timed('sqlite')
+    def save_campaign(self, campaign_id: str, leads: List[Dict], outreach_log: Optional[List[Dict]] = None,
+                      total_found: Optional[int] = None, params: Optional[Dict] = None) -> str:
+        """Insert (or replace) a campaign and bulk-insert its leads."""
+        now = datetime.now().isoformat()
+        outreach_log = outreach_log or []
+
+        conn = self._connect()
+        c = conn.cursor()
+        c.execute('DELETE FROM leads WHERE campaign_id = ?', (campaign_id,))
+        c.execute(
+            'INSERT OR REPLACE INTO campaigns (campaign_id, created_at, total_found, qualified, outreach_sent, '
+            'params, outreach_log) VALUES (?,?,?,?,?,?,?)',
+            (campaign_id, now, total_found if total_found is not None else len(leads),
+             sum(1 for lead in leads if lead.get('qualified')), len(outreach_log),
+             json_backend.dumps(params or {}), json_backend.dumps(outreach_log))
+        )
+        c.executemany(
+            'INSERT INTO leads (campaign_id, lead_key, name, email, domain, platform, industry, score, qualified, '
+            'data, created_at) VALUES (?,?,?,?,?,?,?,?,?,?,?)',
+            [(campaign_id, lead_key(lead), lead.get('name'), (lead.get('email') or '').lower() or None,
+              lead_domain(lead) or None, lead.get('platform'), lead.get('industry'),
+              lead.get('qualification_score'), int(bool(lead.get('qualified'))), json_backend.dumps(lead), now)
+             for lead in leads]
+        )
+        self._mark_seen(c, [lead_key(lead) for lead in leads], now)
+        conn.commit()
+        conn.close()
+        return campaign_id
+
+    @staticmethod
+    def _mark_seen(c, keys: Iterable[str], now: str):
+        c.executemany(
+            'INSERT INTO seen_leads (lead_key, first_seen, last_seen) VALUES (?,?,?) '
+            'ON CONFLICT(lead_key) DO UPDATE SET last_seen = excluded.last_seen',
+            [(key, now, now) for key in set(keys)]
+        )
+
+    @metrics.timed('sqlite')
+    def mark_seen(self, keys: Iterable[str]):
+        """Record lead keys as seen, whether or not they were qualified."""
+        conn = self._connect()
+        self._mark_seen(conn.cursor(), keys, datetime.now().isoformat())
+        conn.commit()
+        conn.close()
+
+    @metrics.timed('sqlite')
+    def get_campaign(self, campaign_id: str, include_leads: bool = True) -> Optional[Dict]:
+        conn = self._connect()
+        c = conn.cursor()
+        c.execute('SELECT campaign_id, created_at, total_found, qualified, outreach_sent, params, outreach_log '
+                  'FROM campaigns WHERE campaign_id = ?', (campaign_id,))
+        row = c.fetchone()
+        conn.close()
+        if not row:
+            return None
+
+        campaign = {
+            'campaign_id': row[0],
+            'created_at': row[1],
+            'total_found': row[2],
+            'qualified': row[3],
+            'outreach_sent': row[4],
+            'params': json_backend.loads(row[5]) if row[5] else {},
+            'outreach_log': json_backend.loads(row[6]) if row[6] else [],
+        }
+        if include_leads:
+            campaign['leads'] = list(self.iter_leads(campaign_id=campaign_id))
+        return campaign
+
+    @metrics.timed('sqlite')
+    def list_campaigns(self, limit: int = 50, offset: int = 0) -> List[Dict]:
+        conn = self._connect()
+        c = conn.cursor()
+        c.execute('SELECT campaign_id, created_at, total_found, qualified, outreach_sent FROM campaigns '
+                  'ORDER BY created_at DESC LIMIT ? OFFSET ?', (limit, offset))
+        rows = c.fetchall()
+        conn.close()
+        return [dict(zip(('campaign_id', 'created_at', 'total_found', 'qualified', 'outreach_sent'), row))
+                for row in rows]
+
+    @staticmethod
+    def _where(campaign_id=None, domain=None, email=None, min_score=None, qualified=None):
+        clauses, params = [], []
+        if campaign_id is not None:
+            clauses.append('campaign_id = ?')
+            params.append(campaign_id)
+        if domain:
+            clauses.append('domain = ?')
+            params.append(normalize_domain(domain))
+        if email:
+            clauses.append('email = ?')
+            params.append(email.strip().lower())
+        if min_score is not None:
+            clauses.append('score >= ?')
+            params.append(min_score)
+        if qualified is not None:
+            clauses.append('qualified = ?')
+            params.append(int(bool(qualified)))
+        return clauses, params
+
+    @metrics.timed('sqlite')
+    def query_leads(self, campaign_id: Optional[str] = None, domain: Optional[str] = None,
+                    email: Optional[str] = None, min_score: Optional[int] = None,
+                    qualified: Optional[bool] = None, limit: int = 100, offset: int = 0) -> List[Dict]:
+        """Filtered leads, highest score first."""
+        clauses, params = self._where(campaign_id, domain, email, min_score, qualified)
+        sql = 'SELECT data FROM leads'
+        if clauses:
+            sql += ' WHERE ' + ' AND '.join(clauses)
+        sql += ' ORDER BY score DESC, id LIMIT ? OFFSET ?'
+
+        conn = self._connect()
+        c = conn.cursor()
+        c.execute(sql, params + [limit, offset])
+        rows = c.fetchall()
+        conn.close()
+        return [json_backend.loads(row[0]) for row in rows]
+
+    def iter_leads(self, campaign_id: Optional[str] = None, domain: Optional[str] = None,
+                   email: Optional[str] = None, min_score: Optional[int] = None,
+                   qualified: Optional[bool] = None, chunk_size: int = 1000) -> Iterator[Dict]:
+        """
+        Stream matching leads in insertion order, `chunk_size` rows per query,
+        so large exports never hold every lead in memory.
+        """
+        clauses, params = self._where(campaign_id, domain, email, min_score, qualified)
+        last_id = 0
+        conn = self._connect()
+        try:
+            while True:
+                sql = 'SELECT id, data FROM leads WHERE ' + ' AND '.join(clauses + ['id > ?'])
+                c = conn.cursor()
+                c.execute(sql + ' ORDER BY id LIMIT ?', params + [last_id, chunk_size])
+                rows = c.fetchall()
+                if not rows:
+                    return
+                for row in rows:
+                    yield json_backend.loads(row[1])
+                last_id = rows[-1][0]
+        finally:
+            conn.close()
+
+    @metrics.timed('sqlite')
+    def known_lead_keys(self, keys: Iterable[str]) -> set:
+        """Subset of `keys` already seen by any campaign."""
+        keys = list(set(keys))
+        known = set()
+        conn = self._connect()
+        c = conn.cursor()
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            c.execute(f"SELECT lead_key FROM seen_leads WHERE lead_key IN ({','.join('?' * len(chunk))})", chunk)
+            known.update(row[0] for row in c.fetchall())
+        conn.close()
+        return known
+
+    def seen_lead(self, lead: Dict) -> bool:
+        """True if this lead was stored by any earlier campaign."""
+        return bool(self.known_lead_keys([lead_key(lead)]))
+
+    def get_marks(self, source: str) -> Dict[str, float]:
+        """High-water marks for a source, keyed by query (hashtag/keyword)."""
+        conn = self._connect()
+        c = conn.cursor()
+        c.execute('SELECT query, mark FROM source_marks WHERE source = ?', (source,))
+        marks = dict(c.fetchall())
+        conn.close()
+        return marks
+
+    def set_marks(self, source: str, marks: Dict[str, float]):
+        """Advance high-water marks; a mark never moves backwards."""
+        now = datetime.now().isoformat()
+        conn = self._connect()
+        c = conn.cursor()
+        c.executemany(
+            'INSERT INTO source_marks (source, query, mark, updated_at) VALUES (?,?,?,?) '
+            'ON CONFLICT(source, query) DO UPDATE SET mark = MAX(mark, excluded.mark), updated_at = excluded.updated_at',
+            [(source, query, mark, now) for query, mark in marks.items()]
+        )
+        conn.commit()
+        conn.close()
+
+    def export_campaign(self, campaign_id: str, path: str) -> str:
+        """Write a campaign in the legacy leads_campaign_*.json format."""
+        campaign = self.get_campaign(campaign_id)
+        if campaign is None:
+            raise KeyError(campaign_id)
+        results = {
+            'campaign_id': campaign_id,
+            'campaign_date': campaign['created_at'],
+            'total_qualified_leads': campaign['qualified'],
+            'leads': campaign['leads'],
+            'outreach_log': campaign['outreach_log']
+        }
+        with open(path, 'w') as f:
+            json_backend.dump(results, f, indent=True)
+        return path
+
+    def import_campaign_file(self, path: str) -> str:
+        """Load a legacy leads_campaign_*.json file; the file name becomes the campaign id."""
+        with open(path) as f:
+            data = json_backend.load(f)
+        campaign_id = data.get('campaign_id') or os.path.splitext(os.path.basename(path))[0]
+        return self.save_campaign(campaign_id, data.get('leads', []), data.get('outreach_log', []))
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Campaign store maintenance.')
+    sub = parser.add_subparsers(dest='command', required=True)
+    imp = sub.add_parser('import', help='Import legacy leads_campaign_*.json files')
+    imp.add_argument('files', nargs='+')
+    exp = sub.add_parser('export', help='Export a campaign as JSON')
+    exp.add_argument('campaign_id')
+    exp.add_argument('path')
+    sub.add_parser('list', help='List recent campaigns')
+    args = parser.parse_args()
+
+    store = CampaignStore()
+    if args.command == 'import':
+        for path in args.files:
+            print(f"💾 Imported {path} as {store.import_campaign_file(path)}")
+    elif args.command == 'export':
+        print(f"📤 Exported to {store.export_campaign(args.campaign_id, args.path)}")
+    else:
+        for campaign in store.list_campaigns():
+            print(f"{campaign['campaign_id']}  {campaign['created_at']}  "
+                  f"{campaign['qualified']}/{campaign['total_found']} qualified")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,99 +1,190 @@
 from __future__ import annotations
-from typing import Any, Dict, List
-try:
-    import plotly.graph_objects as go
-except ImportError:
-    go = None
+import csv
+import io
+import bisect
+import operator
+import itertools
+from typing import Any, Dict, Iterable, List
 
-class COLLIDEAdvisor:
-    def __init__(self):
-        self.brand_pillars = {
-            "Strategic Positioning": ["Market Analysis", "Competitive Landscape", "Brand Differentiation", "Target Audience"],
-            "Visual Identity": ["Brand Aesthetics", "Design Language", "Color Psychology", "Typography"],
-            "Business Metrics": ["Revenue Streams", "Growth Strategy", "Financial Planning", "KPI Tracking"],
-            "Authentic Vision": ["Brand Story", "Core Values", "Mission Alignment", "Purpose-Driven Strategy"],
-        }
+# Brand pillars: checklist flags with the points each is worth, the topics
+# shown for the pillar, and the top/secondary/tertiary recommendation given
+# when it is the weakest, second and third weakest pillar. Pillar order is the
+# order of assessment keys and the tie-break when ranking priorities. A feature
+# may count towards several pillars.
+PILLAR_SPEC = (
+    {
+        "key": "strategic_positioning",
+        "title": "Strategic Positioning",
+        "label": "Strategic Positioning",
+        "topics": ["Market Analysis", "Competitive Landscape", "Brand Differentiation", "Target Audience"],
+        "features": {"market_research_complete": 25, "competitor_analysis_done": 25,
+                     "target_audience_defined": 25, "unique_value_prop_clear": 25},
+        "priorities": ("Refine market positioning and competitive differentiation",
+                       "Conduct comprehensive market research and competitor analysis",
+                       "Build strategic partnerships and market alliances"),
+    },
+    {
+        "key": "visual_identity",
+        "title": "Visual Identity",
+        "label": "Visual Identity",
+        "topics": ["Brand Aesthetics", "Design Language", "Color Psychology", "Typography"],
+        "features": {"logo_finalized": 20, "color_palette_defined": 20, "typography_selected": 20,
+                     "brand_guidelines_created": 20, "visual_consistency": 20},
+        "priorities": ("Develop cohesive visual identity and brand guidelines",
+                       "Create consistent brand touchpoints and visual system",
+                       "Develop comprehensive brand style guide"),
+    },
+    {
+        "key": "business_metrics",
+        "title": "Business Metrics",
+        "label": "Business Metrics",
+        "topics": ["Revenue Streams", "Growth Strategy", "Financial Planning", "KPI Tracking"],
+        "features": {"revenue_model_defined": 25, "financial_projections_made": 25,
+                     "kpis_established": 25, "growth_strategy_planned": 25},
+        "priorities": ("Establish clear KPIs and revenue optimization strategies",
+                       "Implement tracking systems and performance dashboards",
+                       "Optimize pricing and revenue model"),
+    },
+    {
+        "key": "authenticity",
+        "title": "Authentic Vision",
+        "label": "Authenticity",
+        "topics": ["Brand Story", "Core Values", "Mission Alignment", "Purpose-Driven Strategy"],
+        "features": {"brand_story_developed": 25, "core_values_defined": 25,
+                     "mission_clear": 25, "purpose_aligned": 25},
+        "priorities": ("Strengthen brand story and authentic value proposition",
+                       "Develop compelling brand narrative and founder story",
+                       "Strengthen community engagement and brand purpose"),
+    },
+)
+
+# Lower bounds of each maturity level above "Early Stage Brand"
+MATURITY_THRESHOLDS = (40, 60, 80)
+MATURITY_LEVELS = ("Early Stage Brand", "Emerging Brand", "Developing Brand", "Evolved Brand")
+
+_TRUE = {"1", "true", "yes", "y", "x", "done"}
+_FALSE = {"", "0", "false", "no", "n"}
+
+
+class ScoringModel:
+    """
+    A compiled PILLAR_SPEC. `weights` is the feature x pillar matrix. A pillar
+    whose features all carry the same weight scores as sum(flags) * weight,
+    other pillars as sum(flag * weight); assess_brand_maturity() and
+    assess_many() add the terms in the same order, so fractional flags give
+    bit-identical scores on both paths.
+    """
 
-    def _calculate_positioning_score(self, d: Dict) -> float:
-        return sum([d.get("market_research_complete", 0), d.get("competitor_analysis_done", 0),
-                    d.get("target_audience_defined", 0), d.get("unique_value_prop_clear", 0)]) * 25
+    def __init__(self, spec=PILLAR_SPEC):
+        if len(spec) < 3:
+            raise ValueError("a scoring spec needs at least three pillars to rank priorities")
+        self.spec = spec
+        self.pillars = tuple(pillar["key"] for pillar in spec)
+        self.features = tuple(dict.fromkeys(feature for pillar in spec for feature in pillar["features"]))
+        self.weights = [[pillar["features"].get(feature, 0) for pillar in spec] for feature in self.features]
+        # Per pillar: its features, their weights, and the shared weight (None when weights differ)
+        self.terms = [(tuple(pillar["features"]), tuple(pillar["features"].values()),
+                       next(iter(pillar["features"].values())) if len(set(pillar["features"].values())) == 1
+                       else None)
+                      for pillar in spec]
+        self._zeros = (0,) * max(len(features) for features, _, _ in self.terms)
+        self._rankings = None
 
-    def _calculate_visual_score(self, d: Dict) -> float:
-        return sum([d.get("logo_finalized", 0), d.get("color_palette_defined", 0),
-                    d.get("typography_selected", 0), d.get("brand_guidelines_created", 0),
-                    d.get("visual_consistency", 0)]) * 20
+    def score(self, brand: Dict) -> List[float]:
+        """Pillar scores for one brand, in pillar order"""
+        get, zeros = brand.get, self._zeros
+        return [sum(map(get, features, zeros)) * weight if weight is not None
+                else sum(map(operator.mul, map(get, features, zeros), weights))
+                for features, weights, weight in self.terms]
 
-    def _calculate_business_score(self, d: Dict) -> float:
-        return sum([d.get("revenue_model_defined", 0), d.get("financial_projections_made", 0),
-                    d.get("kpis_established", 0), d.get("growth_strategy_planned", 0)]) * 25
+    def rankings(self) -> Dict[int, List[str]]:
+        """[top, secondary, tertiary] recommendations keyed by ranking_code() of the three weakest pillars"""
+        if self._rankings is None:
+            self._rankings = {
+                self.ranking_code(ranking): [pillar["priorities"][rank]
+                                             for rank, pillar in enumerate(self.spec[i] for i in ranking)]
+                for ranking in itertools.permutations(range(len(self.pillars)), 3)
+            }
+        return self._rankings
 
-    def _calculate_authenticity_score(self, d: Dict) -> float:
-        return sum([d.get("brand_story_developed", 0), d.get("core_values_defined", 0),
-                    d.get("mission_clear", 0), d.get("purpose_aligned", 0)]) * 25
+    def ranking_code(self, ranking) -> int:
+        n = len(self.pillars)
+        return ranking[0] * n * n + ranking[1] * n + ranking[2]
+
+
+SCORING_MODEL = ScoringModel()
+
+
+class COLLIDEAdvisor:
+    def __init__(self, model: ScoringModel = SCORING_MODEL):
+        self.model = model
+        self.brand_pillars = {pillar["title"]: pillar["topics"] for pillar in model.spec}
 
     def _determine_maturity_level(self, score: float) -> str:
-        return "Evolved Brand" if score >= 80 else "Developing Brand" if score >= 60 else "Emerging Brand" if score >= 40 else "Early Stage Brand"
+        return MATURITY_LEVELS[bisect.bisect_right(MATURITY_THRESHOLDS, score)]
 
     def assess_brand_maturity(self, brand_data: Dict) -> Dict:
-        pos = self._calculate_positioning_score(brand_data)
-        vis = self._calculate_visual_score(brand_data)
-        biz = self._calculate_business_score(brand_data)
-        auth = self._calculate_authenticity_score(brand_data)
-        overall = (pos + vis + biz + auth) / 4
-        return {
-            "overall_score": overall,
-            "strategic_positioning": pos,
-            "visual_identity": vis,
-            "business_metrics": biz,
-            "authenticity": auth,
-            "maturity_level": self._determine_maturity_level(overall),
-        }
+        scores = self.model.score(brand_data)
+        overall = sum(scores) / len(scores)
+        assessment = {"overall_score": overall}
+        assessment.update(zip(self.model.pillars, scores))
+        assessment["maturity_level"] = self._determine_maturity_level(overall)
+        return assessment
+
+    def _pillar_order(self, a: Dict) -> List[int]:
+        """Pillar indexes from weakest to strongest; ties keep spec order"""
+        return sorted(range(len(self.model.pillars)), key=lambda i: a.get(self.model.pillars[i], 0))
+
+    def _get_priority(self, a: Dict, rank: int) -> str:
+        return self.model.spec[self._pillar_order(a)[rank]]["priorities"][rank]
 
     def _get_top_priority(self, a: Dict) -> str:
-        lowest = min(
-            [("strategic_positioning", a.get("strategic_positioning", 0)),
-             ("visual_identity", a.get("visual_identity", 0)),
-             ("business_metrics", a.get("business_metrics", 0)),
-             ("authenticity", a.get("authenticity", 0))],
-            key=lambda x: x[1],
-        )[0]
-        priorities = {
-            "strategic_positioning": "Refine market positioning and competitive differentiation",
-            "visual_identity": "Develop cohesive visual identity and brand guidelines",
-            "business_metrics": "Establish clear KPIs and revenue optimization strategies",
-            "authenticity": "Strengthen brand story and authentic value proposition",
-        }
-        return priorities.get(lowest, "Comprehensive brand foundation development")
+        return self._get_priority(a, 0)
 
     def _get_secondary_priority(self, a: Dict) -> str:
-        scores = sorted([
-            ("strategic_positioning", a.get("strategic_positioning", 0)),
-            ("visual_identity", a.get("visual_identity", 0)),
-            ("business_metrics", a.get("business_metrics", 0)),
-            ("authenticity", a.get("authenticity", 0)),
-        ], key=lambda x: x[1])
-        priorities = {
-            "strategic_positioning": "Conduct comprehensive market research and competitor analysis",
-            "visual_identity": "Create consistent brand touchpoints and visual system",
-            "business_metrics": "Implement tracking systems and performance dashboards",
-            "authenticity": "Develop compelling brand narrative and founder story",
-        }
-        return priorities.get(scores[1][0], "Brand positioning optimization")
+        return self._get_priority(a, 1)
 
     def _get_tertiary_priority(self, a: Dict) -> str:
-        scores = sorted([
-            ("strategic_positioning", a.get("strategic_positioning", 0)),
-            ("visual_identity", a.get("visual_identity", 0)),
-            ("business_metrics", a.get("business_metrics", 0)),
-            ("authenticity", a.get("authenticity", 0)),
-        ], key=lambda x: x[1])
-        priorities = {
-            "strategic_positioning": "Build strategic partnerships and market alliances",
-            "visual_identity": "Develop comprehensive brand style guide",
-            "business_metrics": "Optimize pricing and revenue model",
-            "authenticity": "Strengthen community engagement and brand purpose",
-        }
-        return priorities.get(scores[2][0], "Growth strategy development")
+        return self._get_priority(a, 2)
+
+    def assess_many(self, brands: List[Dict]) -> List[Dict]:
+        """
+        Assess a portfolio of brands at once. Each result has the keys of
+        assess_brand_maturity() plus "priorities": the top, secondary and
+        tertiary recommendations. Checklist flags are packed into one matrix,
+        so pillar scores, maturity levels and priority order are computed
+        for all brands together. Columns are added in the order
+        assess_brand_maturity() adds them, so results match it exactly.
+        """
+        import numpy as np
+
+        model = self.model
+        features, pillars = model.features, model.pillars
+        zeros = [0] * len(features)
+        flags = np.fromiter(itertools.chain.from_iterable(map(brand.get, features, zeros) for brand in brands),
+                            dtype=float, count=len(brands) * len(features)).reshape(len(brands), len(features))
+        column = {feature: flags[:, i] for i, feature in enumerate(features)}
+        scores = np.empty((len(brands), len(pillars)))
+        for j, (pillar_features, weights, weight) in enumerate(model.terms):
+            total = np.zeros(len(brands))
+            for feature, w in zip(pillar_features, weights):
+                total = total + (column[feature] if weight is not None else column[feature] * w)
+            scores[:, j] = total * weight if weight is not None else total
+        overall = np.zeros(len(brands))
+        for j in range(len(pillars)):
+            overall = overall + scores[:, j]
+        overall = overall / len(pillars)
+        levels = np.searchsorted(MATURITY_THRESHOLDS, overall, side="right")
+        # Stable, so tied pillars rank in spec order like _pillar_order; each
+        # brand's three weakest pillars are then encoded as one integer for a table lookup
+        order = np.argsort(scores, axis=1, kind="stable")
+        codes = order[:, :3] @ np.array([len(pillars) ** 2, len(pillars), 1])
+        rankings = model.rankings()
+
+        keys = ("overall_score",) + pillars + ("maturity_level", "priorities")
+        rows = zip(overall.tolist(), *scores.T.tolist(), [MATURITY_LEVELS[level] for level in levels.tolist()],
+                   [list(rankings[code]) for code in codes.tolist()])
+        return [dict(zip(keys, row)) for row in rows]
 
     def _create_executive_summary(self, assessment: Dict, client_data: Dict) -> str:
         return (
@@ -126,20 +217,59 @@ class COLLIDEAdvisor:
         }
 
     def visualize_brand_assessment(self, assessment: Dict) -> None:
-        if go is None:
+        """Show the radar chart in a notebook or local session (servers use visualization.render)"""
+        try:
+            import plotly.graph_objects as go
+        except ImportError:
             print("Plotly is not installed; skipping visualization.")
             return
-        categories = ["Strategic Positioning", "Visual Identity", "Business Metrics", "Authenticity"]
-        values = [
-            assessment.get("strategic_positioning", 0),
-            assessment.get("visual_identity", 0),
-            assessment.get("business_metrics", 0),
-            assessment.get("authenticity", 0),
-        ]
-        fig = go.Figure()
-        fig.add_trace(go.Scatterpolar(r=values, theta=categories, fill="toself", name="Current"))
-        fig.update_layout(polar=dict(radialaxis=dict(visible=True, range=[0, 100])), showlegend=False)
-        fig.show()
+        from visualization import figure, scores_for
+        labels = [pillar["label"] for pillar in self.model.spec]
+        go.Figure(figure(labels, scores_for(assessment, self.model))).show()
+
+def _flag(value: Any) -> float:
+    """A checklist cell from a portfolio CSV: 1/0, true/false, yes/no or a number"""
+    text = str(value).strip().lower()
+    if text in _TRUE:
+        return 1.0
+    if text in _FALSE:
+        return 0.0
+    return float(text)
+
+
+def read_portfolio_csv(text: str) -> List[Dict]:
+    """Brands from a CSV with a header row: checklist flag columns plus any other columns (brand_name, ...)"""
+    flag_keys = set(SCORING_MODEL.features)
+    brands = []
+    for line, row in enumerate(csv.DictReader(io.StringIO(text)), start=2):
+        brand = {}
+        for key, value in row.items():
+            if key is None:
+                continue
+            key = key.strip()
+            if key in flag_keys:
+                try:
+                    brand[key] = _flag(value)
+                except ValueError:
+                    raise ValueError(f"line {line}: {key} must be 0/1, true/false or yes/no, got {value!r}")
+            else:
+                brand[key] = value
+        brands.append(brand)
+    return brands
+
+
+def write_assessments_csv(brands: Iterable[Dict], results: Iterable[Dict]) -> str:
+    """One CSV row per brand: brand_name, scores, maturity level and the three priorities"""
+    out = io.StringIO()
+    writer = csv.writer(out)
+    pillars = SCORING_MODEL.pillars
+    writer.writerow(["brand_name", "overall_score", *pillars, "maturity_level",
+                     "top_priority", "secondary_priority", "tertiary_priority"])
+    for brand, result in zip(brands, results):
+        writer.writerow([brand.get("brand_name", ""), result["overall_score"], *(result[p] for p in pillars),
+                         result["maturity_level"], *result["priorities"]])
+    return out.getvalue()
+
 
 class COLLIDEConsultation:
     def __init__(self):
@@ -0,0 +1,156 @@
+"""
+COLLIDE AI - Response Compression
+Negotiated gzip/brotli compression for Flask responses.
+
+- The encoding follows the client's Accept-Encoding (q-values honoured),
+  preferring brotli when the `brotli` package is installed.
+- Only text-like bodies (JSON, NDJSON, CSV, HTML, ...) of at least MIN_BYTES
+  are compressed. Responses that already have a Content-Encoding (pre-rendered
+  pages, precompressed assets, csv.gz exports), files sent with send_file and
+  `Cache-Control: no-transform` responses are left alone.
+- Streamed responses (the NDJSON/SSE campaign stream, CSV exports) are
+  compressed chunk by chunk with a sync flush after each chunk, so every event
+  still reaches the client as soon as it is produced.
+- Routes can change the defaults with the `compress` decorator:
+
+    @app.route('/api/lead-gen/leads')
+    @compression.compress(min_bytes=256)
+    def query_leads(): ...
+
+    @compression.compress(enabled=False)     # never compress this route
+"""
+
+import os
+import zlib
+from typing import Dict, Iterable, Iterator, Optional
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MIN_BYTES = int(os.getenv('COMPRESS_MIN_BYTES', '1024'))
+GZIP_LEVEL = 6
+# Brotli's higher qualities are too slow for per-request compression
+BROTLI_QUALITY = 4
+
+COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/x-ndjson', 'application/javascript',
+                      'application/xml', 'image/svg+xml')
+
+DEFAULTS = {'enabled': True, 'min_bytes': None, 'stream': True}
+
+
+def compress(enabled: bool = True, min_bytes: Optional[int] = None, stream: bool = True):
+    """Per-route settings: turn compression off, change the size threshold, or skip streamed bodies."""
+    def decorator(view):
+        view.compression = {'enabled': enabled, 'min_bytes': min_bytes, 'stream': stream}
+        return view
+    return decorator
+
+
+def available_encodings():
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def negotiate(accept_encodings) -> Optional[str]:
+    """Best supported encoding for a werkzeug Accept-Encoding header, or None"""
+    best, best_quality = None, 0
+    for encoding in available_encodings():
+        quality = accept_encodings[encoding]
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def _is_compressible(mimetype: str) -> bool:
+    mimetype = (mimetype or '').lower()
+    return mimetype.startswith(COMPRESSIBLE_TYPES) or mimetype.endswith('+json')
+
+
+class _Compressor:
+    """One response's compression stream; `chunk()` output can be sent on its own"""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == 'br':
+            self._brotli = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            # wbits 31: gzip container
+            self._zlib = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def chunk(self, data: bytes) -> bytes:
+        if self.encoding == 'br':
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == 'br':
+            return self._brotli.finish()
+        return self._zlib.flush()
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == 'br':
+            return self._brotli.process(data) + self._brotli.finish()
+        return self._zlib.compress(data) + self._zlib.flush()
+
+
+def compress_stream(chunks: Iterable, encoding: str) -> Iterator[bytes]:
+    """Compress a streamed body, flushing after every chunk"""
+    compressor = _Compressor(encoding)
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            if chunk:
+                yield compressor.chunk(chunk)
+        yield compressor.finish()
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+
+def _route_settings(app, endpoint) -> Dict:
+    view = app.view_functions.get(endpoint) if endpoint else None
+    return getattr(view, 'compression', None) or DEFAULTS
+
+
+def compress_response(response, accept_encodings, settings: Dict = DEFAULTS):
+    """Compress a Flask response in place when the client, route and body allow it"""
+    if (not settings['enabled'] or response.status_code < 200 or response.status_code in (204, 206, 304)
+            or 'Content-Encoding' in response.headers or response.direct_passthrough
+            or 'no-transform' in response.headers.get('Cache-Control', '')
+            or not _is_compressible(response.mimetype)):
+        return response
+    encoding = negotiate(accept_encodings)
+    # The representation depends on Accept-Encoding whether or not this one is compressed
+    response.vary.add('Accept-Encoding')
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        if not settings['stream']:
+            return response
+        response.response = compress_stream(response.response, encoding)
+        response.headers.pop('Content-Length', None)
+    else:
+        body = response.get_data()
+        min_bytes = MIN_BYTES if settings['min_bytes'] is None else settings['min_bytes']
+        if len(body) < min_bytes:
+            return response
+        response.set_data(_Compressor(encoding).compress(body))
+
+    response.headers['Content-Encoding'] = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        # The compressed bytes differ from the ones the strong ETag was computed for
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def init_app(app):
+    """Compress every response of a Flask app that qualifies (see compress_response)."""
+    from flask import request
+
+    @app.after_request
+    def _compress(response):
+        return compress_response(response, request.accept_encodings, _route_settings(app, request.endpoint))
@@ -0,0 +1,87 @@
+"""
+COLLIDE AI - Portfolio Dashboard Data
+Data layer of the Streamlit dashboard (streamlit_app.py), kept free of
+Streamlit so it can be tested and reused.
+
+A portfolio is read once (CSV upload, the server's portfolio file or the demo
+brand), assessed with COLLIDEAdvisor.assess_many and flattened into table
+rows. Every interaction after that (search, maturity filter, sort, paging)
+only reorders row indexes, so the dashboard never re-scores brands to redraw.
+"""
+
+import os
+import hashlib
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from collide_core import COLLIDEAdvisor, COLLIDEConsultation, MATURITY_LEVELS, read_portfolio_csv
+
+# Portfolio CSV on the server, offered as a source next to uploads
+PORTFOLIO_PATH = os.getenv('COLLIDE_PORTFOLIO_PATH', 'data/portfolio.csv')
+
+PAGE_SIZES = (50, 100, 250, 1000)
+
+
+def digest(raw: bytes) -> str:
+    """Hash of a portfolio's raw bytes: the cache key of its assessments"""
+    return hashlib.sha256(raw).hexdigest()
+
+
+def read_portfolio_file(path: str = PORTFOLIO_PATH) -> bytes:
+    """Raw bytes of the server's portfolio CSV (b'' when there is none)"""
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        return b''
+
+
+def demo_brands() -> List[Dict]:
+    return [COLLIDEConsultation()._collect_basic_info()]
+
+
+def load_brands(raw: bytes) -> List[Dict]:
+    """Brands from portfolio CSV bytes (see collide_core.read_portfolio_csv)"""
+    return read_portfolio_csv(raw.decode('utf-8-sig'))
+
+
+def assess(brands: List[Dict], advisor: COLLIDEAdvisor) -> List[Dict]:
+    """One flat table row per brand: name, overall score, pillar scores, maturity level and priorities"""
+    rows = []
+    for i, (brand, result) in enumerate(zip(brands, advisor.assess_many(brands))):
+        top, secondary, tertiary = result.pop('priorities')
+        result = dict(brand_name=brand.get('brand_name') or f'Brand {i + 1}', **result)
+        result.update(top_priority=top, secondary_priority=secondary, tertiary_priority=tertiary)
+        rows.append(result)
+    return rows
+
+
+def select(rows: Sequence[Dict], search: str = '', levels: Iterable[str] = (), sort_by: str = 'overall_score',
+           descending: bool = True) -> List[int]:
+    """Indexes of the rows matching a brand name search and maturity levels, sorted by one column"""
+    search = search.strip().lower()
+    levels = set(levels)
+    indexes = [i for i, row in enumerate(rows)
+               if (not search or search in row['brand_name'].lower())
+               and (not levels or row['maturity_level'] in levels)]
+    # sort() is stable with reverse=True too, so tied rows keep portfolio order
+    indexes.sort(key=lambda i: rows[i][sort_by], reverse=descending)
+    return indexes
+
+
+def paginate(items: Sequence, page: int, page_size: int) -> Tuple[Sequence, int]:
+    """(items on a 1-based page, page count); out-of-range pages are clamped"""
+    pages = max(1, -(-len(items) // page_size))
+    page = min(max(page, 1), pages)
+    return items[(page - 1) * page_size:page * page_size], pages
+
+
+def summary(rows: Sequence[Dict], pillars: Sequence[str]) -> Dict:
+    """Brand count, mean overall and pillar scores, and brands per maturity level"""
+    count = len(rows)
+    return {
+        'count': count,
+        'overall_score': sum(row['overall_score'] for row in rows) / count if count else 0.0,
+        'pillars': {key: sum(row[key] for row in rows) / count if count else 0.0 for key in pillars},
+        'maturity_levels': {level: sum(1 for row in rows if row['maturity_level'] == level)
+                            for level in MATURITY_LEVELS},
+    }
@@ -0,0 +1,29 @@
+"""
+gunicorn settings, loaded automatically from the project root (Procfile, Makefile).
+Command-line flags such as -w and -b still take precedence.
+"""
+import os
+import shutil
+import tempfile
+
+# Workers share their Prometheus samples through this directory so /metrics
+# reports totals for every worker (see metrics.py)
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'collide-prometheus'))
+
+
+def on_starting(server):
+    # Samples left by a previous server would be counted again
+    path = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+
+
+def child_exit(server, worker):
+    import metrics
+    metrics.mark_process_dead(worker.pid)
+
+
+def post_worker_init(worker):
+    # Render the public pages before the worker takes its first request
+    import page_cache
+    page_cache.warm(worker.wsgi)
@@ -0,0 +1,238 @@
+"""Background job queue: SQLite (jobs.db) by default, RQ when REDIS_URL is set.
+
+Shared by the Flask app, the scheduler and the workers so enqueueing a
+campaign never requires importing the web app.
+"""
+import os
+import uuid
+import sqlite3
+from datetime import datetime
+
+import json_backend
+import metrics
+
+_REDIS_URL = os.getenv('REDIS_URL')
+_rq_modules = None
+
+
+def _rq():
+    """
+    (redis, rq.Queue, rq.job.Job) when REDIS_URL is set and rq is installed,
+    else None. Imported on first use so processes that never touch the queue
+    (e.g. a cold function serving /health) do not pay for redis and rq.
+    """
+    global _rq_modules
+    if _rq_modules is None:
+        _rq_modules = ()
+        if _REDIS_URL:
+            try:
+                import redis
+                from rq import Queue
+                from rq.job import Job
+                _rq_modules = (redis, Queue, Job)
+            except Exception:
+                pass
+    return _rq_modules or None
+
+
+_redis_conn = None
+
+
+def _events_redis():
+    """
+    Redis connection for job events when jobs go through RQ, else None. An RQ
+    worker may run on another host, so its progress events are published to
+    Redis, where the web process streaming the campaign can read them.
+    """
+    global _redis_conn
+    rq = _rq()
+    if not rq:
+        return None
+    if _redis_conn is None:
+        _redis_conn = rq[0].from_url(_REDIS_URL)
+    return _redis_conn
+
+# Jobs DB (simple SQLite queue for background processing)
+DB_PATH = os.getenv('JOBS_DB_PATH') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'jobs.db')
+
+# Statuses after which a job produces no more events (SQLite worker and RQ)
+FINISHED_STATUSES = ('done', 'finished', 'failed', 'stopped', 'canceled')
+
+# Redis list holding an RQ job's events, and how long it is kept after the last one
+EVENTS_KEY = 'collide:job_events:{}'
+EVENTS_TTL_SECONDS = int(os.getenv('JOB_EVENTS_TTL_SECONDS', '86400'))
+
+
+def init_jobs_db():
+    conn = sqlite3.connect(DB_PATH)
+    c = conn.cursor()
+    c.execute('''
+    CREATE TABLE IF NOT EXISTS jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        job_id TEXT UNIQUE,
+        status TEXT,
+        created_at TEXT,
+        updated_at TEXT,
+        payload TEXT,
+        result TEXT,
+        trace TEXT
+    )
+    ''')
+    # jobs.db files created before traces were stored
+    if 'trace' not in [row[1] for row in c.execute('PRAGMA table_info(jobs)')]:
+        c.execute('ALTER TABLE jobs ADD COLUMN trace TEXT')
+    # Partial results published by a running job, streamed to clients in order
+    c.execute('''
+    CREATE TABLE IF NOT EXISTS job_events (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        job_id TEXT,
+        event TEXT,
+        data TEXT,
+        created_at TEXT
+    )
+    ''')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_job_events_job ON job_events (job_id, id)')
+    conn.commit()
+    conn.close()
+
+
+def enqueue_job(payload_dict):
+    # If Redis is configured and rq is available, enqueue into RQ
+    rq = _rq()
+    if rq:
+        redis, Queue, _ = rq
+        redis_conn = redis.from_url(_REDIS_URL)
+        q = Queue(connection=redis_conn)
+        # Lazy import tasks to avoid circular imports
+        from tasks import process_lead_campaign
+        with metrics.track('redis', 'enqueue_job'):
+            rq_job = q.enqueue(process_lead_campaign, payload_dict)
+        return rq_job.get_id()
+
+    # Fallback to SQLite queue
+    job_id = str(uuid.uuid4())
+    created = datetime.now().isoformat()
+    with metrics.track('sqlite', 'enqueue_job'):
+        conn = sqlite3.connect(DB_PATH)
+        c = conn.cursor()
+        c.execute('INSERT INTO jobs (job_id, status, created_at, updated_at, payload) VALUES (?,?,?,?,?)',
+                  (job_id, 'pending', created, created, json_backend.dumps(payload_dict)))
+        conn.commit()
+        conn.close()
+    return job_id
+
+
+def get_job(job_id):
+    # If Redis + RQ used, fetch job info from RQ
+    rq = _rq()
+    if rq:
+        redis, _, Job = rq
+        try:
+            redis_conn = redis.from_url(_REDIS_URL)
+            with metrics.track('redis', 'get_job'):
+                rq_job = Job.fetch(job_id, connection=redis_conn)
+            return {
+                'job_id': rq_job.get_id(),
+                'status': rq_job.get_status(),
+                'created_at': None,
+                'updated_at': None,
+                'payload': None,
+                'result': rq_job.result,
+                'trace': rq_job.meta.get('trace')
+            }
+        except Exception:
+            # fall back to sqlite lookup
+            pass
+
+    with metrics.track('sqlite', 'get_job'):
+        conn = sqlite3.connect(DB_PATH)
+        c = conn.cursor()
+        c.execute('SELECT job_id, status, created_at, updated_at, payload, result, trace FROM jobs WHERE job_id = ?',
+                  (job_id,))
+        row = c.fetchone()
+        conn.close()
+    if not row:
+        return None
+    return {
+        'job_id': row[0],
+        'status': row[1],
+        'created_at': row[2],
+        'updated_at': row[3],
+        'payload': json_backend.loads(row[4]) if row[4] else None,
+        'result': json_backend.loads(row[5]) if row[5] else None,
+        'trace': json_backend.loads(row[6]) if row[6] else None
+    }
+
+
+def set_job_trace(job_id, trace):
+    """Store a finished campaign trace (tracing.Span.to_dict()) on the job record."""
+    rq = _rq()
+    if rq:
+        redis, _, Job = rq
+        try:
+            rq_job = Job.fetch(job_id, connection=redis.from_url(_REDIS_URL))
+            rq_job.meta['trace'] = trace
+            rq_job.save_meta()
+            return
+        except Exception:
+            # fall back to sqlite
+            pass
+
+    with metrics.track('sqlite', 'set_job_trace'):
+        conn = sqlite3.connect(DB_PATH)
+        conn.execute('UPDATE jobs SET trace = ? WHERE job_id = ?', (json_backend.dumps(trace), job_id))
+        conn.commit()
+        conn.close()
+
+
+def add_job_event(job_id, event, data=None):
+    """Record a progress event (e.g. a batch of qualified leads) for a running job."""
+    created = datetime.now().isoformat()
+    redis_conn = _events_redis()
+    if redis_conn is not None:
+        key = EVENTS_KEY.format(job_id)
+        with metrics.track('redis', 'add_job_event'):
+            pipe = redis_conn.pipeline()
+            pipe.rpush(key, json_backend.dumpb({'event': event, 'data': data, 'created_at': created}))
+            pipe.expire(key, EVENTS_TTL_SECONDS)
+            pipe.execute()
+        return
+
+    with metrics.track('sqlite', 'add_job_event'):
+        conn = sqlite3.connect(DB_PATH)
+        c = conn.cursor()
+        c.execute('INSERT INTO job_events (job_id, event, data, created_at) VALUES (?,?,?,?)',
+                  (job_id, event, json_backend.dumps(data), created))
+        conn.commit()
+        conn.close()
+
+
+def get_job_events(job_id, after=0):
+    """
+    Events for a job with id greater than `after`, oldest first. Under RQ an
+    event's id is its 1-based position in the job's Redis list.
+    """
+    redis_conn = _events_redis()
+    if redis_conn is not None:
+        with metrics.track('redis', 'get_job_events'):
+            entries = redis_conn.lrange(EVENTS_KEY.format(job_id), after, -1)
+        return [dict(json_backend.loads(entry), id=after + i) for i, entry in enumerate(entries, start=1)]
+
+    with metrics.track('sqlite', 'get_job_events'):
+        conn = sqlite3.connect(DB_PATH)
+        c = conn.cursor()
+        c.execute('SELECT id, event, data, created_at FROM job_events WHERE job_id = ? AND id > ? ORDER BY id',
+                  (job_id, after))
+        rows = c.fetchall()
+        conn.close()
+    return [
+        {'id': row[0], 'event': row[1], 'data': json_backend.loads(row[2]) if row[2] else None, 'created_at': row[3]}
+        for row in rows
+    ]
+
+
+def job_progress(job_id):
+    """A progress callback for LeadGenerator.run_lead_generation_campaign that publishes job events."""
+    def on_progress(event, data=None):
+        add_job_event(job_id, event, data)
+    return on_progress
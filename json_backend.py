@@ -0,0 +1,112 @@
+"""
+COLLIDE AI - JSON Backend
+One JSON encoder/decoder for API responses and job/campaign storage.
+
+orjson is used when installed and the standard library `json` module
+otherwise; both produce the same data:
+
+- dict keys that are not strings (ints, ...) become strings;
+- datetime/date values become ISO 8601 strings, and Decimal, UUID, sets and
+  objects with __html__ are converted as Flask's default provider does;
+- output is compact and keeps insertion order (keys are not sorted).
+
+`dumps()` returns str for SQLite TEXT columns, `dumpb()` returns UTF-8 bytes
+for responses and caches that keep pre-encoded bodies, and `loads()` takes
+either. `init_app(app)` makes `jsonify` and `request.get_json` use the
+backend.
+
+    python scripts/bench_json.py          # orjson vs json on lead payloads
+"""
+
+import json
+import uuid
+import decimal
+import dataclasses
+from datetime import date, datetime, time
+from typing import IO, Any, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    _OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def backend() -> str:
+    """Name of the encoder in use: 'orjson' or 'json'"""
+    return 'orjson' if orjson is not None else 'json'
+
+
+def _default(obj):
+    """Values neither encoder handles natively"""
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, (decimal.Decimal, uuid.UUID)):
+        return str(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    if hasattr(obj, '__html__'):
+        return str(obj.__html__())
+    if hasattr(obj, 'tolist'):
+        # numpy arrays and scalars under the standard library encoder
+        return obj.tolist()
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+def dumpb(obj: Any, indent: bool = False) -> bytes:
+    """Encode to UTF-8 bytes (indent=True: two-space indentation)"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=_OPTIONS | orjson.OPT_INDENT_2 if indent else _OPTIONS)
+    return dumps(obj, indent).encode('utf-8')
+
+
+def dumps(obj: Any, indent: bool = False) -> str:
+    """Encode to str"""
+    if orjson is not None:
+        return dumpb(obj, indent).decode('utf-8')
+    return json.dumps(obj, default=_default, ensure_ascii=False,
+                      indent=2 if indent else None, separators=(',', ': ') if indent else (',', ':'))
+
+
+def loads(data: Union[str, bytes, bytearray, memoryview]) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    if isinstance(data, memoryview):
+        data = bytes(data)
+    return json.loads(data)
+
+
+def dump(obj: Any, f: IO[str], indent: bool = False):
+    f.write(dumps(obj, indent))
+
+
+def load(f: IO) -> Any:
+    return loads(f.read())
+
+
+def _flask_provider():
+    from flask.json.provider import JSONProvider
+
+    class BackendJSONProvider(JSONProvider):
+        """Flask JSON provider backed by json_backend (responses are encoded straight to bytes)"""
+
+        def dumps(self, obj, **kwargs):
+            return dumps(obj)
+
+        def loads(self, s, **kwargs):
+            return loads(s)
+
+        def response(self, *args, **kwargs):
+            obj = self._prepare_response_obj(args, kwargs)
+            return self._app.response_class(dumpb(obj), mimetype='application/json')
+
+    return BackendJSONProvider
+
+
+def init_app(app):
+    """Use the backend for jsonify, Response.get_json and request.get_json"""
+    app.json = _flask_provider()(app)
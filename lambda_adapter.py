@@ -0,0 +1,195 @@
+"""
+COLLIDE AI - Lambda Adapter
+Runs a WSGI app for AWS Lambda proxy events (Netlify Functions), replacing
+awsgi and the Flask test_request_context fallback in netlify/functions/app.py.
+
+- REST API (v1) and HTTP API (v2, "version": "2.0") events and responses,
+  including multi-value headers/query strings and v2 `cookies`.
+- Request bodies with isBase64Encoded are decoded; binary responses (images,
+  gzip, Parquet, ...) go back base64-encoded with isBase64Encoded set.
+- Text responses of COMPRESS_MIN_BYTES or more are gzipped when the client
+  accepts it.
+- The WSGI environ keys that never change are built once per process.
+  `lambda_adapter.buffered` is set in every environ: the whole response body
+  is collected before the function returns, so apps should not stream.
+- Routes registered with fast_route() (e.g. /health) are answered without
+  entering the WSGI app at all.
+
+    adapter = LambdaAdapter(flask_app)
+    adapter.fast_route('/health', lambda: (200, {'Content-Type': 'application/json'}, b'{"status":"ok"}'))
+    def handler(event, context):
+        return adapter(event, context)
+"""
+
+import io
+import sys
+import gzip
+import base64
+from typing import Callable, Dict, List, Tuple
+from urllib.parse import unquote, urlencode
+
+# Responses smaller than this are not worth gzipping
+COMPRESS_MIN_BYTES = 1024
+COMPRESS_LEVEL = 5
+
+TEXT_TYPES = ('text/', 'application/json', 'application/javascript', 'application/xml',
+              'application/x-ndjson', 'image/svg+xml')
+
+FastHandler = Callable[[], Tuple[int, Dict[str, str], bytes]]
+
+
+def _is_text(content_type: str) -> bool:
+    content_type = content_type.lower()
+    return content_type.startswith(TEXT_TYPES) or content_type.split(';')[0].endswith('+json')
+
+
+class LambdaAdapter:
+    """Callable `handler(event, context)` for a WSGI app behind a Lambda proxy integration."""
+
+    def __init__(self, app, compress: bool = True):
+        self.app = app
+        self.compress = compress
+        self._fast_routes: Dict[Tuple[str, str], FastHandler] = {}
+        self._environ_template = {
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': 'https',
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': False,
+            'wsgi.multiprocess': False,
+            'wsgi.run_once': False,
+            'SCRIPT_NAME': '',
+            'SERVER_PROTOCOL': 'HTTP/1.1',
+            'SERVER_NAME': 'localhost',
+            # Bodies are joined before returning, so apps should not stream
+            'lambda_adapter.buffered': True,
+            'SERVER_PORT': '443',
+        }
+
+    def fast_route(self, path: str, handler: FastHandler, methods=('GET', 'HEAD')):
+        """Answer `path` with handler() -> (status, headers, body bytes), bypassing the WSGI app."""
+        for method in methods:
+            self._fast_routes[(method, path)] = handler
+
+    # Requests ---------------------------------------------------------------
+
+    @staticmethod
+    def _request(event: Dict):
+        """(method, path, query string, headers with lower-case names, body bytes, source ip)"""
+        v2 = event.get('version') == '2.0'
+        context = event.get('requestContext') or {}
+        if v2:
+            http = context.get('http') or {}
+            method = http.get('method', 'GET')
+            path = event.get('rawPath') or '/'
+            query = event.get('rawQueryString') or ''
+            source_ip = http.get('sourceIp')
+        else:
+            method = event.get('httpMethod') or (context.get('http') or {}).get('method', 'GET')
+            path = event.get('path') or event.get('rawPath') or '/'
+            multi = event.get('multiValueQueryStringParameters')
+            single = event.get('queryStringParameters')
+            if multi:
+                query = urlencode([(k, v) for k, values in multi.items() for v in values])
+            else:
+                query = urlencode(single) if single else ''
+            source_ip = (context.get('identity') or {}).get('sourceIp')
+
+        headers = {k.lower(): v for k, v in (event.get('headers') or {}).items()}
+        for name, values in (event.get('multiValueHeaders') or {}).items():
+            headers[name.lower()] = ', '.join(values)
+        cookies = event.get('cookies') or []
+        if cookies:
+            headers['cookie'] = '; '.join(cookies)
+
+        body = event.get('body') or b''
+        if isinstance(body, str):
+            body = base64.b64decode(body) if event.get('isBase64Encoded') else body.encode('utf-8')
+        return method.upper(), path, query, headers, body, source_ip
+
+    def _environ(self, method, path, query, headers, body, source_ip) -> Dict:
+        environ = dict(self._environ_template)
+        environ['REQUEST_METHOD'] = method
+        environ['PATH_INFO'] = unquote(path, encoding='latin-1')
+        environ['QUERY_STRING'] = query
+        environ['REMOTE_ADDR'] = source_ip or '127.0.0.1'
+        environ['CONTENT_LENGTH'] = str(len(body))
+        environ['wsgi.input'] = io.BytesIO(body)
+        for name, value in headers.items():
+            if name == 'content-type':
+                environ['CONTENT_TYPE'] = value
+            elif name != 'content-length':
+                environ['HTTP_' + name.upper().replace('-', '_')] = value
+        host = headers.get('host')
+        if host:
+            environ['SERVER_NAME'] = host.split(':', 1)[0]
+        if headers.get('x-forwarded-proto'):
+            environ['wsgi.url_scheme'] = headers['x-forwarded-proto']
+        return environ
+
+    def _call_app(self, environ) -> Tuple[int, List[Tuple[str, str]], bytes]:
+        started = {}
+
+        def start_response(status, response_headers, exc_info=None):
+            started['status'] = int(status.split(' ', 1)[0])
+            started['headers'] = response_headers
+
+        result = self.app(environ, start_response)
+        try:
+            body = b''.join(result)
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+        return started['status'], started['headers'], body
+
+    # Responses --------------------------------------------------------------
+
+    def _response(self, event: Dict, request_headers: Dict, status: int, headers: List[Tuple[str, str]],
+                  body: bytes, method: str) -> Dict:
+        names = {name.lower(): value for name, value in headers}
+        content_type = names.get('content-type', '')
+        encoded = 'content-encoding' in names
+
+        if (self.compress and not encoded and _is_text(content_type) and len(body) >= COMPRESS_MIN_BYTES
+                and 'gzip' in request_headers.get('accept-encoding', '')):
+            body = gzip.compress(body, COMPRESS_LEVEL)
+            headers = [(n, v) for n, v in headers if n.lower() not in ('content-length', 'vary')]
+            vary = names.get('vary')
+            headers += [('Content-Encoding', 'gzip'), ('Content-Length', str(len(body))),
+                        ('Vary', f'{vary}, Accept-Encoding' if vary else 'Accept-Encoding')]
+            encoded = True
+        if method == 'HEAD':
+            body = b''
+
+        if encoded or not _is_text(content_type or 'text/plain'):
+            payload, is_base64 = base64.b64encode(body).decode('ascii'), True
+        else:
+            payload, is_base64 = body.decode('utf-8', errors='replace'), False
+
+        response = {'statusCode': status, 'body': payload, 'isBase64Encoded': is_base64}
+        single, multi, cookies = {}, {}, []
+        for name, value in headers:
+            if name.lower() == 'set-cookie':
+                cookies.append(value)
+                continue
+            multi.setdefault(name, []).append(value)
+            single[name] = value if name not in single else f'{single[name]}, {value}'
+        response['headers'] = single
+        if event.get('version') == '2.0':
+            if cookies:
+                response['cookies'] = cookies
+        else:
+            if cookies:
+                multi['Set-Cookie'] = cookies
+            # API Gateway prefers multiValueHeaders when both are present
+            response['multiValueHeaders'] = multi
+        return response
+
+    def __call__(self, event: Dict, context=None) -> Dict:
+        method, path, query, headers, body, source_ip = self._request(event)
+        fast = self._fast_routes.get((method, path))
+        if fast is not None:
+            status, response_headers, response_body = fast()
+            return self._response(event, headers, status, list(response_headers.items()), response_body, method)
+        environ = self._environ(method, path, query, headers, body, source_ip)
+        status, response_headers, response_body = self._call_app(environ)
+        return self._response(event, headers, status, response_headers, response_body, method)
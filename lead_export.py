@@ -0,0 +1,172 @@
+"""Streaming lead export: CSV, gzipped CSV and Parquet.
+
+Every writer consumes an iterator of lead dicts (usually
+CampaignStore.iter_leads) and yields encoded byte chunks, so an export of any
+size only ever holds one chunk of leads in memory.
+"""
+import io
+import re
+import csv
+import zlib
+from typing import Dict, Iterable, Iterator, List, Optional
+
+# pyarrow costs ~80ms to import, so it is loaded by the first Parquet export
+pa = None
+pq = None
+_pyarrow_checked = False
+
+EXPORT_FIELDS = ['name', 'company', 'email', 'platform', 'industry',
+                 'website', 'qualification_score', 'title', 'location']
+
+FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'csv.gz': ('application/gzip', 'csv.gz'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+}
+
+CSV_FLUSH_ROWS = 1000
+PARQUET_ROW_GROUP_SIZE = 50000
+
+
+def iter_csv(leads: Iterable[Dict], fields: Optional[List[str]] = None,
+             flush_rows: int = CSV_FLUSH_ROWS) -> Iterator[bytes]:
+    """Yield UTF-8 CSV (header first) in chunks of `flush_rows` rows."""
+    fields = fields or EXPORT_FIELDS
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields, extrasaction='ignore')
+    writer.writeheader()
+
+    rows = 0
+    for lead in leads:
+        writer.writerow(lead)
+        rows += 1
+        if rows % flush_rows == 0:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def iter_gzip(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """Gzip a stream of byte chunks incrementally."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that hands written bytes back to a generator."""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def parquet_available() -> bool:
+    """Import pyarrow on first use; False when it is not installed."""
+    global pa, pq, _pyarrow_checked
+    if not _pyarrow_checked:
+        try:
+            import pyarrow
+            import pyarrow.parquet
+            pa, pq = pyarrow, pyarrow.parquet
+        except ImportError:
+            pass
+        _pyarrow_checked = True
+    return pq is not None
+
+
+def _parquet_schema(fields: List[str]):
+    types = {'qualification_score': pa.int64()}
+    return pa.schema([(field, types.get(field, pa.string())) for field in fields])
+
+
+def _parquet_column(field: str, rows: List[Dict]):
+    if field == 'qualification_score':
+        return [row.get(field) for row in rows]
+    return [None if row.get(field) is None else str(row.get(field)) for row in rows]
+
+
+def iter_parquet(leads: Iterable[Dict], fields: Optional[List[str]] = None,
+                 row_group_size: int = PARQUET_ROW_GROUP_SIZE) -> Iterator[bytes]:
+    """Yield a Parquet file, one row group (of `row_group_size` leads) at a time."""
+    if not parquet_available():
+        raise RuntimeError("pyarrow is not installed; Parquet export is unavailable")
+
+    fields = fields or EXPORT_FIELDS
+    schema = _parquet_schema(fields)
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression='snappy')
+
+    def flush(rows):
+        columns = [pa.array(_parquet_column(field, rows), type=schema.field(field).type) for field in fields]
+        writer.write_table(pa.Table.from_arrays(columns, schema=schema), row_group_size=row_group_size)
+        return sink.drain()
+
+    rows = []
+    for lead in leads:
+        rows.append(lead)
+        if len(rows) >= row_group_size:
+            data = flush(rows)
+            rows = []
+            if data:
+                yield data
+
+    if rows:
+        data = flush(rows)
+        if data:
+            yield data
+
+    writer.close()
+    yield sink.drain()
+
+
+def iter_export(leads: Iterable[Dict], fmt: str = 'csv', fields: Optional[List[str]] = None) -> Iterator[bytes]:
+    """Encode leads in one of FORMATS."""
+    if fmt == 'csv':
+        return iter_csv(leads, fields)
+    if fmt == 'csv.gz':
+        return iter_gzip(iter_csv(leads, fields))
+    if fmt == 'parquet':
+        return iter_parquet(leads, fields)
+    raise ValueError(f"Unknown export format: {fmt}")
+
+
+def export_filename(campaign_id: Optional[str], fmt: str) -> str:
+    """Download name for an export; the campaign id is user input, so only [A-Za-z0-9_.-] is kept."""
+    name = re.sub(r'[^A-Za-z0-9_.-]', '_', campaign_id or 'all')
+    return f"collide_leads_{name}.{FORMATS[fmt][1]}"
+
+
+def write_export(leads: Iterable[Dict], path: str, fmt: Optional[str] = None,
+                 fields: Optional[List[str]] = None) -> int:
+    """Stream an export to a file; format defaults from the extension. Returns bytes written."""
+    if fmt is None:
+        fmt = next((f for f in ('csv.gz', 'parquet', 'csv') if path.endswith('.' + f)), 'csv')
+    written = 0
+    with open(path, 'wb') as f:
+        for chunk in iter_export(leads, fmt, fields):
+            f.write(chunk)
+            written += len(chunk)
+    return written
@@ -5,14 +5,24 @@ across LinkedIn, Email, Instagram, and other social media platforms.
 """
 
 import os
-import json
-import requests
 from datetime import datetime
-from typing import List, Dict, Optional
-import smtplib
-from email.mime.text import MIMEText
+from typing import Callable, Iterable, List, Dict, Optional
 from email.mime.multipart import MIMEMultipart
 import re
+import uuid
+import itertools
+
+from lead_rules import get_ruleset
+from outreach import get_sender
+from outreach_templates import build_mime, get_templates
+import outbox
+from campaign_store import CampaignStore, normalize_domain
+import lead_export
+from incremental import IncrementalTracker
+from quota import get_quota_manager
+from lead_sources import SINCE, search_all, select_sources
+import metrics
+import tracing
 
 class LeadGenerator:
     """
@@ -36,23 +46,15 @@ class LeadGenerator:
         self.email_user = os.getenv('EMAIL_USER', '')
         self.email_password = os.getenv('EMAIL_PASSWORD', '')
         
-        # Search criteria
-        self.target_industries = [
-            'fashion', 'beauty', 'lifestyle', 'design', 'skincare',
-            'cosmetics', 'apparel', 'accessories', 'home decor', 'jewelry'
-        ]
-        
-        self.target_titles = [
-            'founder', 'ceo', 'creative director', 'brand director',
-            'owner', 'entrepreneur', 'designer', 'brand manager'
-        ]
-        
-        self.lead_qualification_criteria = {
-            'min_followers': 1000,  # Minimum social media following
-            'has_website': True,
-            'engagement_rate': 2.0,  # Minimum engagement %
-            'recent_activity': 30  # Days
-        }
+        # Search criteria and qualification thresholds live in lead_rules.json
+
+    @property
+    def target_industries(self) -> List[str]:
+        return get_ruleset().target_industries
+
+    @property
+    def target_titles(self) -> List[str]:
+        return get_ruleset().target_titles
     
     def search_instagram_leads(self, hashtags: List[str], max_results: int = 50) -> List[Dict]:
         """
@@ -141,7 +143,15 @@ class LeadGenerator:
                 'api_key': self.hunter_api_key
             }
             
-            response = requests.get(url, params=params)
+            quota = get_quota_manager()
+            if not quota.acquire('hunter'):
+                print("⏸️  Hunter.io quota exhausted; skipping lookup")
+                return None
+            import requests  # deferred: only Hunter lookups need it
+            with metrics.track('hunter', 'email-finder'), tracing.span('hunter', domain=domain) as call:
+                response = requests.get(url, params=params)
+                call.set(status=response.status_code)
+            quota.record('hunter', response.status_code, response.headers)
             data = response.json()
             
             if data.get('data', {}).get('email'):
@@ -153,280 +163,256 @@ class LeadGenerator:
     
     def qualify_lead(self, lead: Dict) -> Dict:
         """
-        Score and qualify leads based on criteria.
+        Score and qualify leads against the shared ruleset (lead_rules.json).
         Returns lead with qualification score.
         """
-        score = 0
-        reasons = []
-        
-        # Follower count
-        followers = lead.get('followers', 0)
-        if followers >= 10000:
-            score += 30
-            reasons.append(f"Strong following ({followers:,})")
-        elif followers >= 5000:
-            score += 20
-            reasons.append(f"Good following ({followers:,})")
-        elif followers >= 1000:
-            score += 10
-            reasons.append(f"Growing following ({followers:,})")
-        
-        # Website presence
-        if lead.get('website'):
-            score += 15
-            reasons.append("Has website")
-        
-        # Industry match
-        bio = (lead.get('bio', '') + ' ' + lead.get('title', '')).lower()
-        for industry in self.target_industries:
-            if industry in bio:
-                score += 10
-                reasons.append(f"In {industry} industry")
-                break
-        
-        # Title/role match
-        for title in self.target_titles:
-            if title in bio:
-                score += 15
-                reasons.append(f"Is {title}")
-                break
-        
-        # Engagement rate
-        engagement = lead.get('engagement_rate', 0)
-        if engagement >= 3.0:
-            score += 15
-            reasons.append(f"High engagement ({engagement}%)")
-        elif engagement >= 2.0:
-            score += 10
-            reasons.append(f"Good engagement ({engagement}%)")
-        
-        # Recent activity
-        if lead.get('recent_posts', 0) > 5:
-            score += 10
-            reasons.append("Active poster")
-        
-        lead['qualification_score'] = score
-        lead['qualification_reasons'] = reasons
-        lead['qualified'] = score >= 50  # Threshold for qualified lead
-        
-        return lead
+        return get_ruleset().qualify(lead)
     
-    def generate_personalized_message(self, lead: Dict, channel: str = 'email') -> str:
+    def generate_personalized_message(self, lead: Dict, channel: str = 'email') -> Dict:
         """
-        Generate personalized outreach message for each lead.
+        Generate personalized outreach message for each lead
+        from the precompiled templates in templates/outreach/.
         """
-        name = lead.get('name', 'there').split()[0]
-        company = lead.get('company', lead.get('username', 'your brand'))
-        industry = lead.get('industry', 'creative')
-        
-        if channel == 'email':
-            subject = f"Elevate {company}'s Brand Strategy"
-            
-            body = f"""Hi {name},
-
-I came across {company} and was impressed by your work in the {industry} space. Your approach to [specific observation based on their content] really resonates with the creative entrepreneurs we work with at COLLIDE.
-
-COLLIDE is a brand-shaping and business development consultancy exclusively for creative entrepreneurs in fashion, beauty, lifestyle, and design. We help founders like you:
-
-• Translate authentic visions into compelling brand identities
-• Align strategic positioning with sustainable business metrics  
-• Develop cohesive visual identity systems
-• Define and reach ideal customers
-• Build go-to-market strategies that drive growth
-
-I'd love to share some insights specific to {industry} brands that could support {company}'s evolution.
-
-Would you be open to a quick 15-minute conversation? I can also offer a complimentary brand audit to identify immediate opportunities.
-
-Looking forward to connecting,
-
-[Your Name]
-COLLIDE - Brand-Shaping & Business Development
-https://collideartistry.com
-
-P.S. We're currently offering our AI-powered brand advisor to a select group of founders. Happy to give you early access."""
-            
-            return {'subject': subject, 'body': body}
-        
-        elif channel == 'linkedin':
-            message = f"""Hi {name},
-
-Impressed by {company}'s work in {industry}. At COLLIDE, we specialize in brand-shaping and business development for creative entrepreneurs like you.
-
-Would love to share some insights on scaling {industry} brands and explore how we could support {company}'s growth.
-
-Open to a brief chat?
-
-Best,
-[Your Name] | COLLIDE"""
-            
-            return {'message': message}
-        
-        elif channel == 'instagram':
-            message = f"""Love what you're building with {company}! 🎨 
-
-At COLLIDE, we help {industry} founders translate their vision into thriving brands. Would love to connect and share some insights.
-
-Check out our AI brand advisor: [link]
-
-DM me if you'd like to chat! 💬"""
-            
-            return {'message': message}
-        
-        return {'message': f"Hi {name}, let's connect!"}
+        return get_templates().render(lead, channel)
+    
+    def build_email(self, to_email: str, subject: str, body: str) -> MIMEMultipart:
+        """Build a plain + HTML multipart message for a lead."""
+        return build_mime(self.email_user, to_email, subject, body)
     
-    def send_email(self, to_email: str, subject: str, body: str) -> bool:
+    def _sender(self):
+        return get_sender(self.smtp_server, self.smtp_port, self.email_user, self.email_password)
+    
+    def send_email(self, to_email: str, subject: str, body: str, lead_info: Optional[Dict] = None) -> bool:
         """
-        Send personalized email to lead.
+        Send personalized email to lead over the shared SMTP connection pool.
         """
         if not self.email_user or not self.email_password:
             print("⚠️  Email credentials not configured")
             return False
         
-        try:
-            msg = MIMEMultipart('alternative')
-            msg['From'] = self.email_user
-            msg['To'] = to_email
-            msg['Subject'] = subject
-            
-            # HTML version
-            html_body = body.replace('\n', '<br>')
-            
-            part1 = MIMEText(body, 'plain')
-            part2 = MIMEText(html_body, 'html')
-            
-            msg.attach(part1)
-            msg.attach(part2)
-            
-            # Send email
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.email_user, self.email_password)
-                server.send_message(msg)
-            
+        success = self._sender().send(self.build_email(to_email, subject, body))
+        if success:
             print(f"✅ Email sent to {to_email}")
-            return True
-            
-        except Exception as e:
-            print(f"❌ Failed to send email to {to_email}: {e}")
-            return False
+        else:
+            print(f"❌ Failed to send email to {to_email}")
+        return success
+    
+    def send_emails(self, messages: List[Dict]) -> List[Dict]:
+        """
+        Send a batch of {'to', 'subject', 'body'} emails concurrently.
+        Returns one {'to', 'success'} result per message, in order, with the
+        'error' of each failed send.
+        """
+        if not self.email_user or not self.email_password:
+            print("⚠️  Email credentials not configured")
+            return [{'to': m['to'], 'success': False, 'error': 'Email credentials not configured'}
+                    for m in messages]
+        
+        mime_messages = [self.build_email(m['to'], m['subject'], m['body']) for m in messages]
+        results = self._sender().send_many(mime_messages)
+        print(f"✅ Sent {sum(r['success'] for r in results)}/{len(results)} emails")
+        return results
     
     def run_lead_generation_campaign(self, 
                                     instagram_hashtags: List[str] = None,
                                     linkedin_keywords: List[str] = None,
                                     max_leads: int = 100,
-                                    auto_outreach: bool = False):
+                                    auto_outreach: bool = False,
+                                    incremental: bool = False,
+                                    on_progress: Optional[Callable[[str, Dict], None]] = None,
+                                    sources: Optional[List[str]] = None):
         """
         Run complete lead generation campaign.
+        With incremental=True, posts older than each hashtag/keyword's stored
+        high-water mark and leads seen by earlier campaigns are skipped before
+        qualification and email lookup.
+        `sources` names the lead source plugins to search (see lead_sources.py);
+        by default the built-in Instagram and LinkedIn searches.
+        on_progress(event, data) receives partial results as each stage finishes:
+        'search', 'qualified', one 'lead' per qualified lead after its email
+        lookup, and 'outreach'.
+        Each stage runs in a tracing span, recorded when the caller holds a
+        tracing.trace() (as the job workers do).
         """
+        progress = on_progress or (lambda event, data: None)
         print("\n" + "="*60)
         print("🎨 COLLIDE AI - Lead Generation Campaign")
         print("="*60 + "\n")
         
+        campaign_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
         all_leads = []
-        
-        # Instagram search
-        if instagram_hashtags:
-            instagram_leads = self.search_instagram_leads(instagram_hashtags, max_leads//2)
-            all_leads.extend(instagram_leads)
-        
-        # LinkedIn search
-        if linkedin_keywords:
-            linkedin_leads = self.search_linkedin_leads(linkedin_keywords, max_results=max_leads//2)
-            all_leads.extend(linkedin_leads)
+        tracker = IncrementalTracker() if incremental else None
+        
+        # Search every selected source concurrently (hashtags for Instagram, keywords for LinkedIn)
+        searches = []
+        for source in select_sources(sources, generator=self):
+            queries = instagram_hashtags if source.platform == 'instagram' else linkedin_keywords
+            if not queries:
+                continue
+            if not source.available():
+                print(f"⚠️  {source.name} is not configured; it will return demo data")
+            since = None
+            if tracker and SINCE in source.capabilities:
+                since = {query: tracker.since(source.name, query) for query in queries}
+            searches.append((source, queries, max_leads//2, since))
+        
+        with tracing.span('search', sources=len(searches)) as stage:
+            for (source, *_), leads in zip(searches, search_all(searches)):
+                if tracker:
+                    leads = tracker.new_items(source.name, leads)
+                all_leads.extend(leads)
+                progress('search', {'source': source.name, 'platform': source.platform, 'found': len(leads)})
+            stage.set(found=len(all_leads))
         
         print(f"\n📊 Total leads found: {len(all_leads)}")
         
+        skipped_known = 0
+        if tracker:
+            with tracing.span('dedup', leads=len(all_leads)) as stage:
+                all_leads, skipped_known = tracker.drop_known(all_leads)
+                stage.set(skipped_known=skipped_known, skipped_old=tracker.skipped_old)
+            print(f"⏭️  Skipped {skipped_known} known leads and {tracker.skipped_old} old posts")
+        
         # Qualify leads
         print("\n🎯 Qualifying leads...")
         qualified = []
-        for lead in all_leads:
-            qualified_lead = self.qualify_lead(lead)
-            if qualified_lead['qualified']:
-                qualified.append(qualified_lead)
-                print(f"✅ {qualified_lead['name']} - Score: {qualified_lead['qualification_score']}")
+        with tracing.span('qualify', leads=len(all_leads)) as stage:
+            for lead in all_leads:
+                qualified_lead = self.qualify_lead(lead)
+                if qualified_lead['qualified']:
+                    qualified.append(qualified_lead)
+                    print(f"✅ {qualified_lead['name']} - Score: {qualified_lead['qualification_score']}")
+            stage.set(qualified=len(qualified))
         
         print(f"\n✨ Qualified leads: {len(qualified)}/{len(all_leads)}")
         
         # Sort by score
         qualified.sort(key=lambda x: x['qualification_score'], reverse=True)
+        progress('qualified', {'campaign_id': campaign_id, 'total_found': len(all_leads),
+                               'skipped_known': skipped_known, 'qualified': len(qualified)})
         
-        # Find emails
+        # Find emails, highest-scored leads first while the Hunter budget lasts
         print("\n📧 Finding email addresses...")
-        for lead in qualified:
-            if lead.get('website'):
-                domain = lead['website'].replace('http://', '').replace('https://', '').replace('www.', '').split('/')[0]
-                email = self.find_email(lead['name'], lead.get('company', ''), domain)
-                lead['email'] = email
-                if email:
-                    print(f"✉️  {lead['name']}: {email}")
+        lookups = [lead for lead in qualified if lead.get('website')]
+        deferred = []
+        with tracing.span('email_find') as stage:
+            if self.hunter_api_key:
+                lookups, deferred = get_quota_manager().prioritize(lookups, 'hunter')
+                if deferred:
+                    print(f"⏸️  Hunter.io budget covers {len(lookups)} lookups; deferring {len(deferred)} leads")
+                for lead in deferred:
+                    lead['email_deferred'] = True
+            funded = {id(lead) for lead in lookups}
+            for lead in qualified:
+                if id(lead) in funded:
+                    domain = normalize_domain(lead['website'])
+                    email = self.find_email(lead['name'], lead.get('company', ''), domain)
+                    lead['email'] = email
+                    if email:
+                        print(f"✉️  {lead['name']}: {email}")
+                progress('lead', lead)
+            stage.set(lookups=len(lookups), deferred=len(deferred),
+                      found=sum(1 for lead in qualified if lead.get('email')))
         
         # Auto outreach (if enabled)
         if auto_outreach:
-            print("\n📤 Starting outreach campaign...")
-            for lead in qualified[:10]:  # Limit to top 10 for demo
-                if lead.get('email'):
-                    message_data = self.generate_personalized_message(lead, 'email')
-                    success = self.send_email(
-                        lead['email'],
-                        message_data['subject'],
-                        message_data['body']
-                    )
-                    
+            print("\n📤 Queueing outreach campaign...")
+            with tracing.span('outreach') as stage:
+                outreach_leads = [lead for lead in qualified[:10] if lead.get('email')]  # Limit to top 10 for demo
+                messages = [
+                    {'to': lead['email'], 'subject': rendered['subject'], 'body': rendered['body'], 'lead': lead}
+                    for lead, rendered in zip(outreach_leads, get_templates().render_batch(outreach_leads, 'email'))
+                ]
+                
+                # Delivery happens in scripts/outbox_worker.py
+                outbox.init_outbox()
+                for lead, queued in zip(outreach_leads, outbox.enqueue_messages(messages, campaign_id)):
                     self.outreach_log.append({
                         'lead': lead['name'],
                         'email': lead['email'],
                         'platform': lead['platform'],
-                        'sent_at': datetime.now().isoformat(),
-                        'success': success
+                        'queued_at': datetime.now().isoformat(),
+                        'message_id': queued['id'],
+                        'status': queued['status']
                     })
+                stage.set(queued=len(self.outreach_log))
+            progress('outreach', {'queued': len(self.outreach_log)})
         
         # Save results
-        self.save_campaign_results(qualified)
+        with tracing.span('save', leads=len(qualified)):
+            self.save_campaign_results(
+                qualified,
+                campaign_id=campaign_id,
+                total_found=len(all_leads),
+                params={
+                    'instagram_hashtags': instagram_hashtags or [],
+                    'linkedin_keywords': linkedin_keywords or [],
+                    'max_leads': max_leads,
+                    'auto_outreach': auto_outreach,
+                    'incremental': incremental,
+                    'sources': [source.name for source, *_ in searches]
+                }
+            )
+            if tracker:
+                tracker.commit()
         
         return {
+            'campaign_id': campaign_id,
             'total_found': len(all_leads),
+            'skipped_known': skipped_known,
             'qualified': len(qualified),
             'top_leads': qualified[:20],
-            'outreach_sent': len(self.outreach_log)
+            'outreach_sent': len(self.outreach_log)  # queued in the outbox
         }
     
-    def save_campaign_results(self, leads: List[Dict]):
-        """Save campaign results to JSON file."""
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"leads_campaign_{timestamp}.json"
-        
-        results = {
-            'campaign_date': datetime.now().isoformat(),
-            'total_qualified_leads': len(leads),
-            'leads': leads,
-            'outreach_log': self.outreach_log
-        }
-        
-        with open(filename, 'w') as f:
-            json.dump(results, f, indent=2)
-        
-        print(f"\n💾 Results saved to: {filename}")
-        return filename
+    def save_campaign_results(self, leads: List[Dict], campaign_id: Optional[str] = None,
+                              total_found: Optional[int] = None, params: Optional[Dict] = None) -> str:
+        """Save campaign results to the campaign store. Returns the campaign id."""
+        campaign_id = campaign_id or f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        
+        CampaignStore().save_campaign(
+            campaign_id,
+            leads,
+            outreach_log=self.outreach_log,
+            total_found=total_found,
+            params=params
+        )
+        
+        print(f"\n💾 Results saved to campaign store: {campaign_id}")
+        return campaign_id
     
-    def export_to_csv(self, leads: List[Dict], filename: str = "leads.csv"):
-        """Export leads to CSV for CRM import."""
-        import csv
-        
-        if not leads:
+    def export_to_csv(self, leads: Iterable[Dict], filename: str = "leads.csv"):
+        """
+        Export leads to CSV for CRM import.
+        `leads` may be any iterable (e.g. CampaignStore().iter_leads()); a
+        .csv.gz or .parquet filename selects that format instead.
+        """
+        leads = iter(leads)
+        first = next(leads, None)
+        if first is None:
             print("No leads to export")
             return
         
-        with open(filename, 'w', newline='') as f:
-            fieldnames = ['name', 'company', 'email', 'platform', 'industry', 
-                         'website', 'qualification_score', 'title', 'location']
-            writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore')
-            
-            writer.writeheader()
-            for lead in leads:
-                writer.writerow(lead)
+        counted = _CountingIterator(itertools.chain([first], leads))
+        lead_export.write_export(counted, filename)
         
-        print(f"📊 Exported {len(leads)} leads to {filename}")
+        print(f"📊 Exported {counted.count} leads to {filename}")
+
+
+class _CountingIterator:
+    """Iterator wrapper that counts the items passed through it."""
+    
+    def __init__(self, iterable):
+        self._iterator = iter(iterable)
+        self.count = 0
+    
+    def __iter__(self):
+        return self
+    
+    def __next__(self):
+        item = next(self._iterator)
+        self.count += 1
+        return item
 
 
 def main():
@@ -462,7 +448,7 @@ def main():
     print("="*60)
     print(f"Total Leads Found: {results['total_found']}")
     print(f"Qualified Leads: {results['qualified']}")
-    print(f"Outreach Sent: {results['outreach_sent']}")
+    print(f"Outreach Queued: {results['outreach_sent']}")
     
     print("\n🏆 TOP 5 LEADS:")
     for i, lead in enumerate(results['top_leads'][:5], 1):
@@ -11,6 +11,12 @@ from datetime import datetime
 from typing import List, Dict, Optional
 import logging
 
+from lead_rules import get_ruleset
+from quota import get_quota_manager
+from campaign_store import normalize_domain
+import metrics
+import tracing
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -42,15 +48,46 @@ class LeadGeneratorPro:
         # Email configuration
         self.email_user = os.getenv('EMAIL_USER', '')
         self.email_password = os.getenv('EMAIL_PASSWORD', '')
-        
-        # Target industries
-        self.target_industries = ['fashion', 'beauty', 'lifestyle', 'design', 'sustainable', 'wellness']
     
+    @property
+    def target_industries(self) -> List[str]:
+        """Target industries from the shared qualification ruleset."""
+        return get_ruleset().target_industries
+    
+    @property
+    def quota(self):
+        """Shared per-provider quota manager (usage counters + token buckets)."""
+        return get_quota_manager()
+    
+    def _request(self, provider: str, method: str, url: str, **kwargs) -> Optional[requests.Response]:
+        """
+        Call a provider through its quota: waits for a rate-limit token, records
+        usage and rate-limit headers, and returns None without calling when the
+        billing window's budget is spent.
+        """
+        if not self.quota.acquire(provider):
+            logger.warning(f"Skipping {provider} call to {url}: quota exhausted")
+            return None
+        with metrics.track(provider, 'request'), tracing.span(provider, method=method) as call:
+            response = requests.request(method, url, **kwargs)
+            call.set(status=response.status_code)
+        if response.status_code >= 400:
+            metrics.record_error(provider, 'request')
+        self.quota.record(provider, response.status_code, response.headers)
+        return response
+    
+    
+    def qualify_lead(self, lead: Dict) -> Dict:
+        """Score and qualify a lead with the same ruleset as LeadGenerator."""
+        return get_ruleset().qualify(lead)
     
-    def search_instagram_rapidapi(self, hashtag: str, max_results: int = 50) -> List[Dict]:
+    
+    def search_instagram_rapidapi(self, hashtag: str, max_results: int = 50,
+                                  since: Optional[float] = None) -> List[Dict]:
         """
         Search Instagram using RapidAPI scraper.
         Requires RAPIDAPI_KEY in environment.
+        `since` (epoch seconds) drops posts at or before an incremental high-water mark.
         """
         if not self.rapidapi_key:
             logger.warning("No RapidAPI key found. Using demo data.")
@@ -69,11 +106,13 @@ class LeadGeneratorPro:
             }
             
             logger.info(f"Searching Instagram for #{hashtag} via RapidAPI...")
-            response = requests.get(url, headers=headers, params=params, timeout=30)
+            response = self._request('rapidapi_instagram', 'GET', url, headers=headers, params=params, timeout=30)
             
+            if response is None:
+                return []
             if response.status_code == 200:
                 data = response.json()
-                leads = self._parse_instagram_response(data, hashtag)
+                leads = self._newer_than(self._parse_instagram_response(data, hashtag), since)
                 logger.info(f"Found {len(leads)} Instagram leads for #{hashtag}")
                 return leads
             else:
@@ -85,10 +124,12 @@ class LeadGeneratorPro:
             return []
     
     
-    def search_instagram_apify(self, hashtag: str, max_results: int = 50) -> List[Dict]:
+    def search_instagram_apify(self, hashtag: str, max_results: int = 50,
+                               since: Optional[float] = None) -> List[Dict]:
         """
         Search Instagram using Apify Instagram Hashtag Scraper.
         Requires APIFY_API_TOKEN in environment.
+        `since` (epoch seconds) drops posts at or before an incremental high-water mark.
         """
         if not self.apify_token:
             logger.warning("No Apify token found. Using demo data.")
@@ -109,8 +150,11 @@ class LeadGeneratorPro:
             }
             
             logger.info(f"Starting Apify Instagram scraper for #{hashtag}...")
-            response = requests.post(url, headers=headers, json=payload, params={"token": self.apify_token})
+            response = self._request('apify', 'POST', url, headers=headers, json=payload,
+                                     params={"token": self.apify_token})
             
+            if response is None:
+                return []
             if response.status_code == 201:
                 run_id = response.json()['data']['id']
                 
@@ -118,15 +162,19 @@ class LeadGeneratorPro:
                 for _ in range(30):  # Max 30 seconds
                     time.sleep(1)
                     status_url = f"https://api.apify.com/v2/acts/apify~instagram-hashtag-scraper/runs/{run_id}"
-                    status = requests.get(status_url, params={"token": self.apify_token})
+                    status = self._request('apify', 'GET', status_url, params={"token": self.apify_token})
                     
+                    if status is None:
+                        return []
                     if status.json()['data']['status'] == 'SUCCEEDED':
                         # Get results
                         dataset_id = status.json()['data']['defaultDatasetId']
                         results_url = f"https://api.apify.com/v2/datasets/{dataset_id}/items"
-                        results = requests.get(results_url, params={"token": self.apify_token})
+                        results = self._request('apify', 'GET', results_url, params={"token": self.apify_token})
+                        if results is None:
+                            return []
                         
-                        leads = self._parse_apify_response(results.json(), hashtag)
+                        leads = self._newer_than(self._parse_apify_response(results.json(), hashtag), since)
                         logger.info(f"Found {len(leads)} Instagram leads for #{hashtag}")
                         return leads
                 
@@ -164,8 +212,10 @@ class LeadGeneratorPro:
             }
             
             logger.info(f"Searching LinkedIn for '{keyword}' via RapidAPI...")
-            response = requests.get(url, headers=headers, params=params, timeout=30)
+            response = self._request('rapidapi_linkedin', 'GET', url, headers=headers, params=params, timeout=30)
             
+            if response is None:
+                return []
             if response.status_code == 200:
                 data = response.json()
                 leads = self._parse_linkedin_response(data, keyword)
@@ -199,9 +249,9 @@ class LeadGeneratorPro:
                 "api_key": self.hunter_api_key
             }
             
-            response = requests.get(url, params=params, timeout=10)
+            response = self._request('hunter', 'GET', url, params=params, timeout=10)
             
-            if response.status_code == 200:
+            if response is not None and response.status_code == 200:
                 data = response.json()
                 if data.get('data') and data['data'].get('email'):
                     email = data['data']['email']
@@ -216,6 +266,30 @@ class LeadGeneratorPro:
             return None
     
     
+    def find_emails_hunter(self, leads: List[Dict]) -> List[Dict]:
+        """
+        Look up emails for a batch of leads, highest qualification score first,
+        for as many as the remaining Hunter budget covers. Leads left over are
+        marked `email_deferred` so a later run (next billing window) can pick them up.
+        """
+        candidates = [lead for lead in leads if lead.get('website') or lead.get('company')]
+        funded, deferred = self.quota.prioritize(candidates, 'hunter')
+        if deferred:
+            logger.warning(f"Hunter budget covers {len(funded)} of {len(candidates)} lookups; "
+                           f"deferring the {len(deferred)} lowest-scored leads")
+        
+        for lead in funded:
+            if lead.get('website'):
+                domain = normalize_domain(lead['website'])
+            else:
+                domain = self._extract_domain_from_company(lead.get('company', ''))
+            if domain:
+                lead['email'] = self.find_email_hunter(domain, lead.get('first_name', ''), lead.get('last_name', ''))
+        for lead in deferred:
+            lead['email_deferred'] = True
+        return leads
+    
+    
     def _parse_instagram_response(self, data: Dict, hashtag: str) -> List[Dict]:
         """Parse RapidAPI Instagram response into lead format."""
         leads = []
@@ -235,6 +309,8 @@ class LeadGeneratorPro:
                 'engagement_rate': self._calculate_engagement_rate(post),
                 'recent_posts': post.get('edge_owner_to_timeline_media', {}).get('count', 0),
                 'hashtag': hashtag,
+                'post_id': post.get('id') or post.get('pk'),
+                'posted_at': self._post_timestamp(post.get('taken_at_timestamp') or post.get('taken_at')),
                 'source': 'rapidapi'
             }
             
@@ -258,6 +334,8 @@ class LeadGeneratorPro:
                 'engagement_rate': (item.get('likesCount', 0) / max(item.get('ownerFollowers', 1), 1)) * 100,
                 'recent_posts': 0,
                 'hashtag': hashtag,
+                'post_id': item.get('id'),
+                'posted_at': self._post_timestamp(item.get('timestamp')),
                 'source': 'apify'
             }
             
@@ -304,6 +382,27 @@ class LeadGeneratorPro:
         return leads
     
     
+    @staticmethod
+    def _post_timestamp(value) -> Optional[float]:
+        """Epoch seconds from a numeric timestamp or an ISO 8601 string."""
+        if value is None or value == '':
+            return None
+        if isinstance(value, (int, float)):
+            return float(value)
+        try:
+            return datetime.fromisoformat(str(value).replace('Z', '+00:00')).timestamp()
+        except ValueError:
+            return None
+    
+    
+    @staticmethod
+    def _newer_than(leads: List[Dict], since: Optional[float]) -> List[Dict]:
+        """Keep leads whose post is newer than `since` (or has no timestamp)."""
+        if since is None:
+            return leads
+        return [lead for lead in leads if lead.get('posted_at') is None or lead['posted_at'] > since]
+    
+    
     def _calculate_engagement_rate(self, post: Dict) -> float:
         """Calculate engagement rate from Instagram post data."""
         likes = post.get('edge_liked_by', {}).get('count', 0)
@@ -0,0 +1,324 @@
+"""
+COLLIDE AI - Lead Qualification Rules
+Declarative scoring ruleset shared by LeadGenerator and LeadGeneratorPro.
+
+The ruleset lives in lead_rules.json (or a YAML file when PyYAML is installed)
+and is compiled once into a list of small scoring functions. `get_ruleset()`
+re-checks the file's mtime every few seconds, so running workers pick up new
+thresholds without a restart.
+
+Dry run (re-score a stored campaign without writing anything):
+    python lead_rules.py leads_campaign_20251017_122541.json --rules new_rules.json
+    python lead_rules.py --campaign <campaign_id> --rules new_rules.json
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lead_rules.json')
+
+# How often (seconds) get_ruleset() stats the rules file for changes
+RELOAD_CHECK_SECONDS = 2.0
+
+
+class RulesetError(ValueError):
+    """Raised when a ruleset file is malformed."""
+
+
+def _number(lead: Dict, field: str):
+    return lead.get(field) or 0
+
+
+def _check(value, types, what: str):
+    """Return `value` if it is one of `types` (bools are not numbers), else raise RulesetError."""
+    if not isinstance(value, types) or (isinstance(value, bool) and bool not in types):
+        names = ' or '.join(t.__name__ for t in types)
+        raise RulesetError(f"{what} must be {names}, not {type(value).__name__}")
+    return value
+
+
+_NUMBER = (int, float)
+
+
+def _strings(value, what: str) -> List[str]:
+    return [_check(item, (str,), f"{what} items") for item in _check(value, (list,), what)]
+
+
+def _compile_tiers(rule: Dict) -> Callable:
+    field = _check(rule['field'], (str,), 'field')
+    tiers = []
+    for tier in _check(rule['tiers'], (list,), 'tiers'):
+        _check(tier, (dict,), 'tiers items')
+        tiers.append((_check(tier['min'], _NUMBER, 'min'), _check(tier['points'], _NUMBER, 'points'),
+                      _check(tier.get('reason', ''), (str,), 'reason')))
+    # Highest tier first so the first match is the best one
+    tiers.sort(key=lambda t: t[0], reverse=True)
+
+    def score(lead: Dict):
+        value = _number(lead, field)
+        for minimum, points, reason in tiers:
+            if value >= minimum:
+                return points, reason.format(value=value)
+        return 0, None
+
+    return score
+
+
+def _compile_above(rule: Dict) -> Callable:
+    field = _check(rule['field'], (str,), 'field')
+    limit = _check(rule['value'], _NUMBER, 'value')
+    points = _check(rule['points'], _NUMBER, 'points')
+    reason = _check(rule.get('reason', ''), (str,), 'reason')
+
+    def score(lead: Dict):
+        value = _number(lead, field)
+        if value > limit:
+            return points, reason.format(value=value)
+        return 0, None
+
+    return score
+
+
+def _compile_present(rule: Dict) -> Callable:
+    field = _check(rule['field'], (str,), 'field')
+    points = _check(rule['points'], _NUMBER, 'points')
+    reason = _check(rule.get('reason', ''), (str,), 'reason')
+
+    def score(lead: Dict):
+        if lead.get(field):
+            return points, reason
+        return 0, None
+
+    return score
+
+
+def _compile_keywords(rule: Dict, spec: Dict) -> Callable:
+    fields = _strings(rule.get('fields') or [rule['field']], 'fields')
+    keywords = rule['keywords']
+    if isinstance(keywords, str):
+        # Reference to a top-level list, e.g. "target_industries"
+        keywords = spec.get(keywords, [])
+    keywords = tuple(k.lower() for k in _strings(keywords, 'keywords'))
+    points = _check(rule['points'], _NUMBER, 'points')
+    reason = _check(rule.get('reason', ''), (str,), 'reason')
+
+    def score(lead: Dict):
+        text = ' '.join((lead.get(f) or '') for f in fields).lower()
+        for keyword in keywords:
+            if keyword in text:
+                return points, reason.format(keyword=keyword)
+        return 0, None
+
+    return score
+
+
+_COMPILERS = {
+    'tiers': lambda rule, spec: _compile_tiers(rule),
+    'above': lambda rule, spec: _compile_above(rule),
+    'present': lambda rule, spec: _compile_present(rule),
+    'keywords': _compile_keywords,
+}
+
+
+class Ruleset:
+    """
+    A compiled qualification ruleset.
+    Scoring a lead runs one precompiled function per rule and sums the points.
+    """
+
+    def __init__(self, spec: Dict, source: Optional[str] = None):
+        self.source = source
+        self.threshold = _check(spec.get('threshold', 50), _NUMBER, 'threshold')
+        self.target_industries = _strings(spec.get('target_industries', []), 'target_industries')
+        self.target_titles = _strings(spec.get('target_titles', []), 'target_titles')
+
+        self._rules = []
+        for i, rule in enumerate(_check(spec.get('rules', []), (list,), 'rules')):
+            if not isinstance(rule, dict):
+                raise RulesetError(f"Rule {i}: must be a mapping, not {type(rule).__name__}")
+            compiler = _COMPILERS.get(rule.get('type'))
+            if compiler is None:
+                raise RulesetError(f"Rule {i}: unknown type {rule.get('type')!r}")
+            try:
+                self._rules.append(compiler(rule, spec))
+            except KeyError as e:
+                raise RulesetError(f"Rule {i} ({rule['type']}): missing key {e}") from e
+            except RulesetError as e:
+                raise RulesetError(f"Rule {i} ({rule['type']}): {e}") from e
+
+    def score(self, lead: Dict) -> Tuple[int, List[str]]:
+        """Return (score, reasons) for a lead without modifying it."""
+        total = 0
+        reasons = []
+        for rule in self._rules:
+            points, reason = rule(lead)
+            if points:
+                total += points
+                if reason:
+                    reasons.append(reason)
+        return total, reasons
+
+    def qualify(self, lead: Dict) -> Dict:
+        """Score the lead in place and set qualification fields."""
+        score, reasons = self.score(lead)
+        lead['qualification_score'] = score
+        lead['qualification_reasons'] = reasons
+        lead['qualified'] = score >= self.threshold
+        return lead
+
+    def qualify_many(self, leads: List[Dict]) -> List[Dict]:
+        """Qualify a batch of leads in place."""
+        qualify = self.qualify
+        return [qualify(lead) for lead in leads]
+
+
+def load_ruleset(path: str) -> Ruleset:
+    """Read and compile a ruleset file (.json, or .yaml/.yml with PyYAML)."""
+    with open(path) as f:
+        if path.endswith(('.yaml', '.yml')):
+            if yaml is None:
+                raise RulesetError("PyYAML is not installed; cannot load YAML rules")
+            spec = yaml.safe_load(f)
+        else:
+            spec = json.load(f)
+
+    if not isinstance(spec, dict):
+        raise RulesetError(f"{path}: ruleset must be a mapping")
+    return Ruleset(spec, source=path)
+
+
+# path -> (mtime_ns, last_checked, ruleset)
+_cache: Dict[str, Tuple[int, float, Ruleset]] = {}
+_cache_lock = threading.Lock()
+
+
+def get_ruleset(path: Optional[str] = None) -> Ruleset:
+    """
+    Return the compiled ruleset for `path` (default: $LEAD_RULES_PATH or lead_rules.json).
+    The file is recompiled when its mtime changes; if a reload fails the previous
+    ruleset stays active so a bad edit cannot take workers down.
+    """
+    path = path or os.getenv('LEAD_RULES_PATH') or DEFAULT_RULES_PATH
+    now = time.monotonic()
+
+    entry = _cache.get(path)
+    if entry and now - entry[1] < RELOAD_CHECK_SECONDS:
+        return entry[2]
+
+    with _cache_lock:
+        entry = _cache.get(path)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+            if entry and entry[0] == mtime:
+                ruleset = entry[2]
+            else:
+                ruleset = load_ruleset(path)
+                if entry:
+                    logger.info(f"Reloaded lead rules from {path}")
+        except Exception as e:
+            # RulesetError covers malformed specs; anything else still must not replace a working ruleset
+            if not entry:
+                raise
+            logger.error(f"Failed to reload lead rules from {path}: {e}")
+            mtime, ruleset = entry[0], entry[2]
+
+        _cache[path] = (mtime, now, ruleset)
+        return ruleset
+
+
+def rescore_leads(leads: Iterable[Dict], ruleset: Optional[Ruleset] = None) -> Dict:
+    """
+    Dry run: re-score stored leads with `ruleset` and summarize what changes.
+    Leads are copied before scoring, so the input is left untouched.
+    """
+    ruleset = ruleset or get_ruleset()
+
+    total = 0
+    qualified_before = 0
+    qualified_after = 0
+    changed = []
+
+    for lead in leads:
+        total += 1
+        old_score = lead.get('qualification_score')
+        was_qualified = bool(lead.get('qualified'))
+        new = ruleset.qualify(dict(lead))
+
+        qualified_before += was_qualified
+        qualified_after += new['qualified']
+        if new['qualification_score'] != old_score or new['qualified'] != was_qualified:
+            changed.append({
+                'name': lead.get('name'),
+                'old_score': old_score,
+                'new_score': new['qualification_score'],
+                'qualified': new['qualified']
+            })
+
+    return {
+        'rules': ruleset.source,
+        'total': total,
+        'qualified_before': qualified_before,
+        'qualified_after': qualified_after,
+        'changed': changed
+    }
+
+
+def rescore_campaign_file(path: str, ruleset: Optional[Ruleset] = None) -> Dict:
+    """Dry run over a leads_campaign_*.json file."""
+    with open(path) as f:
+        data = json.load(f)
+    return {'file': path, **rescore_leads(data.get('leads', []), ruleset)}
+
+
+def rescore_campaign(campaign_id: str, ruleset: Optional[Ruleset] = None, store=None) -> Dict:
+    """Dry run over a campaign in the campaign store, streamed in chunks."""
+    from campaign_store import CampaignStore
+
+    store = store or CampaignStore()
+    return {'campaign_id': campaign_id, **rescore_leads(store.iter_leads(campaign_id=campaign_id), ruleset)}
+
+
+def main():
+    """Dry-run re-scoring of one or more campaign files."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Re-score stored campaigns without saving.')
+    parser.add_argument('files', nargs='*', help='leads_campaign_*.json files')
+    parser.add_argument('--campaign', action='append', default=[], help='Campaign id from the campaign store')
+    parser.add_argument('--rules', help='Ruleset file (default: $LEAD_RULES_PATH or lead_rules.json)')
+    parser.add_argument('--show', type=int, default=10, help='Number of changed leads to list per campaign')
+    args = parser.parse_args()
+    if not args.files and not args.campaign:
+        parser.error('give at least one campaign file or --campaign id')
+
+    ruleset = load_ruleset(args.rules) if args.rules else get_ruleset()
+
+    jobs = [(path, lambda path=path: rescore_campaign_file(path, ruleset)) for path in args.files]
+    jobs += [(cid, lambda cid=cid: rescore_campaign(cid, ruleset)) for cid in args.campaign]
+
+    for label, run in jobs:
+        start = time.perf_counter()
+        summary = run()
+        elapsed = time.perf_counter() - start
+
+        print(f"\n📊 {label} ({summary['total']} leads, {elapsed * 1000:.1f} ms)")
+        print(f"   Qualified: {summary['qualified_before']} → {summary['qualified_after']}")
+        print(f"   Changed:   {len(summary['changed'])}")
+        for item in summary['changed'][:args.show]:
+            print(f"   • {item['name']}: {item['old_score']} → {item['new_score']}"
+                  f"{' ✅' if item['qualified'] else ''}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,415 @@
+"""Lead source plugins.
+
+A LeadSource turns search queries (hashtags or keywords) into normalized lead
+dicts, streamed as an async iterator so slow providers can be searched
+concurrently and huge synthetic sources never sit in memory at once. Each
+source declares its platform, capabilities and cost per call (provider calls
+per query, as counted by the quota manager), and registers itself by name.
+
+Campaigns choose sources by name (`sources=[...]` or $LEAD_SOURCES); the
+default is the built-in sample search, so existing campaigns behave as before.
+
+Registered sources:
+    instagram, linkedin                    built-in sample search (LeadGenerator)
+    rapidapi_instagram, apify_instagram,
+    rapidapi_linkedin                      live APIs via LeadGeneratorPro
+    fixture_instagram, fixture_linkedin    recorded provider responses (fixtures/)
+    synthetic, synthetic_linkedin          generated leads at a configurable latency
+
+Extra options for a source are given as "name:key=value,key=value", e.g.
+"synthetic:count=1000000,latency=0.05".
+"""
+import os
+import json
+import random
+import asyncio
+from typing import (AsyncIterator, Callable, Dict, FrozenSet, Iterable, List, Optional, Protocol, Sequence,
+                    runtime_checkable)
+
+import tracing
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+DEFAULT_SOURCES = ['instagram', 'linkedin']
+
+# Capabilities a source may declare
+SINCE = 'since'        # honours incremental high-water marks (`since`)
+EMAIL = 'email'        # leads may already carry an email address
+OFFLINE = 'offline'    # no network access; safe for tests and benchmarks
+
+
+@runtime_checkable
+class LeadSource(Protocol):
+    name: str
+    platform: str
+    capabilities: FrozenSet[str]
+    cost_per_call: float
+
+    def available(self) -> bool:
+        """False when the source is missing credentials and would fall back to demo data."""
+
+    def search(self, queries: Sequence[str], max_results: int,
+               since: Optional[Dict[str, float]] = None) -> AsyncIterator[Dict]:
+        """Yield normalized leads for `queries`, at most `max_results` in total."""
+
+
+_REGISTRY: Dict[str, Callable[..., LeadSource]] = {}
+
+
+def register(name: str):
+    """Class/factory decorator adding a source to the registry under `name`."""
+    def decorator(factory):
+        _REGISTRY[name] = factory
+        return factory
+    return decorator
+
+
+def registered_sources() -> List[str]:
+    return sorted(_REGISTRY)
+
+
+def _parse_option(value: str):
+    for cast in (int, float):
+        try:
+            return cast(value)
+        except ValueError:
+            pass
+    return value
+
+
+def get_source(spec: str, **options) -> LeadSource:
+    """Instantiate a registered source from "name" or "name:key=value,..." (plus keyword options)."""
+    name, _, option_text = spec.partition(':')
+    if name not in _REGISTRY:
+        raise KeyError(f"Unknown lead source {name!r}; registered: {', '.join(registered_sources())}")
+    for pair in filter(None, option_text.split(',')):
+        key, _, value = pair.partition('=')
+        options.setdefault(key.strip(), _parse_option(value.strip()))
+    return _REGISTRY[name](**options)
+
+
+def select_sources(names: Optional[Iterable[str]] = None, require: Iterable[str] = (),
+                   generator=None) -> List[LeadSource]:
+    """
+    Sources for a campaign: `names`, else $LEAD_SOURCES (comma separated), else
+    DEFAULT_SOURCES. Sources lacking a capability in `require` are dropped.
+    The built-in sample sources search through `generator` when one is given.
+    """
+    if not names:
+        names = [n.strip() for n in os.getenv('LEAD_SOURCES', '').split(',') if n.strip()] or DEFAULT_SOURCES
+    required = set(require)
+
+    sources = []
+    for name in names:
+        factory = _REGISTRY.get(name.partition(':')[0])
+        builtin = isinstance(factory, type) and issubclass(factory, _BuiltinSource)
+        source = get_source(name, generator=generator) if builtin and generator is not None else get_source(name)
+        if required <= source.capabilities:
+            sources.append(source)
+    return sources
+
+
+def _per_query(max_results: int, queries: Sequence[str]) -> int:
+    return max(1, max_results // max(len(queries), 1))
+
+
+class _SyncSource:
+    """Base for sources wrapping a blocking search function; each call runs in a worker thread."""
+
+    name = ''
+    platform = ''
+    capabilities: FrozenSet[str] = frozenset()
+    cost_per_call = 0.0
+
+    def available(self) -> bool:
+        return True
+
+    def _search(self, query: str, max_results: int, since: Optional[float]) -> List[Dict]:
+        raise NotImplementedError
+
+    async def search(self, queries, max_results, since=None):
+        per_query = _per_query(max_results, queries)
+        calls = [asyncio.to_thread(self._search, query, per_query, (since or {}).get(query)) for query in queries]
+        emitted = 0
+        for leads in await asyncio.gather(*calls):
+            for lead in leads:
+                if emitted >= max_results:
+                    return
+                emitted += 1
+                yield lead
+
+
+class _BuiltinSource(_SyncSource):
+    """The sample search methods on LeadGenerator (one call covers every query)."""
+
+    capabilities = frozenset({OFFLINE})
+
+    def __init__(self, generator=None):
+        self._generator = generator
+
+    @property
+    def generator(self):
+        if self._generator is None:
+            from lead_gen import LeadGenerator
+            self._generator = LeadGenerator()
+        return self._generator
+
+    async def search(self, queries, max_results, since=None):
+        leads = await asyncio.to_thread(self._search_all, list(queries), max_results)
+        for lead in leads:
+            yield lead
+
+
+@register('instagram')
+class InstagramSampleSource(_BuiltinSource):
+    name = 'instagram'
+    platform = 'instagram'
+
+    def _search_all(self, queries, max_results):
+        return self.generator.search_instagram_leads(queries, max_results)
+
+
+@register('linkedin')
+class LinkedInSampleSource(_BuiltinSource):
+    name = 'linkedin'
+    platform = 'linkedin'
+
+    def _search_all(self, queries, max_results):
+        return self.generator.search_linkedin_leads(queries, max_results=max_results)
+
+
+class _ProSource(_SyncSource):
+    """A LeadGeneratorPro provider method; its calls are metered by the quota manager."""
+
+    credential = ''
+
+    def __init__(self, generator=None):
+        if generator is None:
+            from lead_gen_pro import LeadGeneratorPro
+            generator = LeadGeneratorPro()
+        self.generator = generator
+
+    def available(self) -> bool:
+        return bool(getattr(self.generator, self.credential))
+
+
+@register('rapidapi_instagram')
+class RapidAPIInstagramSource(_ProSource):
+    name = 'rapidapi_instagram'
+    platform = 'instagram'
+    capabilities = frozenset({SINCE})
+    cost_per_call = 1.0
+    credential = 'rapidapi_key'
+
+    def _search(self, query, max_results, since):
+        return self.generator.search_instagram_rapidapi(query.lstrip('#'), max_results, since=since)
+
+
+@register('apify_instagram')
+class ApifyInstagramSource(_ProSource):
+    name = 'apify_instagram'
+    platform = 'instagram'
+    capabilities = frozenset({SINCE})
+    cost_per_call = 3.0  # start run, poll status, fetch dataset
+    credential = 'apify_token'
+
+    def _search(self, query, max_results, since):
+        return self.generator.search_instagram_apify(query.lstrip('#'), max_results, since=since)
+
+
+@register('rapidapi_linkedin')
+class RapidAPILinkedInSource(_ProSource):
+    name = 'rapidapi_linkedin'
+    platform = 'linkedin'
+    capabilities = frozenset({EMAIL})
+    cost_per_call = 1.0
+    credential = 'rapidapi_key'
+
+    def _search(self, query, max_results, since):
+        return self.generator.search_linkedin_rapidapi(query, max_results)
+
+
+class FixtureSource:
+    """
+    Replays recorded provider responses from a fixture file through the same
+    parsers as the live source, so normalization is exercised offline.
+
+    Fixture format: {"provider": "rapidapi_instagram", "responses": {"<query>": <raw response>}};
+    a "*" response answers queries that were not recorded.
+    """
+
+    capabilities = frozenset({SINCE, OFFLINE})
+    cost_per_call = 0.0
+
+    _PARSERS = {
+        'rapidapi_instagram': ('instagram', '_parse_instagram_response'),
+        'apify_instagram': ('instagram', '_parse_apify_response'),
+        'rapidapi_linkedin': ('linkedin', '_parse_linkedin_response'),
+    }
+
+    def __init__(self, path: str, latency: float = 0.0, name: Optional[str] = None):
+        from lead_gen_pro import LeadGeneratorPro
+
+        with open(path) as f:
+            fixture = json.load(f)
+        self.provider = fixture['provider']
+        self.platform, parser_name = self._PARSERS[self.provider]
+        self.responses = fixture['responses']
+        self.latency = latency
+        self.name = name or f"fixture_{self.platform}"
+
+        # Parsers may enrich leads through Hunter; a replay must never go online
+        self._parser = LeadGeneratorPro()
+        self._parser.hunter_api_key = ''
+        self._parse = getattr(self._parser, parser_name)
+
+    def available(self) -> bool:
+        return True
+
+    async def search(self, queries, max_results, since=None):
+        per_query = _per_query(max_results, queries)
+        emitted = 0
+        for query in queries:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            response = self.responses.get(query.lstrip('#'), self.responses.get('*'))
+            if response is None:
+                continue
+            leads = self._parser._newer_than(self._parse(response, query), (since or {}).get(query))
+            for lead in leads[:per_query]:
+                if emitted >= max_results:
+                    return
+                emitted += 1
+                yield lead
+
+
+@register('fixture_instagram')
+def fixture_instagram(path: Optional[str] = None, latency: float = 0.0) -> FixtureSource:
+    return FixtureSource(path or os.path.join(FIXTURE_DIR, 'rapidapi_instagram.json'), latency)
+
+
+@register('fixture_linkedin')
+def fixture_linkedin(path: Optional[str] = None, latency: float = 0.0) -> FixtureSource:
+    return FixtureSource(path or os.path.join(FIXTURE_DIR, 'rapidapi_linkedin.json'), latency)
+
+
+_BRAND_WORDS = ['sustainable', 'clean', 'eco', 'studio', 'atelier', 'glow', 'bloom', 'slow', 'green', 'nova',
+                'luxe', 'pure', 'wild', 'kind', 'maison', 'lumiere', 'terra', 'botanic', 'urban', 'coast']
+_BRAND_NOUNS = ['beauty', 'fashion', 'skincare', 'style', 'wear', 'design', 'living', 'goods', 'lab', 'collective']
+_FIRST_NAMES = ['Sarah', 'Emma', 'Maya', 'Sofia', 'Alex', 'Priya', 'Chloe', 'Nina', 'Grace', 'Leah',
+                'Olivia', 'Ava', 'Mia', 'Zoe', 'Hana', 'Iris', 'Jade', 'Lina', 'Ruby', 'Tess']
+_LAST_NAMES = ['Chen', 'Rodriguez', 'Patel', 'Martinez', 'Johnson', 'Kim', 'Nguyen', 'Garcia', 'Silva', 'Okafor']
+_INDUSTRIES = ['beauty', 'fashion', 'lifestyle', 'design', 'wellness', 'home decor', 'jewelry', 'food']
+_TITLES = ['Founder', 'Co-Founder', 'CEO', 'Creative Director', 'Brand Manager', 'Marketing Director',
+           'Owner', 'Designer', 'Operations Lead']
+_LOCATIONS = ['New York, NY', 'Los Angeles, CA', 'London, UK', 'Austin, TX', 'Toronto, ON', 'Berlin, DE']
+
+
+@register('synthetic')
+class SyntheticSource:
+    """
+    Deterministic generated leads for load tests and benchmarks. Leads are made
+    lazily in pages of `page_size`; each page costs `latency` seconds, like one
+    provider call. `count` caps the total (default: `max_results`), so a source
+    can stream millions of leads without holding them in memory.
+    """
+
+    name = 'synthetic'
+    capabilities = frozenset({SINCE, EMAIL, OFFLINE})
+    cost_per_call = 0.0
+
+    def __init__(self, platform: str = 'instagram', count: Optional[int] = None, latency: float = 0.0,
+                 page_size: int = 500, seed: int = 0, email_rate: float = 0.3):
+        self.platform = platform
+        self.count = count
+        self.latency = float(latency)
+        self.page_size = int(page_size)
+        self.seed = seed
+        self.email_rate = email_rate
+        if platform != 'instagram':
+            self.name = f'synthetic_{platform}'
+
+    def available(self) -> bool:
+        return True
+
+    def make_lead(self, rng: random.Random, index: int, query: str) -> Dict:
+        brand = f"{rng.choice(_BRAND_WORDS)}{rng.choice(_BRAND_NOUNS)}{index}"
+        first, last = rng.choice(_FIRST_NAMES), rng.choice(_LAST_NAMES)
+        domain = f"{brand}.com"
+        lead = {
+            'platform': self.platform,
+            'industry': rng.choice(_INDUSTRIES),
+            'website': f"https://{domain}" if rng.random() < 0.8 else '',
+            'posted_at': 1.7e9 + index * 60,
+            'source': 'synthetic',
+        }
+        if self.platform == 'instagram':
+            followers = int(rng.lognormvariate(9, 1.2))
+            lead.update({
+                'name': brand,
+                'username': f"@{brand}",
+                'profile_url': f"https://instagram.com/{brand}",
+                'followers': followers,
+                'engagement_rate': round(rng.uniform(0.5, 9.0), 2),
+                'recent_posts': rng.randint(0, 40),
+                'bio': f"{rng.choice(_TITLES)} of a {lead['industry']} brand | {query}",
+                'hashtag': query,
+                'post_id': f"syn{self.seed}-{index}",
+            })
+        else:
+            lead.update({
+                'name': f"{first} {last}",
+                'first_name': first,
+                'last_name': last,
+                'profile_url': f"https://linkedin.com/in/{first.lower()}-{last.lower()}-{index}",
+                'title': rng.choice(_TITLES),
+                'company': brand.title(),
+                'location': rng.choice(_LOCATIONS),
+                'connections': rng.randint(50, 3000),
+                'keyword': query,
+            })
+        if rng.random() < self.email_rate:
+            lead['email'] = f"{first.lower()}@{domain}"
+        return lead
+
+    async def search(self, queries, max_results, since=None):
+        queries = list(queries) or ['search']
+        total = min(max_results, self.count) if self.count is not None else max_results
+        rng = random.Random(self.seed)
+        index = 0
+        while index < total:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            for _ in range(min(self.page_size, total - index)):
+                query = queries[index % len(queries)]
+                lead = self.make_lead(rng, index, query)
+                index += 1
+                mark = (since or {}).get(query)
+                if mark is None or lead['posted_at'] > mark:
+                    yield lead
+            # Let other sources run between pages
+            await asyncio.sleep(0)
+
+
+@register('synthetic_linkedin')
+def synthetic_linkedin(**options) -> SyntheticSource:
+    return SyntheticSource(platform='linkedin', **options)
+
+
+async def _collect(source: LeadSource, queries: Sequence[str], max_results: int,
+                   since: Optional[Dict[str, float]]) -> List[Dict]:
+    with tracing.span(source.name, platform=source.platform, queries=len(queries)) as span:
+        leads = [lead async for lead in source.search(queries, max_results, since)]
+        span.set(found=len(leads))
+    return leads
+
+
+def search_all(searches: Sequence[tuple]) -> List[List[Dict]]:
+    """
+    Run several (source, queries, max_results, since) searches concurrently and
+    return each one's leads, in order. For synchronous callers such as
+    LeadGenerator.run_lead_generation_campaign.
+    """
+    async def run():
+        return await asyncio.gather(*(_collect(*search) for search in searches))
+    return list(asyncio.run(run())) if searches else []
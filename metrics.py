@@ -0,0 +1,230 @@
+"""
+COLLIDE AI - Metrics
+Per-route request latency, in-flight requests, per-dependency timings
+(OpenAI, SQLite, Redis, SMTP, lead providers) and OpenAI token usage, served
+in the Prometheus text format on /metrics.
+
+prometheus_client is used when installed. With PROMETHEUS_MULTIPROC_DIR set
+(gunicorn.conf.py sets it) each worker writes its samples to that directory
+and any worker can answer a scrape with the totals for all of them. Without
+prometheus_client a small in-process registry renders the same metrics, which
+covers single-process servers such as `python app.py`.
+"""
+
+import os
+import time
+import threading
+from contextlib import contextmanager
+from functools import wraps
+from typing import Dict, Optional, Tuple
+
+try:
+    import prometheus_client
+    from prometheus_client import multiprocess
+except ImportError:
+    prometheus_client = None
+    multiprocess = None
+
+MULTIPROC_DIR = os.getenv('PROMETHEUS_MULTIPROC_DIR')
+if prometheus_client and MULTIPROC_DIR:
+    os.makedirs(MULTIPROC_DIR, exist_ok=True)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Seconds; spans sub-millisecond SQLite calls up to slow scraper and model calls
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_registry = []
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+class _Child:
+    """One labelled series of a fallback metric."""
+
+    def __init__(self, metric):
+        self._metric = metric
+        self.value = 0.0
+        self.sum = 0.0
+        self.buckets = [0] * len(metric.buckets)
+
+    def inc(self, amount: float = 1):
+        with self._metric._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1):
+        self.inc(-amount)
+
+    def set(self, value: float):
+        with self._metric._lock:
+            self.value = value
+
+    def observe(self, amount: float):
+        with self._metric._lock:
+            self.value += 1
+            self.sum += amount
+            for i, bound in enumerate(self._metric.buckets):
+                if amount <= bound:
+                    self.buckets[i] += 1
+
+
+class _Metric:
+    """In-process counter, gauge or histogram with the prometheus_client labels() API."""
+
+    def __init__(self, kind: str, name: str, documentation: str, labelnames=(), buckets=()):
+        self.kind = kind
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets) + (float('inf'),) if kind == 'histogram' else ()
+        self._children: Dict[Tuple[str, ...], _Child] = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def labels(self, *values, **kwargs) -> _Child:
+        if kwargs:
+            values = tuple(kwargs[name] for name in self.labelnames)
+        key = tuple(str(v) for v in values)
+        with self._lock:
+            child = self._children.get(key)
+            if child is None:
+                child = self._children[key] = _Child(self)
+        return child
+
+    def render(self):
+        yield f'# HELP {self.name} {self.documentation}'
+        yield f'# TYPE {self.name} {self.kind}'
+        with self._lock:
+            children = [(key, child.value, child.sum, list(child.buckets)) for key, child in self._children.items()]
+        for key, value, total, buckets in children:
+            pairs = [f'{name}="{_escape(v)}"' for name, v in zip(self.labelnames, key)]
+            if self.kind != 'histogram':
+                yield f'{self.name}{{{",".join(pairs)}}} {_format_value(value)}'
+                continue
+            for bound, count in zip(self.buckets, buckets):
+                labels = ','.join(pairs + [f'le="{_format_value(bound)}"'])
+                yield f'{self.name}_bucket{{{labels}}} {_format_value(count)}'
+            yield f'{self.name}_sum{{{",".join(pairs)}}} {_format_value(total)}'
+            yield f'{self.name}_count{{{",".join(pairs)}}} {_format_value(value)}'
+
+
+def _counter(name, documentation, labelnames):
+    if prometheus_client:
+        return prometheus_client.Counter(name, documentation, labelnames)
+    return _Metric('counter', name, documentation, labelnames)
+
+
+def _gauge(name, documentation, labelnames):
+    if prometheus_client:
+        return prometheus_client.Gauge(name, documentation, labelnames, multiprocess_mode='livesum')
+    return _Metric('gauge', name, documentation, labelnames)
+
+
+def _histogram(name, documentation, labelnames):
+    if prometheus_client:
+        return prometheus_client.Histogram(name, documentation, labelnames, buckets=LATENCY_BUCKETS)
+    return _Metric('histogram', name, documentation, labelnames, LATENCY_BUCKETS)
+
+
+REQUEST_DURATION = _histogram('http_request_duration_seconds', 'HTTP request latency by route',
+                              ['method', 'route', 'status'])
+REQUESTS_IN_FLIGHT = _gauge('http_requests_in_flight', 'HTTP requests being served', ['method', 'route'])
+DEPENDENCY_DURATION = _histogram('dependency_duration_seconds', 'Time spent in calls to external dependencies',
+                                 ['dependency', 'operation'])
+DEPENDENCY_ERRORS = _counter('dependency_errors_total', 'Failed calls to external dependencies',
+                             ['dependency', 'operation'])
+OPENAI_TOKENS = _counter('openai_tokens_total', 'OpenAI tokens used, from response usage', ['model', 'kind'])
+
+
+@contextmanager
+def track(dependency: str, operation: str):
+    """Time a dependency call; exceptions are counted as errors and re-raised."""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        DEPENDENCY_ERRORS.labels(dependency, operation).inc()
+        raise
+    finally:
+        DEPENDENCY_DURATION.labels(dependency, operation).observe(time.perf_counter() - start)
+
+
+def timed(dependency: str, operation: Optional[str] = None):
+    """Decorator form of track(); the operation defaults to the function name."""
+    def decorator(func):
+        name = operation or func.__name__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with track(dependency, name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def record_error(dependency: str, operation: str):
+    """Count a failure that did not raise, e.g. an HTTP 429 from a provider."""
+    DEPENDENCY_ERRORS.labels(dependency, operation).inc()
+
+
+def record_openai_usage(model: str, usage):
+    """Add the prompt/completion token counts of an OpenAI response's `usage`."""
+    if usage is None:
+        return
+    for kind in ('prompt', 'completion'):
+        tokens = usage.get(f'{kind}_tokens') if isinstance(usage, dict) else getattr(usage, f'{kind}_tokens', None)
+        if tokens:
+            OPENAI_TOKENS.labels(model, kind).inc(tokens)
+
+
+def init_app(app):
+    """Record latency and in-flight requests for every request to a Flask app."""
+    from flask import g, request
+
+    @app.before_request
+    def _start_timer():
+        g.metrics_route = request.url_rule.rule if request.url_rule else 'unmatched'
+        g.metrics_start = time.perf_counter()
+        REQUESTS_IN_FLIGHT.labels(request.method, g.metrics_route).inc()
+
+    @app.after_request
+    def _record_status(response):
+        g.metrics_status = response.status_code
+        return response
+
+    @app.teardown_request
+    def _record_request(exc=None):
+        start = g.pop('metrics_start', None)
+        if start is None:
+            return
+        route = g.pop('metrics_route')
+        status = g.pop('metrics_status', 500)
+        REQUEST_DURATION.labels(request.method, route, str(status)).observe(time.perf_counter() - start)
+        REQUESTS_IN_FLIGHT.labels(request.method, route).dec()
+
+
+def render() -> Tuple[bytes, str]:
+    """The current metrics (summed over all workers in multiprocess mode) and their content type."""
+    if prometheus_client:
+        if MULTIPROC_DIR:
+            registry = prometheus_client.CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        else:
+            registry = prometheus_client.REGISTRY
+        return prometheus_client.generate_latest(registry), prometheus_client.CONTENT_TYPE_LATEST
+    lines = [line for metric in _registry for line in metric.render()]
+    return ('\n'.join(lines) + '\n').encode(), CONTENT_TYPE
+
+
+def mark_process_dead(pid: int):
+    """Drop a finished gunicorn worker's live gauges (called from gunicorn.conf.py)."""
+    if prometheus_client and MULTIPROC_DIR:
+        multiprocess.mark_process_dead(pid)
@@ -1,7 +1,8 @@
-"""Netlify Function wrapper for the Flask app using awsgi.
+"""Netlify Function wrapper for the Flask app.
 
 This file exposes a `handler(event, context)` function which Netlify will invoke.
-It forwards incoming Lambda proxy events to the Flask WSGI app using `awsgi`.
+It converts AWS Lambda proxy events (REST v1 and HTTP API v2) to WSGI requests
+with lambda_adapter.LambdaAdapter; /health is answered without Flask dispatch.
 """
 import os
 import sys
@@ -19,49 +20,30 @@ if PROJECT_ROOT not in sys.path:
 os.environ.setdefault('FLASK_STATIC_FOLDER', 'public/static')
 os.environ.setdefault('FLASK_TEMPLATE_FOLDER', 'templates')
 
-from app import app as flask_app  # import the Flask app defined in app.py
-import awsgi
+import app as app_module  # the Flask app defined in app.py
+import json_backend
+from lambda_adapter import LambdaAdapter
+
+flask_app = app_module.app
 
 logger = logging.getLogger(__name__)
-logger.info('Netlify function app wrapper initialized')
 
 
-def handler(event, context):
-    """AWS Lambda handler invoked by Netlify Functions.
+def _health():
+    return 200, {'Content-Type': 'application/json'}, json_backend.dumpb(app_module.health_status())
 
-    Netlify passes AWS proxy-compatible events to Python functions. `awsgi.response`
-    will convert the Flask WSGI response into the proper Lambda proxy return value.
-    """
-    # Prefer awsgi.response when available (older/newer awsgi versions).
-    try:
-        if hasattr(awsgi, 'response'):
-            return awsgi.response(flask_app, event, context)
-    except Exception:
-        logger.exception('Error calling awsgi.response')
 
-    # Fallback: run the Flask app in a test request context and return a Lambda-style proxy response.
-    try:
-        path = event.get('rawPath') or event.get('path') or '/'
-        method = event.get('httpMethod', 'GET')
-        headers = event.get('headers') or {}
-        qs = event.get('queryStringParameters') or {}
-        body = event.get('body')
-        if event.get('isBase64Encoded') and body:
-            import base64
-            body = base64.b64decode(body)
+adapter = LambdaAdapter(flask_app)
+adapter.fast_route('/health', _health)
+logger.info('Netlify function app wrapper initialized')
+
 
-        # Use Flask test_request_context to dispatch the request
-        with flask_app.test_request_context(path=path, method=method, headers=headers, data=body, query_string=qs):
-            resp = flask_app.full_dispatch_request()
-            response_body = resp.get_data(as_text=True)
-            response_headers = {k: v for k, v in resp.headers.items()}
-            return {
-                'statusCode': resp.status_code,
-                'headers': response_headers,
-                'body': response_body
-            }
+def handler(event, context):
+    """AWS Lambda handler invoked by Netlify Functions."""
+    try:
+        return adapter(event, context)
     except Exception:
-        logger.exception('Fallback function adapter error')
+        logger.exception('Function adapter error')
         return {
             'statusCode': 502,
             'headers': {'Content-Type': 'application/json'},
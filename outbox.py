@@ -0,0 +1,198 @@
+"""Persistent outreach outbox stored in jobs.db.
+
+Web requests and campaign jobs only write messages here; scripts/outbox_worker.py
+drains the table over the pooled SMTP sender. Each (lead, campaign) pair has an
+idempotency key, so queueing the same outreach twice is a no-op. Messages may
+carry a client-supplied 'idempotency_key' that is folded into it, so one-off
+sends dedupe per request rather than per address.
+
+Statuses: pending -> sending -> sent, or back to pending with a backoff until
+MAX_ATTEMPTS is reached, then failed.
+"""
+import os
+import hashlib
+import sqlite3
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+import json_backend
+import metrics
+
+DB_PATH = os.getenv('JOBS_DB_PATH') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'jobs.db')
+
+MAX_ATTEMPTS = 5
+RETRY_BASE_SECONDS = 30
+# 'sending' rows older than this are assumed to belong to a crashed worker
+STALE_SENDING_SECONDS = 600
+
+_COLUMNS = ('id', 'idempotency_key', 'campaign_id', 'to_email', 'subject', 'body', 'lead',
+            'status', 'attempts', 'last_error', 'created_at', 'updated_at', 'next_attempt_at', 'sent_at')
+
+
+def init_outbox(db_path: Optional[str] = None):
+    conn = sqlite3.connect(db_path or DB_PATH)
+    c = conn.cursor()
+    c.execute('''
+    CREATE TABLE IF NOT EXISTS outbox (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        idempotency_key TEXT UNIQUE,
+        campaign_id TEXT,
+        to_email TEXT,
+        subject TEXT,
+        body TEXT,
+        lead TEXT,
+        status TEXT,
+        attempts INTEGER DEFAULT 0,
+        last_error TEXT,
+        created_at TEXT,
+        updated_at TEXT,
+        next_attempt_at TEXT,
+        sent_at TEXT
+    )
+    ''')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_outbox_status_next ON outbox (status, next_attempt_at)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_outbox_campaign ON outbox (campaign_id)')
+    conn.commit()
+    conn.close()
+
+
+def idempotency_key(to_email: str, campaign_id: str, client_key: Optional[str] = None) -> str:
+    """Stable key for one outreach to one lead within one campaign (and one client request, if given)."""
+    key = f"{campaign_id}:{to_email.strip().lower()}"
+    if client_key:
+        key += f":{client_key}"
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def _row_to_dict(row) -> Dict:
+    message = dict(zip(_COLUMNS, row))
+    message['lead'] = json_backend.loads(message['lead']) if message['lead'] else None
+    return message
+
+
+@metrics.timed('sqlite')
+def enqueue_messages(messages: List[Dict], campaign_id: str, db_path: Optional[str] = None) -> List[Dict]:
+    """
+    Queue {'to', 'subject', 'body', 'lead'} messages (plus an optional
+    'idempotency_key') for delivery. Returns the stored outbox row for each
+    message; rows that already existed for the same key come back unchanged
+    with 'duplicate': True.
+    """
+    now = datetime.now().isoformat()
+    keys = [idempotency_key(m['to'], campaign_id, m.get('idempotency_key')) for m in messages]
+
+    conn = sqlite3.connect(db_path or DB_PATH)
+    c = conn.cursor()
+    existing = set()
+    for i in range(0, len(keys), 500):
+        chunk = keys[i:i + 500]
+        c.execute(f"SELECT idempotency_key FROM outbox WHERE idempotency_key IN ({','.join('?' * len(chunk))})", chunk)
+        existing.update(row[0] for row in c.fetchall())
+
+    c.executemany(
+        'INSERT OR IGNORE INTO outbox (idempotency_key, campaign_id, to_email, subject, body, lead, status, '
+        'attempts, created_at, updated_at, next_attempt_at) VALUES (?,?,?,?,?,?,?,?,?,?,?)',
+        [(key, campaign_id, m['to'], m['subject'], m['body'], json_backend.dumps(m.get('lead')) if m.get('lead') else None,
+          'pending', 0, now, now, now) for key, m in zip(keys, messages)]
+    )
+    conn.commit()
+
+    stored = []
+    for key in keys:
+        c.execute(f"SELECT {', '.join(_COLUMNS)} FROM outbox WHERE idempotency_key = ?", (key,))
+        message = _row_to_dict(c.fetchone())
+        message['duplicate'] = key in existing
+        stored.append(message)
+    conn.close()
+    return stored
+
+
+def enqueue_message(to_email: str, subject: str, body: str, campaign_id: str = 'manual',
+                    lead: Optional[Dict] = None, db_path: Optional[str] = None,
+                    client_key: Optional[str] = None) -> Dict:
+    """Queue a single outreach email. See enqueue_messages."""
+    message = {'to': to_email, 'subject': subject, 'body': body, 'lead': lead, 'idempotency_key': client_key}
+    return enqueue_messages([message], campaign_id, db_path)[0]
+
+
+@metrics.timed('sqlite')
+def get_message(message_id: int, db_path: Optional[str] = None) -> Optional[Dict]:
+    conn = sqlite3.connect(db_path or DB_PATH)
+    c = conn.cursor()
+    c.execute(f"SELECT {', '.join(_COLUMNS)} FROM outbox WHERE id = ?", (message_id,))
+    row = c.fetchone()
+    conn.close()
+    return _row_to_dict(row) if row else None
+
+
+def claim_batch(conn, limit: int = 50) -> List[Dict]:
+    """Atomically move up to `limit` due pending messages to 'sending' and return them."""
+    now = datetime.now().isoformat()
+    c = conn.cursor()
+    c.execute('BEGIN IMMEDIATE')
+    c.execute(f"SELECT {', '.join(_COLUMNS)} FROM outbox WHERE status = 'pending' AND next_attempt_at <= ? "
+              "ORDER BY id LIMIT ?", (now, limit))
+    rows = [_row_to_dict(row) for row in c.fetchall()]
+    c.executemany("UPDATE outbox SET status = 'sending', updated_at = ? WHERE id = ?",
+                  [(now, row['id']) for row in rows])
+    conn.commit()
+    return rows
+
+
+def mark_sent(conn, id):
+    now = datetime.now().isoformat()
+    c = conn.cursor()
+    c.execute("UPDATE outbox SET status = 'sent', attempts = attempts + 1, updated_at = ?, sent_at = ?, "
+              "last_error = NULL WHERE id = ?", (now, now, id))
+    conn.commit()
+
+
+def mark_retry(conn, id, attempts, error):
+    """Schedule another attempt with exponential backoff, or fail after MAX_ATTEMPTS."""
+    now = datetime.now()
+    attempts += 1
+    c = conn.cursor()
+    if attempts >= MAX_ATTEMPTS:
+        c.execute("UPDATE outbox SET status = 'failed', attempts = ?, updated_at = ?, last_error = ? WHERE id = ?",
+                  (attempts, now.isoformat(), str(error), id))
+    else:
+        next_attempt = now + timedelta(seconds=RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+        c.execute("UPDATE outbox SET status = 'pending', attempts = ?, updated_at = ?, next_attempt_at = ?, "
+                  "last_error = ? WHERE id = ?", (attempts, now.isoformat(), next_attempt.isoformat(), str(error), id))
+    conn.commit()
+
+
+def recover_stale(conn, older_than: int = STALE_SENDING_SECONDS) -> int:
+    """Return 'sending' rows abandoned by a crashed worker to the queue."""
+    cutoff = (datetime.now() - timedelta(seconds=older_than)).isoformat()
+    c = conn.cursor()
+    c.execute("UPDATE outbox SET status = 'pending' WHERE status = 'sending' AND updated_at < ?", (cutoff,))
+    conn.commit()
+    return c.rowcount
+
+
+def drain(send_batch: Callable[[List[Dict]], List[Dict]], db_path: Optional[str] = None, batch_size: int = 50) -> int:
+    """
+    Deliver one batch of due messages.
+    `send_batch` takes [{'to', 'subject', 'body'}] and returns [{'success'}] in the
+    same order (LeadGenerator.send_emails). Returns the number of messages handled.
+    """
+    conn = sqlite3.connect(db_path or DB_PATH, isolation_level=None)
+    try:
+        batch = claim_batch(conn, batch_size)
+        if not batch:
+            return 0
+
+        try:
+            results = send_batch([{'to': m['to_email'], 'subject': m['subject'], 'body': m['body']} for m in batch])
+        except Exception as e:
+            results = [{'success': False, 'error': str(e)}] * len(batch)
+
+        for message, result in zip(batch, results):
+            if result.get('success'):
+                mark_sent(conn, message['id'])
+            else:
+                mark_retry(conn, message['id'], message['attempts'], result.get('error') or 'send failed')
+        return len(batch)
+    finally:
+        conn.close()
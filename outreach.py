@@ -0,0 +1,246 @@
+"""
+COLLIDE AI - Outreach Delivery
+Pooled, rate-limited SMTP sender shared by lead generation campaigns and the
+outreach endpoints. Connections are opened, STARTTLS'd and authenticated once,
+then reused for every message until the relay drops them.
+"""
+
+import os
+import time
+import queue
+import smtplib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from email.message import Message
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# Sustained messages/second accepted by common relays (override with SMTP_RATE_LIMIT)
+PROVIDER_RATE_LIMITS = {
+    'smtp.gmail.com': 1.0,
+    'smtp.office365.com': 0.5,
+    'smtp.mail.yahoo.com': 0.5,
+    'smtp.sendgrid.net': 50.0,
+    'smtp.mailgun.org': 50.0,
+    'email-smtp.us-east-1.amazonaws.com': 14.0,
+}
+DEFAULT_RATE_LIMIT = 5.0
+
+# Idle pooled connections older than this are closed instead of reused
+MAX_IDLE_SECONDS = 60
+
+# Errors that mean the connection itself is unusable and should be replaced
+_CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError)
+
+
+def _connection_lost(error: BaseException) -> bool:
+    """
+    True for a dropped or failed connection, worth retrying on a new one.
+    SMTPException subclasses OSError, so relay replies (a 550 for the
+    recipient, a rejected sender, ...) are ruled out first: resending those
+    only repeats the rejection.
+    """
+    if isinstance(error, _CONNECTION_ERRORS):
+        return True
+    return isinstance(error, OSError) and not isinstance(error, smtplib.SMTPException)
+
+
+class RateLimiter:
+    """Thread-safe token bucket: `rate` tokens per second, up to `burst` at once."""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then consume it."""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class SMTPPool:
+    """
+    A small pool of authenticated SMTP connections.
+    At most `size` connections are open at once; idle ones are reused LIFO so
+    the warmest connection is picked first.
+    """
+
+    def __init__(self, host: str, port: int, username: str = '', password: str = '',
+                 size: int = 3, use_tls: bool = True, timeout: float = 30):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.size = size
+        # STARTTLS unless explicitly disabled, so credentials never go out in cleartext by default
+        self.use_tls = use_tls
+        self.timeout = timeout
+        self.connections_opened = 0
+
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._count_lock = threading.Lock()
+
+    @metrics.timed('smtp', 'connect')
+    def _connect(self) -> smtplib.SMTP:
+        if self.port == 465:
+            server = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout)
+        else:
+            server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            if self.use_tls:
+                server.starttls()
+        if self.username and self.password:
+            server.login(self.username, self.password)
+
+        with self._count_lock:
+            self.connections_opened += 1
+        logger.info(f"Opened SMTP connection to {self.host}:{self.port}")
+        return server
+
+    def _checkout(self) -> smtplib.SMTP:
+        while True:
+            try:
+                server, last_used = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connect()
+            if time.monotonic() - last_used < MAX_IDLE_SECONDS:
+                return server
+            self._discard(server)
+
+    @staticmethod
+    def _discard(server: smtplib.SMTP):
+        try:
+            server.quit()
+        except Exception:
+            try:
+                server.close()
+            except Exception:
+                pass
+
+    @contextmanager
+    def connection(self):
+        """
+        Borrow a connection. It goes back to the pool unless the body raised a
+        connection-level error, in which case it is discarded.
+        """
+        with self._slots:
+            server = self._checkout()
+            try:
+                yield server
+            except Exception as e:
+                if _connection_lost(e):
+                    self._discard(server)
+                else:
+                    self._idle.put((server, time.monotonic()))
+                raise
+            else:
+                self._idle.put((server, time.monotonic()))
+
+    def send(self, msg: Message, retries: int = 1):
+        """Send a message, reconnecting and retrying on dropped connections."""
+        for attempt in range(retries + 1):
+            try:
+                with self.connection() as server, metrics.track('smtp', 'send'):
+                    server.send_message(msg)
+                return
+            except Exception as e:
+                if not _connection_lost(e) or attempt >= retries:
+                    raise
+                logger.warning(f"SMTP connection lost ({e}); reconnecting")
+
+    def close(self):
+        """Close every idle connection."""
+        while True:
+            try:
+                server, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._discard(server)
+
+
+class OutreachSender:
+    """
+    Outreach delivery engine: a connection pool plus a per-provider rate limit.
+    Use `send` for single messages and `send_many` for bulk delivery.
+    """
+
+    def __init__(self, host: str, port: int, username: str = '', password: str = '',
+                 pool_size: Optional[int] = None, rate_limit: Optional[float] = None,
+                 use_tls: bool = True):
+        pool_size = pool_size or int(os.getenv('SMTP_POOL_SIZE', '3'))
+        if rate_limit is None:
+            env_rate = os.getenv('SMTP_RATE_LIMIT')
+            rate_limit = float(env_rate) if env_rate else PROVIDER_RATE_LIMITS.get(host, DEFAULT_RATE_LIMIT)
+
+        self.pool = SMTPPool(host, port, username, password, size=pool_size, use_tls=use_tls)
+        self.limiter = RateLimiter(rate_limit)
+
+    def _deliver(self, msg: Message) -> Optional[str]:
+        """Send one message. Returns None on success, else the error text."""
+        self.limiter.acquire()
+        try:
+            self.pool.send(msg)
+            return None
+        except Exception as e:
+            logger.error(f"Failed to send email to {msg.get('To')}: {e}")
+            return f"{type(e).__name__}: {e}"
+
+    def send(self, msg: Message) -> bool:
+        """Send one message. Returns True on success."""
+        return self._deliver(msg) is None
+
+    def send_many(self, messages: Iterable[Message], concurrency: Optional[int] = None) -> List[Dict]:
+        """
+        Send messages concurrently over the pool.
+        Returns one {'to', 'success'} dict per message, in input order; failed
+        ones also carry the SMTP 'error'.
+        """
+        messages = list(messages)
+        workers = min(concurrency or self.pool.size, self.pool.size, len(messages)) or 1
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            errors = list(executor.map(self._deliver, messages))
+        results = []
+        for msg, error in zip(messages, errors):
+            result = {'to': msg.get('To'), 'success': error is None}
+            if error:
+                result['error'] = error
+            results.append(result)
+        return results
+
+    def close(self):
+        self.pool.close()
+
+
+_senders: Dict[Tuple, OutreachSender] = {}
+_senders_lock = threading.Lock()
+
+
+def get_sender(host: str, port: int, username: str = '', password: str = '') -> OutreachSender:
+    """Return the process-wide sender for a relay/account, creating it on first use."""
+    key = (host, port, username, password)
+    with _senders_lock:
+        sender = _senders.get(key)
+        if sender is None:
+            # SMTP_STARTTLS=0 only for relays without TLS (e.g. a local test server)
+            use_tls = os.getenv('SMTP_STARTTLS', '1').lower() not in ('0', 'false', 'no')
+            sender = OutreachSender(host, port, username, password, use_tls=use_tls)
+            _senders[key] = sender
+        return sender
@@ -0,0 +1,109 @@
+"""
+COLLIDE AI - Outreach Templates
+Email, LinkedIn and Instagram message templates (templates/outreach/) compiled
+once with Jinja2 and rendered per lead, singly or in batches, into message
+dicts or ready-to-send MIME messages.
+"""
+
+import os
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from typing import Dict, Iterable, List, Optional
+
+from jinja2 import Environment, FileSystemLoader
+from markupsafe import escape
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates', 'outreach')
+
+# channel -> (subject template, body template, key the body is returned under)
+CHANNELS = {
+    'email': ('email_subject.txt', 'email.txt', 'body'),
+    'linkedin': (None, 'linkedin.txt', 'message'),
+    'instagram': (None, 'instagram.txt', 'message'),
+}
+DEFAULT_TEMPLATE = 'default.txt'
+
+
+def lead_context(lead: Dict) -> Dict:
+    """Template variables for a lead."""
+    name_parts = (lead.get('name') or 'there').split()
+    return {
+        'name': name_parts[0] if name_parts else 'there',
+        'company': lead.get('company', lead.get('username', 'your brand')),
+        'industry': lead.get('industry', 'creative'),
+        'lead': lead,
+    }
+
+
+def text_to_html(body: str) -> str:
+    """HTML alternative for a plain-text body: escaped, with line breaks kept."""
+    return str(escape(body)).replace('\n', '<br>')
+
+
+def build_mime(from_email: str, to_email: str, subject: str, body: str,
+               html_body: Optional[str] = None) -> MIMEMultipart:
+    """Build a plain + HTML multipart message."""
+    msg = MIMEMultipart('alternative')
+    msg['From'] = from_email
+    msg['To'] = to_email
+    msg['Subject'] = subject
+    msg.attach(MIMEText(body, 'plain'))
+    msg.attach(MIMEText(html_body if html_body is not None else text_to_html(body), 'html'))
+    return msg
+
+
+class OutreachTemplates:
+    """Precompiled outreach templates for every channel."""
+
+    def __init__(self, template_dir: str = TEMPLATE_DIR):
+        env = Environment(loader=FileSystemLoader(template_dir), autoescape=False)
+        self._channels = {
+            channel: (env.get_template(subject) if subject else None, env.get_template(body), key)
+            for channel, (subject, body, key) in CHANNELS.items()
+        }
+        self._default = env.get_template(DEFAULT_TEMPLATE)
+
+    def render(self, lead: Dict, channel: str = 'email') -> Dict:
+        """Render one lead: {'subject', 'body'} for email, {'message'} otherwise."""
+        context = lead_context(lead)
+        compiled = self._channels.get(channel)
+        if compiled is None:
+            return {'message': self._default.render(context)}
+
+        subject, body, key = compiled
+        rendered = {key: body.render(context)}
+        if subject is not None:
+            rendered = {'subject': subject.render(context), **rendered}
+        return rendered
+
+    def render_batch(self, leads: Iterable[Dict], channel: str = 'email') -> List[Dict]:
+        """Render many leads for one channel."""
+        render = self.render
+        return [render(lead, channel) for lead in leads]
+
+    def build_emails(self, leads: Iterable[Dict], from_email: str) -> List[MIMEMultipart]:
+        """Render email outreach for leads that have an address into MIME messages."""
+        subject_template, body_template, _ = self._channels['email']
+        messages = []
+        for lead in leads:
+            if not lead.get('email'):
+                continue
+            context = lead_context(lead)
+            messages.append(build_mime(
+                from_email,
+                lead['email'],
+                subject_template.render(context),
+                body_template.render(context)
+            ))
+        return messages
+
+
+_templates: Optional[OutreachTemplates] = None
+
+
+def get_templates() -> OutreachTemplates:
+    """Process-wide template set, compiled on first use."""
+    global _templates
+    if _templates is None:
+        _templates = OutreachTemplates()
+    return _templates
@@ -0,0 +1,85 @@
+"""
+COLLIDE AI - Page Cache
+Pre-rendered public pages.
+
+The chat page and the lead generation page render the same HTML for every
+visitor, so each template is rendered once per process and kept as bytes,
+together with a gzip copy and a strong ETag. Browsers revalidate with
+If-None-Match and get a 304 without the page being rendered or sent again.
+
+Pages that depend on the session (the admin pages) are rendered per request
+as before. With template auto-reload on (debug mode) nothing is cached.
+"""
+
+import gzip
+import hashlib
+import threading
+from typing import Dict, Optional
+
+from flask import Response, current_app, render_template, request
+
+# Public pages rendered without per-request state; warm() renders these up front
+PAGES = ('index.html', 'lead_gen.html')
+
+# Clients may store the page but must revalidate it; a new deploy changes the ETag
+CACHE_CONTROL = 'public, max-age=0, must-revalidate'
+
+# Pages smaller than this are not worth gzipping
+GZIP_MIN_BYTES = 1024
+GZIP_LEVEL = 6
+
+
+class CachedPage:
+    """A rendered page: body bytes, optional gzip body and their ETag"""
+
+    __slots__ = ('body', 'gzip_body', 'etag')
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.etag = hashlib.sha256(body).hexdigest()[:32]
+        self.gzip_body: Optional[bytes] = (gzip.compress(body, GZIP_LEVEL, mtime=0)
+                                           if len(body) >= GZIP_MIN_BYTES else None)
+
+
+_pages: Dict[str, CachedPage] = {}
+_lock = threading.Lock()
+
+
+def get(template: str) -> CachedPage:
+    """The rendered template, rendering it on first use (needs a request context)"""
+    if current_app.jinja_env.auto_reload:
+        return CachedPage(render_template(template).encode('utf-8'))
+    page = _pages.get(template)
+    if page is None:
+        with _lock:
+            page = _pages.get(template)
+            if page is None:
+                page = _pages[template] = CachedPage(render_template(template).encode('utf-8'))
+    return page
+
+
+def page_response(template: str) -> Response:
+    """Serve a cached page: 304 when the client's ETag matches, gzip when accepted"""
+    page = get(template)
+    use_gzip = page.gzip_body is not None and request.accept_encodings['gzip'] > 0
+    response = Response(page.gzip_body if use_gzip else page.body, mimetype='text/html')
+    # Each encoding is a different representation, so it gets its own strong ETag
+    response.set_etag(page.etag + '-gzip' if use_gzip else page.etag)
+    response.headers['Cache-Control'] = CACHE_CONTROL
+    response.vary.add('Accept-Encoding')
+    if use_gzip:
+        response.headers['Content-Encoding'] = 'gzip'
+    return response.make_conditional(request)
+
+
+def warm(app):
+    """Render PAGES before the first request (called once per gunicorn worker)"""
+    with app.test_request_context('/'):
+        for template in PAGES:
+            get(template)
+
+
+def clear():
+    """Drop rendered pages (after a template or asset rebuild, or in tests)"""
+    with _lock:
+        _pages.clear()
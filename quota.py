@@ -0,0 +1,325 @@
+"""Per-provider API quota accounting and adaptive throttling.
+
+Every RapidAPI, Hunter and Apify call made by the lead generators goes through
+a QuotaManager. It
+  * counts calls per provider per billing window (e.g. "2025-10") in the
+    provider_usage table of jobs.db,
+  * reads the providers' rate-limit headers (X-RateLimit-*-Remaining/Limit/
+    Reset, Retry-After) so the stored budget tracks what the provider reports,
+  * paces requests with a token bucket that halves its rate on a 429 and
+    creeps back up on success, and
+  * refuses a call once the budget for the window is spent instead of burning
+    into overage or 429s.
+
+`prioritize()` splits a work list into what the remaining budget can pay for
+(highest value first) and what has to wait for the next window.
+
+Provider limits default to PROVIDER_QUOTAS and can be overridden per provider
+with QUOTA_<PROVIDER>_LIMIT (calls per window) and QUOTA_<PROVIDER>_RATE
+(requests per second), e.g. QUOTA_HUNTER_LIMIT=500.
+
+Usage report:
+    python quota.py
+"""
+import os
+import time
+import sqlite3
+import logging
+import threading
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from outreach import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+DB_PATH = os.getenv('JOBS_DB_PATH') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'jobs.db')
+
+# window: billing period the limit applies to; limit: calls per window (None =
+# unknown until the provider's headers report it); rate: requests per second
+PROVIDER_QUOTAS = {
+    'hunter': {'window': 'month', 'limit': 25, 'rate': 10.0},
+    'rapidapi_instagram': {'window': 'month', 'limit': None, 'rate': 5.0},
+    'rapidapi_linkedin': {'window': 'month', 'limit': None, 'rate': 5.0},
+    'apify': {'window': 'month', 'limit': None, 'rate': 5.0},
+}
+DEFAULT_QUOTA = {'window': 'month', 'limit': None, 'rate': 5.0}
+
+# Calls kept in reserve per window so manual lookups still work after a big campaign
+RESERVE_CALLS = int(os.getenv('QUOTA_RESERVE_CALLS', '0'))
+
+# Longest Retry-After (seconds) worth sleeping through; beyond that the call is refused
+MAX_RETRY_WAIT = 60.0
+
+_WINDOW_FORMATS = {'day': '%Y-%m-%d', 'month': '%Y-%m'}
+
+
+def window_key(period: str, now: Optional[datetime] = None) -> str:
+    """Billing window a call at `now` falls in, e.g. '2025-10' for a monthly quota."""
+    return (now or datetime.now()).strftime(_WINDOW_FORMATS[period])
+
+
+def _header(headers: Mapping[str, str], *suffixes: str) -> Optional[str]:
+    """First rate-limit header whose lowercased name ends with one of `suffixes`."""
+    for name, value in headers.items():
+        name = name.lower()
+        if name.startswith(('x-ratelimit', 'ratelimit')) and name.endswith(suffixes):
+            return value
+    return None
+
+
+def _int(value) -> Optional[int]:
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_rate_limit_headers(headers: Mapping[str, str]) -> Dict[str, Optional[float]]:
+    """
+    Normalize provider rate-limit headers to {'limit', 'remaining', 'reset', 'retry_after'}.
+    Handles RapidAPI's X-RateLimit-Requests-*, the common X-RateLimit-* and
+    RateLimit-* forms, and Retry-After in seconds.
+    """
+    headers = headers or {}
+    retry_after = next((v for k, v in headers.items() if k.lower() == 'retry-after'), None)
+    return {
+        'limit': _int(_header(headers, '-limit')),
+        'remaining': _int(_header(headers, '-remaining')),
+        'reset': _int(_header(headers, '-reset')),
+        'retry_after': _int(retry_after),
+    }
+
+
+class AdaptiveRateLimiter(RateLimiter):
+    """
+    Token bucket whose rate halves on every 429 (down to `min_rate`) and grows
+    back by 10% per successful call, up to the configured rate.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None, min_rate: float = 0.1):
+        super().__init__(rate, burst)
+        self.max_rate = rate
+        self.min_rate = min(min_rate, rate)
+        self._paused_until = 0.0
+
+    def slow_down(self, retry_after: Optional[float] = None):
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._tokens = min(self._tokens, 0)
+            if retry_after:
+                self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+
+    def recover(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate * 1.1)
+
+    def pause_remaining(self) -> float:
+        return max(0.0, self._paused_until - time.monotonic())
+
+    def acquire(self):
+        pause = self.pause_remaining()
+        if pause:
+            time.sleep(pause)
+        super().acquire()
+
+
+class QuotaManager:
+    """Usage counters and throttling for the external lead-data providers."""
+
+    def __init__(self, db_path: Optional[str] = None, quotas: Optional[Dict[str, Dict]] = None):
+        self.db_path = db_path or DB_PATH
+        self.quotas = {name: dict(q) for name, q in (quotas or PROVIDER_QUOTAS).items()}
+        self._limiters: Dict[str, AdaptiveRateLimiter] = {}
+        self._lock = threading.Lock()
+        self._init_db()
+
+    def _init_db(self):
+        conn = sqlite3.connect(self.db_path)
+        c = conn.cursor()
+        c.execute('''
+        CREATE TABLE IF NOT EXISTS provider_usage (
+            provider TEXT,
+            billing_window TEXT,
+            calls INTEGER DEFAULT 0,
+            throttled INTEGER DEFAULT 0,
+            limit_total INTEGER,
+            remaining INTEGER,
+            reset_at TEXT,
+            updated_at TEXT,
+            PRIMARY KEY (provider, billing_window)
+        )
+        ''')
+        conn.commit()
+        conn.close()
+
+    def quota(self, provider: str) -> Dict:
+        """Configured quota for a provider, with QUOTA_<PROVIDER>_LIMIT/_RATE overrides applied."""
+        quota = dict(self.quotas.get(provider, DEFAULT_QUOTA))
+        prefix = f"QUOTA_{provider.upper()}_"
+        if os.getenv(prefix + 'LIMIT'):
+            quota['limit'] = int(os.getenv(prefix + 'LIMIT'))
+        if os.getenv(prefix + 'RATE'):
+            quota['rate'] = float(os.getenv(prefix + 'RATE'))
+        return quota
+
+    def limiter(self, provider: str) -> AdaptiveRateLimiter:
+        with self._lock:
+            if provider not in self._limiters:
+                self._limiters[provider] = AdaptiveRateLimiter(self.quota(provider)['rate'])
+            return self._limiters[provider]
+
+    def _window(self, provider: str, now: Optional[datetime] = None) -> str:
+        return window_key(self.quota(provider)['window'], now)
+
+    def usage(self, provider: str, now: Optional[datetime] = None) -> Dict:
+        """Counters for the provider's current billing window."""
+        window = self._window(provider, now)
+        conn = sqlite3.connect(self.db_path)
+        c = conn.cursor()
+        c.execute('SELECT calls, throttled, limit_total, remaining, reset_at, updated_at FROM provider_usage '
+                  'WHERE provider = ? AND billing_window = ?', (provider, window))
+        row = c.fetchone()
+        conn.close()
+        calls, throttled, limit_total, remaining, reset_at, updated_at = row or (0, 0, None, None, None, None)
+        return {
+            'provider': provider,
+            'billing_window': window,
+            'calls': calls,
+            'throttled': throttled,
+            'limit': self.quota(provider)['limit'] if self.quota(provider)['limit'] is not None else limit_total,
+            'reported_remaining': remaining,
+            'reset_at': reset_at,
+            'updated_at': updated_at,
+            'remaining': self.remaining(provider, now),
+        }
+
+    def all_usage(self) -> List[Dict]:
+        conn = sqlite3.connect(self.db_path)
+        c = conn.cursor()
+        c.execute('SELECT DISTINCT provider FROM provider_usage')
+        providers = {row[0] for row in c.fetchall()}
+        conn.close()
+        return [self.usage(provider) for provider in sorted(providers | set(self.quotas))]
+
+    def remaining(self, provider: str, now: Optional[datetime] = None) -> Optional[int]:
+        """
+        Calls left in the current window: the lower of the configured limit minus
+        calls made and the provider's last reported remaining count. None when
+        neither is known.
+
+        Reported figures often describe a per-minute or per-hour bucket, so
+        they are ignored once their reset time has passed; otherwise a single
+        "remaining: 0" would block the provider until the window rolls over,
+        as no further call is made to refresh it.
+        """
+        now = now or datetime.now()
+        window = self._window(provider, now)
+        conn = sqlite3.connect(self.db_path)
+        c = conn.cursor()
+        c.execute('SELECT calls, limit_total, remaining, reset_at FROM provider_usage '
+                  'WHERE provider = ? AND billing_window = ?', (provider, window))
+        calls, reported_limit, reported_remaining, reset_at = c.fetchone() or (0, None, None, None)
+        conn.close()
+        if reset_at is not None and reset_at <= now.isoformat():
+            reported_limit = reported_remaining = None
+
+        limit = self.quota(provider)['limit']
+        if limit is None:
+            limit = reported_limit
+        candidates = [] if reported_remaining is None else [reported_remaining]
+        if limit is not None:
+            candidates.append(limit - calls)
+        return max(0, min(candidates) - RESERVE_CALLS) if candidates else None
+
+    def acquire(self, provider: str, cost: int = 1) -> bool:
+        """
+        Wait for a token to call `provider`. Returns False without waiting when
+        the window's budget can't cover `cost` calls or the provider asked us to
+        back off for longer than MAX_RETRY_WAIT.
+        """
+        remaining = self.remaining(provider)
+        if remaining is not None and remaining < cost:
+            logger.warning(f"{provider} quota exhausted for {self._window(provider)}")
+            return False
+
+        limiter = self.limiter(provider)
+        if limiter.pause_remaining() > MAX_RETRY_WAIT:
+            logger.warning(f"{provider} asked to back off for {limiter.pause_remaining():.0f}s; skipping call")
+            return False
+        limiter.acquire()
+        return True
+
+    def record(self, provider: str, status_code: int, headers: Optional[Mapping[str, str]] = None,
+               cost: int = 1, now: Optional[datetime] = None):
+        """Count a completed call and fold in the provider's rate-limit headers."""
+        info = parse_rate_limit_headers(headers or {})
+        throttled = status_code == 429
+        limiter = self.limiter(provider)
+        if throttled:
+            limiter.slow_down(info['retry_after'])
+            logger.warning(f"{provider} rate limited (429); slowing to {limiter.rate:.2f} req/s")
+        else:
+            limiter.recover()
+
+        now = now or datetime.now()
+        reset_at = None
+        if info['reset'] is not None:
+            # Providers send either seconds-until-reset or an epoch timestamp
+            seconds = info['reset'] if info['reset'] < 10 ** 9 else info['reset'] - time.time()
+            reset_at = datetime.fromtimestamp(now.timestamp() + max(0, seconds)).isoformat()
+
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(
+            'INSERT INTO provider_usage (provider, billing_window, calls, throttled, limit_total, remaining, '
+            'reset_at, updated_at) VALUES (?,?,?,?,?,?,?,?) '
+            'ON CONFLICT(provider, billing_window) DO UPDATE SET calls = calls + excluded.calls, '
+            'throttled = throttled + excluded.throttled, '
+            'limit_total = COALESCE(excluded.limit_total, limit_total), '
+            # A bucket whose reset has passed has refilled: forget its old count
+            'remaining = CASE WHEN excluded.remaining IS NOT NULL THEN excluded.remaining '
+            'WHEN reset_at <= excluded.updated_at THEN NULL ELSE remaining - excluded.calls END, '
+            'reset_at = COALESCE(excluded.reset_at, reset_at), updated_at = excluded.updated_at',
+            (provider, self._window(provider, now), cost, int(throttled), info['limit'], info['remaining'],
+             reset_at, now.isoformat())
+        )
+        conn.commit()
+        conn.close()
+
+    def prioritize(self, items: Iterable, provider: str, value: Optional[Callable] = None,
+                   cost: int = 1) -> Tuple[List, List]:
+        """
+        Order `items` by `value` (default: qualification_score), highest first,
+        and split them into (funded, deferred) by how many calls of `cost` the
+        provider's remaining budget covers.
+        """
+        value = value or (lambda item: item.get('qualification_score') or 0)
+        ordered = sorted(items, key=value, reverse=True)
+        remaining = self.remaining(provider)
+        if remaining is None:
+            return ordered, []
+        affordable = remaining // cost
+        return ordered[:affordable], ordered[affordable:]
+
+
+_manager: Optional[QuotaManager] = None
+
+
+def get_quota_manager() -> QuotaManager:
+    """Process-wide QuotaManager, so every generator shares one token bucket per provider."""
+    global _manager
+    if _manager is None:
+        _manager = QuotaManager()
+    return _manager
+
+
+def main():
+    for usage in get_quota_manager().all_usage():
+        limit = usage['limit'] if usage['limit'] is not None else '?'
+        remaining = usage['remaining'] if usage['remaining'] is not None else '?'
+        print(f"{usage['provider']:<20} {usage['billing_window']}  calls={usage['calls']:<6} "
+              f"limit={limit:<6} remaining={remaining:<6} throttled={usage['throttled']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,292 @@
+"""Built-in scheduler for recurring lead generation campaigns.
+
+Schedules are stored in the `schedules` table of jobs.db as cron expressions
+(minute hour day-of-month month day-of-week) plus a campaign payload. Due
+schedules are enqueued through jobs.enqueue_job (SQLite or RQ). Start times are
+jittered so many campaigns sharing a cron slot don't hit the providers at
+once, and a run is skipped while the schedule's previous job is still going.
+
+scripts/worker.py calls run_due() on every poll. It can also run on its own:
+    python scheduler.py run
+    python scheduler.py add daily-beauty "0 9 * * *" '{"instagram_hashtags": ["#cleanbeauty"]}'
+    python scheduler.py list
+"""
+import time
+import random
+import sqlite3
+import logging
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+import jobs
+import json_backend
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_JITTER_SECONDS = 300
+POLL_SECONDS = 30
+
+# Job statuses (SQLite queue and RQ) that mean the previous run is still going
+ACTIVE_STATUSES = ('pending', 'in_progress', 'queued', 'started', 'deferred', 'scheduled')
+
+# Day-of-week accepts 7 for Sunday too; it is folded into 0 after parsing
+_FIELD_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+
+class CronError(ValueError):
+    """Raised for malformed cron expressions."""
+
+
+def _parse_field(field: str, low: int, high: int) -> frozenset:
+    values = set()
+    for part in field.split(','):
+        step = 1
+        if '/' in part:
+            part, step_text = part.split('/', 1)
+            step = int(step_text)
+            if step < 1:
+                raise CronError(f"Invalid step in {field!r}")
+        if part == '*':
+            start, end = low, high
+        elif '-' in part:
+            start, end = (int(v) for v in part.split('-', 1))
+        else:
+            start = int(part)
+            end = high if step > 1 else start
+        if start < low or end > high or start > end:
+            raise CronError(f"{field!r} is outside {low}-{high}")
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+
+class CronSchedule:
+    """A standard five-field cron expression (day-of-week 0 = Sunday, 7 also accepted)."""
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise CronError(f"Expected 5 cron fields, got {len(fields)}: {expression!r}")
+        try:
+            parsed = [_parse_field(f, low, high) for f, (low, high) in zip(fields, _FIELD_RANGES)]
+        except ValueError as e:
+            raise CronError(str(e)) from e
+
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, weekdays = parsed
+        self.weekdays = frozenset(day % 7 for day in weekdays)
+        # Cron semantics: when both day fields are restricted, either may match
+        self._any_day = fields[2] == '*'
+        self._any_weekday = fields[4] == '*'
+
+    def _day_matches(self, dt: datetime) -> bool:
+        day_ok = dt.day in self.days
+        weekday_ok = (dt.weekday() + 1) % 7 in self.weekdays
+        if self._any_day:
+            return weekday_ok
+        if self._any_weekday:
+            return day_ok
+        return day_ok or weekday_ok
+
+    def next_after(self, after: datetime) -> datetime:
+        """First matching minute strictly after `after`."""
+        dt = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = dt + timedelta(days=366 * 5)
+        while dt < limit:
+            if dt.month not in self.months:
+                dt = (dt.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(dt):
+                dt = dt.replace(hour=0, minute=0) + timedelta(days=1)
+            elif dt.hour not in self.hours:
+                dt = dt.replace(minute=0) + timedelta(hours=1)
+            elif dt.minute not in self.minutes:
+                dt += timedelta(minutes=1)
+            else:
+                return dt
+        raise CronError(f"{self.expression!r} never matches")
+
+
+def _next_run(cron: str, jitter_seconds: int, after: datetime) -> str:
+    run_at = CronSchedule(cron).next_after(after)
+    if jitter_seconds:
+        run_at += timedelta(seconds=random.uniform(0, jitter_seconds))
+    return run_at.isoformat()
+
+
+def init_schedules():
+    conn = sqlite3.connect(jobs.DB_PATH)
+    c = conn.cursor()
+    c.execute('''
+    CREATE TABLE IF NOT EXISTS schedules (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT UNIQUE,
+        cron TEXT,
+        payload TEXT,
+        jitter_seconds INTEGER,
+        enabled INTEGER DEFAULT 1,
+        next_run_at TEXT,
+        last_run_at TEXT,
+        last_job_id TEXT,
+        last_status TEXT,
+        created_at TEXT
+    )
+    ''')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_schedules_next_run ON schedules (enabled, next_run_at)')
+    conn.commit()
+    conn.close()
+
+
+_SCHEDULE_COLUMNS = ('id', 'name', 'cron', 'payload', 'jitter_seconds', 'enabled', 'next_run_at',
+                     'last_run_at', 'last_job_id', 'last_status', 'created_at')
+
+
+def _row_to_dict(row) -> Dict:
+    schedule = dict(zip(_SCHEDULE_COLUMNS, row))
+    schedule['payload'] = json_backend.loads(schedule['payload']) if schedule['payload'] else {}
+    schedule['enabled'] = bool(schedule['enabled'])
+    return schedule
+
+
+def add_schedule(name: str, cron: str, payload: Dict, jitter_seconds: int = DEFAULT_JITTER_SECONDS,
+                 enabled: bool = True, now: Optional[datetime] = None) -> Dict:
+    """Create or replace a named schedule. Raises CronError for a bad expression."""
+    now = now or datetime.now()
+    next_run_at = _next_run(cron, jitter_seconds, now)
+
+    conn = sqlite3.connect(jobs.DB_PATH)
+    c = conn.cursor()
+    c.execute(
+        'INSERT INTO schedules (name, cron, payload, jitter_seconds, enabled, next_run_at, created_at) '
+        'VALUES (?,?,?,?,?,?,?) ON CONFLICT(name) DO UPDATE SET cron = excluded.cron, '
+        'payload = excluded.payload, jitter_seconds = excluded.jitter_seconds, enabled = excluded.enabled, '
+        'next_run_at = excluded.next_run_at',
+        (name, cron, json_backend.dumps(payload), jitter_seconds, int(enabled), next_run_at, now.isoformat())
+    )
+    conn.commit()
+    conn.close()
+    return get_schedule(name)
+
+
+def get_schedule(name: str) -> Optional[Dict]:
+    conn = sqlite3.connect(jobs.DB_PATH)
+    c = conn.cursor()
+    c.execute(f"SELECT {', '.join(_SCHEDULE_COLUMNS)} FROM schedules WHERE name = ?", (name,))
+    row = c.fetchone()
+    conn.close()
+    return _row_to_dict(row) if row else None
+
+
+def list_schedules() -> List[Dict]:
+    conn = sqlite3.connect(jobs.DB_PATH)
+    c = conn.cursor()
+    c.execute(f"SELECT {', '.join(_SCHEDULE_COLUMNS)} FROM schedules ORDER BY name")
+    rows = c.fetchall()
+    conn.close()
+    return [_row_to_dict(row) for row in rows]
+
+
+def delete_schedule(name: str) -> bool:
+    conn = sqlite3.connect(jobs.DB_PATH)
+    c = conn.cursor()
+    c.execute('DELETE FROM schedules WHERE name = ?', (name,))
+    conn.commit()
+    conn.close()
+    return c.rowcount > 0
+
+
+def _previous_run_active(job_id: Optional[str], get_job: Callable) -> bool:
+    if not job_id:
+        return False
+    try:
+        job = get_job(job_id)
+    except Exception:
+        logger.exception(f"Could not look up job {job_id}")
+        return False
+    return bool(job) and job.get('status') in ACTIVE_STATUSES
+
+
+def run_due(now: Optional[datetime] = None, enqueue: Callable = None, get_job: Callable = None) -> List[Dict]:
+    """
+    Enqueue every enabled schedule whose next_run_at has passed.
+    Returns one {'name', 'status', 'job_id'} entry per due schedule; status is
+    'enqueued' or 'skipped' (previous run still active).
+    """
+    now = now or datetime.now()
+    enqueue = enqueue or jobs.enqueue_job
+    get_job = get_job or jobs.get_job
+
+    conn = sqlite3.connect(jobs.DB_PATH)
+    c = conn.cursor()
+    c.execute(f"SELECT {', '.join(_SCHEDULE_COLUMNS)} FROM schedules WHERE enabled = 1 AND next_run_at <= ? "
+              "ORDER BY next_run_at", (now.isoformat(),))
+    due = [_row_to_dict(row) for row in c.fetchall()]
+
+    outcomes = []
+    for schedule in due:
+        next_run_at = _next_run(schedule['cron'], schedule['jitter_seconds'], now)
+
+        # Claim the slot first so concurrent schedulers never double-enqueue it
+        c.execute('UPDATE schedules SET next_run_at = ? WHERE id = ? AND next_run_at = ?',
+                  (next_run_at, schedule['id'], schedule['next_run_at']))
+        conn.commit()
+        if c.rowcount != 1:
+            continue
+
+        if _previous_run_active(schedule['last_job_id'], get_job):
+            logger.info(f"Skipping schedule {schedule['name']}: job {schedule['last_job_id']} still running")
+            c.execute("UPDATE schedules SET last_status = 'skipped' WHERE id = ?", (schedule['id'],))
+            conn.commit()
+            outcomes.append({'name': schedule['name'], 'status': 'skipped', 'job_id': schedule['last_job_id']})
+            continue
+
+        payload = dict(schedule['payload'], schedule=schedule['name'])
+        job_id = enqueue(payload)
+        c.execute("UPDATE schedules SET last_run_at = ?, last_job_id = ?, last_status = 'enqueued' WHERE id = ?",
+                  (now.isoformat(), job_id, schedule['id']))
+        conn.commit()
+        logger.info(f"Enqueued schedule {schedule['name']} as job {job_id}")
+        outcomes.append({'name': schedule['name'], 'status': 'enqueued', 'job_id': job_id})
+
+    conn.close()
+    return outcomes
+
+
+def main():
+    import argparse
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description='Recurring lead campaign scheduler.')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('run', help='Run the scheduler loop in this process')
+    add = sub.add_parser('add', help='Create or replace a schedule')
+    add.add_argument('name')
+    add.add_argument('cron', help='e.g. "0 9 * * 1-5"')
+    add.add_argument('payload', help='Campaign payload as JSON')
+    add.add_argument('--jitter', type=int, default=DEFAULT_JITTER_SECONDS, help='Max start delay in seconds')
+    sub.add_parser('list', help='List schedules')
+    remove = sub.add_parser('delete', help='Delete a schedule')
+    remove.add_argument('name')
+    args = parser.parse_args()
+
+    jobs.init_jobs_db()
+    init_schedules()
+
+    if args.command == 'add':
+        schedule = add_schedule(args.name, args.cron, json_backend.loads(args.payload), args.jitter)
+        print(f"🗓️  {schedule['name']} ({schedule['cron']}) next run {schedule['next_run_at']}")
+    elif args.command == 'list':
+        for schedule in list_schedules():
+            state = 'enabled' if schedule['enabled'] else 'disabled'
+            print(f"{schedule['name']}  {schedule['cron']}  {state}  next={schedule['next_run_at']}  "
+                  f"last={schedule['last_status'] or '-'}")
+    elif args.command == 'delete':
+        print('Deleted' if delete_schedule(args.name) else 'Not found', args.name)
+    else:
+        print('Starting scheduler — watching schedules in', jobs.DB_PATH)
+        while True:
+            for outcome in run_due():
+                print(outcome['status'], outcome['name'], outcome['job_id'])
+            time.sleep(POLL_SECONDS)
+
+
+if __name__ == '__main__':
+    main()
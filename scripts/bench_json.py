@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""JSON encode/decode benchmark on lead payloads.
+
+Compares the standard library `json` module with orjson (when installed)
+through json_backend on the payloads the app actually moves:
+
+    lead              one qualified lead (a `lead` stream event, a campaign_leads row)
+    campaign_result   a finished job result: counts plus top_leads (jobs.result, GET /api/lead-gen/job/<id>)
+    leads_1000        1,000 qualified leads (GET /api/lead-gen/leads, admin exports)
+
+Leads come from the synthetic source and are scored by the default ruleset,
+so they carry the same fields as real ones. Reports microseconds per
+dumps/loads (best of --repeat runs) and the speed-up over `json`.
+
+    python scripts/bench_json.py
+    python scripts/bench_json.py --output bench_json.json
+"""
+import os
+import sys
+import json
+import random
+import timeit
+import argparse
+import platform
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import json_backend
+
+
+def make_leads(count, seed=0):
+    from lead_rules import get_ruleset
+    from lead_sources import SyntheticSource
+
+    rng = random.Random(seed)
+    sources = [SyntheticSource('instagram', seed=seed), SyntheticSource('linkedin', seed=seed)]
+    leads = [sources[i % 2].make_lead(rng, i, '#cleanbeauty' if i % 2 == 0 else 'founder') for i in range(count)]
+    return get_ruleset().qualify_many(leads)
+
+
+def payloads():
+    leads = make_leads(1000)
+    qualified = [lead for lead in leads if lead['qualified']]
+    return {
+        'lead': qualified[0],
+        'campaign_result': {
+            'campaign_id': '20261019_120000_ab12cd34',
+            'total_found': 1000,
+            'duplicates': 0,
+            'skipped_known': 0,
+            'qualified': len(qualified),
+            'top_leads': qualified[:20],
+            'outreach_sent': 0,
+        },
+        'leads_1000': leads,
+    }
+
+
+def _time(fn, number, repeat):
+    return min(timeit.repeat(fn, number=number, repeat=repeat)) / number * 1e6
+
+
+def run(number=200, repeat=5):
+    """{payload: {backend: {dumps_us, loads_us, bytes}}} for json and, when installed, orjson."""
+    orjson = json_backend.orjson
+    backends = ['json'] + (['orjson'] if orjson is not None else [])
+    results = {}
+    try:
+        for name, payload in payloads().items():
+            # Big payloads get fewer calls per run so each size takes similar time
+            calls = max(1, number // 50) if name == 'leads_1000' else number
+            for backend in backends:
+                json_backend.orjson = orjson if backend == 'orjson' else None
+                encoded = json_backend.dumpb(payload)
+                assert json_backend.loads(encoded) == json.loads(encoded)
+                results.setdefault(name, {})[backend] = {
+                    'dumps_us': round(_time(lambda: json_backend.dumps(payload), calls, repeat), 1),
+                    'loads_us': round(_time(lambda: json_backend.loads(encoded), calls, repeat), 1),
+                    'bytes': len(encoded),
+                }
+    finally:
+        json_backend.orjson = orjson
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark JSON encoding of lead payloads.')
+    parser.add_argument('--number', type=int, default=200, help='Calls per timing run (divided by 50 for leads_1000)')
+    parser.add_argument('--repeat', type=int, default=5, help='Timing runs; the fastest is reported')
+    parser.add_argument('--output', help='Also write results to this JSON file')
+    args = parser.parse_args()
+
+    results = run(args.number, args.repeat)
+    for name, by_backend in results.items():
+        base = by_backend['json']
+        for backend, r in by_backend.items():
+            print(f"{name:>16} {backend:>7}  dumps {r['dumps_us']:>9.1f} us ({base['dumps_us'] / r['dumps_us']:4.1f}x)  "
+                  f"loads {r['loads_us']:>9.1f} us ({base['loads_us'] / r['loads_us']:4.1f}x)  {r['bytes']:>8} B",
+                  file=sys.stderr)
+    if json_backend.orjson is None:
+        print('orjson not installed; only the json backend was measured', file=sys.stderr)
+
+    report = {
+        'meta': {'python': platform.python_version(), 'platform': platform.platform(),
+                 'backend': json_backend.backend(), 'number': args.number, 'repeat': args.repeat},
+        'results': results,
+    }
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
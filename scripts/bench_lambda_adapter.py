@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""Micro-benchmark of the Netlify function request path.
+
+Times one Lambda proxy event at a time through:
+
+    legacy    the previous wrapper's Flask test_request_context + full_dispatch_request fallback
+    awsgi     awsgi.response (only when an installed awsgi provides it)
+    adapter   lambda_adapter.LambdaAdapter into the Flask app
+    fast      LambdaAdapter fast routes (/health only), as netlify/functions/app.py serves them
+
+for /health, a rule-based /api/chat POST and the /lead-gen HTML page (with
+Accept-Encoding: gzip, so the adapter compresses it), and prints microseconds
+per event (best of --repeat runs of --number calls) plus response sizes.
+
+    python scripts/bench_lambda_adapter.py
+    python scripts/bench_lambda_adapter.py --number 2000 --output bench_lambda.json
+"""
+import os
+import sys
+import json
+import base64
+import timeit
+import argparse
+import platform
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def _event(path, method='GET', body=None):
+    return {
+        'httpMethod': method,
+        'path': path,
+        'headers': {'Host': 'collide.example', 'Content-Type': 'application/json', 'Accept-Encoding': 'gzip'},
+        'queryStringParameters': None,
+        'isBase64Encoded': False,
+        'body': json.dumps(body) if body is not None else None,
+        'requestContext': {'identity': {'sourceIp': '203.0.113.9'}},
+    }
+
+
+EVENTS = {
+    'health': _event('/health'),
+    'chat': _event('/api/chat', 'POST', {'message': 'What should my pricing strategy be?', 'session_id': 'bench'}),
+    'lead_gen_page': _event('/lead-gen'),
+}
+
+
+def legacy_dispatch(flask_app, event):
+    """The test_request_context fallback the Netlify wrapper used before LambdaAdapter."""
+    path = event.get('rawPath') or event.get('path') or '/'
+    method = event.get('httpMethod', 'GET')
+    headers = event.get('headers') or {}
+    qs = event.get('queryStringParameters') or {}
+    body = event.get('body')
+    if event.get('isBase64Encoded') and body:
+        body = base64.b64decode(body)
+    with flask_app.test_request_context(path=path, method=method, headers=headers, data=body, query_string=qs):
+        resp = flask_app.full_dispatch_request()
+        return {
+            'statusCode': resp.status_code,
+            'headers': {k: v for k, v in resp.headers.items()},
+            'body': resp.get_data(as_text=True)
+        }
+
+
+def paths():
+    """name -> handler(event) for every path available here."""
+    import app as app_module
+    from lambda_adapter import LambdaAdapter
+
+    flask_app = app_module.app
+    adapter = LambdaAdapter(flask_app)
+    fast = LambdaAdapter(flask_app)
+    fast.fast_route('/health', lambda: (200, {'Content-Type': 'application/json'},
+                                        json.dumps(app_module.health_status()).encode()))
+
+    handlers = {'legacy': lambda event: legacy_dispatch(flask_app, event)}
+    try:
+        import awsgi
+        if hasattr(awsgi, 'response'):
+            handlers['awsgi'] = lambda event: awsgi.response(flask_app, event, None)
+    except ImportError:
+        pass
+    handlers['adapter'] = lambda event: adapter(event, None)
+    handlers['fast'] = lambda event: fast(event, None)
+    return handlers
+
+
+def run(number=500, repeat=5):
+    results = {}
+    for name, handler in paths().items():
+        for event_name, event in EVENTS.items():
+            if name == 'fast' and event_name != 'health':
+                continue
+            response = handler(event)
+            seconds = min(timeit.repeat(lambda: handler(event), number=number, repeat=repeat)) / number
+            results.setdefault(event_name, {})[name] = {
+                'us_per_event': round(seconds * 1e6, 1),
+                'status': response['statusCode'],
+                'body_bytes': len(response['body']),
+                'base64': bool(response.get('isBase64Encoded')),
+            }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the Netlify function request path.')
+    parser.add_argument('--number', type=int, default=500, help='Calls per timing run')
+    parser.add_argument('--repeat', type=int, default=5, help='Timing runs; the fastest is reported')
+    parser.add_argument('--output', help='Also write results to this JSON file')
+    args = parser.parse_args()
+
+    # Keep the benchmark's chat traffic and any tables out of the real databases
+    workdir = tempfile.mkdtemp(prefix='bench_lambda_')
+    os.environ.setdefault('JOBS_DB_PATH', os.path.join(workdir, 'jobs.db'))
+    os.environ.setdefault('CAMPAIGN_DB_PATH', os.path.join(workdir, 'campaigns.db'))
+    import logging
+    logging.disable(logging.INFO)
+
+    results = run(args.number, args.repeat)
+    for event_name, by_path in results.items():
+        legacy = by_path['legacy']['us_per_event']
+        for name, r in by_path.items():
+            print(f"{event_name:>14} {name:>8} {r['us_per_event']:>9.1f} us  {legacy / r['us_per_event']:5.2f}x  "
+                  f"{r['body_bytes']:>7} B{' (base64)' if r['base64'] else ''}", file=sys.stderr)
+
+    report = {
+        'meta': {'python': platform.python_version(), 'platform': platform.platform(),
+                 'number': args.number, 'repeat': args.repeat},
+        'results': results,
+    }
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
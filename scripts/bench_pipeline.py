@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""End-to-end lead pipeline benchmark.
+
+Runs LeadGenerator.run_lead_generation_campaign (incremental, with auto
+outreach) over two synthetic lead sources at several lead counts, with
+injected network latency, and records throughput, peak RSS and the per-stage
+timings of the campaign's trace (search, dedup, qualify, email_find, outreach,
+save) as JSON.
+
+Each size runs in a fresh subprocess so peak RSS belongs to that size alone.
+Nothing touches the real jobs.db / campaigns.db: the campaign store, quota
+counters and outbox live in a temporary directory, and Hunter is replaced by a stand-in
+that sleeps --email-latency seconds per lookup.
+
+    python scripts/bench_pipeline.py                       # 1k/10k/100k, print results
+    python scripts/bench_pipeline.py --write-baseline      # save benchmarks/pipeline_baseline.json
+    python scripts/bench_pipeline.py --check               # fail (exit 1) on >25% regression
+    python scripts/bench_pipeline.py --sizes 1000 --check --threshold 0.5
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import contextlib
+import platform
+import resource
+import tempfile
+import subprocess
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+DEFAULT_BASELINE = os.path.join(ROOT, 'benchmarks', 'pipeline_baseline.json')
+DEFAULT_THRESHOLD = 0.25
+
+# Stages faster than this are reported but never fail a check (timer noise)
+MIN_CHECKED_SECONDS = 0.05
+
+# Top-level spans of LeadGenerator.run_lead_generation_campaign
+STAGES = ['search', 'dedup', 'qualify', 'email_find', 'outreach', 'save']
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_size(size: int, search_latency: float = 0.002, email_latency: float = 0.0,
+             page_size: int = 500, duplicate_rate: float = 0.1) -> dict:
+    """Run one incremental campaign over `size` synthetic leads in this process and return its timings."""
+    workdir = tempfile.mkdtemp(prefix='bench_pipeline_')
+    os.environ['CAMPAIGN_DB_PATH'] = os.path.join(workdir, 'campaigns.db')
+    os.environ['JOBS_DB_PATH'] = os.path.join(workdir, 'jobs.db')
+    os.environ['QUOTA_HUNTER_LIMIT'] = str(10 ** 9)
+    os.environ['QUOTA_HUNTER_RATE'] = '0'
+
+    import tracing
+    import lead_gen
+
+    def hunter_stand_in(url, params=None, **kwargs):
+        if email_latency:
+            time.sleep(email_latency)
+        email = f"{params['first_name'].lower() or 'hello'}@{params['domain']}"
+        return SimpleNamespace(status_code=200, headers={}, json=lambda: {'data': {'email': email}})
+
+    import requests
+    requests.get = hunter_stand_in
+    generator = lead_gen.LeadGenerator()
+    generator.hunter_api_key = 'bench'
+
+    # Two providers; the second re-finds `duplicate_rate` of the first's leads.
+    # The campaign gives each source max_leads // 2 results.
+    duplicates = int(size * duplicate_rate)
+    options = f"latency={search_latency},page_size={page_size},seed=1"
+    sources = [f"synthetic:count={size - duplicates},{options}", f"synthetic:count={duplicates},{options}"]
+
+    # The campaign prints a line per lead; only the JSON result goes to stdout
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull), \
+            tracing.trace('campaign') as root:
+        result = generator.run_lead_generation_campaign(
+            instagram_hashtags=['#cleanbeauty', '#slowfashion'], max_leads=2 * size,
+            auto_outreach=True, incremental=True, sources=sources)
+
+    trace = root.to_dict()
+    totals = tracing.stage_totals(trace)
+    total = trace['duration_ms'] / 1000
+    # total_found counts leads left after dedup; throughput is over every lead searched
+    found = result['total_found'] + result['skipped_known']
+    return {
+        'size': size,
+        'found': found,
+        'duplicates_dropped': result['skipped_known'],
+        'qualified': result['qualified'],
+        'queued': result['outreach_sent'],
+        'total_seconds': round(total, 4),
+        'throughput_leads_per_s': round(found / total, 1),
+        'peak_rss_mb': round(_peak_rss_mb(), 1),
+        'stages': {name: round(totals.get(name, 0.0) / 1000, 4) for name in STAGES},
+    }
+
+
+def run_sizes(sizes, args) -> dict:
+    results = {}
+    for size in sizes:
+        cmd = [sys.executable, os.path.abspath(__file__), '--run-size', str(size),
+               '--search-latency', str(args.search_latency), '--email-latency', str(args.email_latency),
+               '--page-size', str(args.page_size)]
+        output = subprocess.run(cmd, check=True, capture_output=True, text=True).stdout
+        results[str(size)] = json.loads(output.strip().splitlines()[-1])
+        r = results[str(size)]
+        print(f"{size:>8} leads  {r['total_seconds']:8.2f}s  {r['throughput_leads_per_s']:>10.0f} leads/s  "
+              f"{r['peak_rss_mb']:7.1f} MB  " + '  '.join(f"{k}={v:.3f}" for k, v in r['stages'].items()),
+              file=sys.stderr)
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'search_latency': args.search_latency,
+            'email_latency': args.email_latency,
+            'page_size': args.page_size,
+            'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD) -> list:
+    """
+    Regressions of `current` against `baseline` beyond `threshold` (0.25 = 25%):
+    lower throughput, higher peak RSS, or slower stages. Sizes missing from
+    either side are skipped.
+    """
+    problems = []
+    for size, base in baseline.get('results', {}).items():
+        now = current.get('results', {}).get(size)
+        if not now:
+            continue
+        if now['throughput_leads_per_s'] < base['throughput_leads_per_s'] * (1 - threshold):
+            problems.append(f"{size}: throughput {now['throughput_leads_per_s']} < "
+                            f"{base['throughput_leads_per_s']} leads/s")
+        if now['peak_rss_mb'] > base['peak_rss_mb'] * (1 + threshold):
+            problems.append(f"{size}: peak RSS {now['peak_rss_mb']} > {base['peak_rss_mb']} MB")
+        for name, base_seconds in base.get('stages', {}).items():
+            seconds = now.get('stages', {}).get(name)
+            if seconds is None or max(seconds, base_seconds) < MIN_CHECKED_SECONDS:
+                continue
+            if seconds > base_seconds * (1 + threshold):
+                problems.append(f"{size}: {name} {seconds:.3f}s > {base_seconds:.3f}s")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the lead generation pipeline.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--search-latency', type=float, default=0.002, help='Seconds per synthetic provider page')
+    parser.add_argument('--email-latency', type=float, default=0.0, help='Seconds per Hunter lookup')
+    parser.add_argument('--page-size', type=int, default=500)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--write-baseline', action='store_true', help='Save results as the new baseline')
+    parser.add_argument('--check', action='store_true', help='Exit 1 on regressions against the baseline')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument('--output', help='Also write results to this JSON file')
+    parser.add_argument('--run-size', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_size:
+        print(json.dumps(run_size(args.run_size, args.search_latency, args.email_latency, args.page_size)))
+        return
+
+    report = run_sizes(args.sizes, args)
+    print(json.dumps(report, indent=2))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.write_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+            f.write('\n')
+        print(f"Baseline written to {args.baseline}", file=sys.stderr)
+    if args.check:
+        with open(args.baseline) as f:
+            problems = compare(report, json.load(f), args.threshold)
+        for problem in problems:
+            print('REGRESSION:', problem, file=sys.stderr)
+        if problems:
+            sys.exit(1)
+        print(f"No regressions beyond {args.threshold:.0%}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""Build static/ into public/static for Netlify and the Flask app.
+
+For every file in static/:
+
+- an unversioned copy (public/static/style.css), so existing /static/<name>
+  URLs keep working;
+- a minified (.js, .css), content-hashed copy (public/static/style.3f2a9c1d0e.css)
+  with .gz and, when the brotli package is installed, .br siblings;
+- an entry in public/static/manifest.json, which `assets.asset_url()` uses to
+  point the templates at the hashed name;
+- a line in public/_headers giving the hashed file an immutable Cache-Control
+  on Netlify's CDN.
+
+Files are only written when their content changed; hashed outputs from
+earlier builds that the manifest no longer lists are removed.
+
+    python scripts/build_assets.py
+    python scripts/build_assets.py --no-compress
+"""
+import os
+import re
+import sys
+import gzip
+import json
+import hashlib
+import argparse
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC = os.path.join(ROOT, 'static')
+DST = os.path.join(ROOT, 'public', 'static')
+HEADERS_FILE = os.path.join(ROOT, 'public', '_headers')
+MANIFEST_NAME = 'manifest.json'
+
+HASH_LENGTH = 10
+IMMUTABLE = 'public, max-age=31536000, immutable'
+COMPRESSIBLE = ('.js', '.css', '.svg', '.json', '.txt', '.html', '.map')
+
+FINGERPRINTED = re.compile(r'\.[0-9a-f]{%d}\.[^./]+(\.gz|\.br)?$' % HASH_LENGTH)
+
+# Keywords after which a `/` starts a regular expression rather than a division
+_REGEX_KEYWORDS = {'return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'new', 'delete', 'void', 'throw', 'yield'}
+_REGEX_KEYWORD_END = re.compile(r'(?:^|[^\w$])(%s)$' % '|'.join(_REGEX_KEYWORDS))
+# Characters after which a `/` starts a regular expression. After `}` it
+# depends on the brace: a block (`if (x) {...} /re/.test(s)`) or an object
+# literal (`({a: 1}) / 2` is division), tracked while minifying.
+_REGEX_AFTER = set('(,=:[!&|?{;+-*%<>~^')
+# Before `{`, these make it an object literal rather than a block (`=>` excepted)
+_EXPRESSION_BEFORE = set('(,=:[!&|?+-*%<>~^')
+
+
+def _is_word(ch):
+    return ch.isalnum() or ch in '_$'
+
+
+def _scan_string(source, i):
+    """Index just past the quoted string (or template literal) starting at i"""
+    quote, n = source[i], len(source)
+    j = i + 1
+    while j < n and source[j] != quote:
+        j += 2 if source[j] == '\\' else 1
+    return j + 1
+
+
+def _scan_template(source, i):
+    """Index just past the template literal starting at i, including `${...}` substitutions"""
+    j, n = i + 1, len(source)
+    while j < n and source[j] != '`':
+        if source[j] == '\\':
+            j += 2
+        elif source.startswith('${', j):
+            j = _scan_substitution(source, j + 2)
+        else:
+            j += 1
+    return j + 1
+
+
+def _scan_substitution(source, j):
+    """Index just past the `}` closing a template substitution that starts at j"""
+    depth, n = 0, len(source)
+    while j < n:
+        c = source[j]
+        if c in '"\'':
+            j = _scan_string(source, j)
+        elif c == '`':
+            j = _scan_template(source, j)
+        elif source.startswith('//', j):
+            end = source.find('\n', j)
+            j = n if end < 0 else end
+        elif source.startswith('/*', j):
+            end = source.find('*/', j + 2)
+            j = n if end < 0 else end + 2
+        elif c == '{':
+            depth += 1
+            j += 1
+        elif c == '}':
+            if not depth:
+                return j + 1
+            depth -= 1
+            j += 1
+        else:
+            j += 1
+    return j
+
+
+def minify_js(source: str) -> str:
+    """
+    Remove comments and redundant whitespace, keeping line breaks that
+    automatic semicolon insertion may rely on. Strings, regular expressions
+    and template literals (substitutions included) are copied unchanged.
+    """
+    out, pending, i, n = [], None, 0, len(source)
+    # One entry per open brace: True for a block, False for an object literal
+    braces, closed_block = [], True
+    while i < n:
+        c = source[i]
+        if c.isspace():
+            pending = '\n' if c == '\n' or pending == '\n' else ' '
+            i += 1
+            continue
+        if source.startswith('//', i):
+            end = source.find('\n', i)
+            i = n if end < 0 else end
+            continue
+        if source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            end = n if end < 0 else end + 2
+            pending = '\n' if pending == '\n' or '\n' in source[i:end] else ' '
+            i = end
+            continue
+
+        prev = out[-1][-1] if out else ''
+        if pending and out:
+            if _is_word(prev) and _is_word(c) or prev in '+-' and c == prev:
+                out.append(pending)
+            elif pending == '\n' and prev not in '{;,([' and c not in ')]},;.:?':
+                out.append('\n')
+        pending = None
+        prev = out[-1][-1] if out else ''
+
+        if c in '"\'':
+            end = _scan_string(source, i)
+        elif c == '`':
+            end = _scan_template(source, i)
+        elif c == '/' and (not prev or prev in _REGEX_AFTER or prev == '\n' or prev == '}' and closed_block
+                           or _REGEX_KEYWORD_END.search(''.join(out[-3:]))):
+            end, in_class = i + 1, False
+            while end < n and source[end] != '\n':
+                ch = source[end]
+                if ch == '\\':
+                    end += 2
+                    continue
+                if ch == '[':
+                    in_class = True
+                elif ch == ']':
+                    in_class = False
+                elif ch == '/' and not in_class:
+                    break
+                end += 1
+            end += 1
+        else:
+            end = i + 1
+            if _is_word(c):
+                while end < n and _is_word(source[end]):
+                    end += 1
+            elif c == '{':
+                tail = ''.join(out[-3:])
+                keyword = _REGEX_KEYWORD_END.search(tail)
+                braces.append(not (prev in _EXPRESSION_BEFORE and not tail.endswith('=>')
+                                   or keyword and keyword.group(1) not in ('do', 'else')))
+            elif c == '}':
+                closed_block = braces.pop() if braces else True
+        out.append(source[i:end])
+        i = end
+    return ''.join(out).strip() + '\n'
+
+
+def minify_css(source: str) -> str:
+    """Remove comments and whitespace around braces, semicolons, commas and child combinators"""
+    out, pending, i, n = [], False, 0, len(source)
+    while i < n:
+        c = source[i]
+        if c.isspace():
+            pending = True
+            i += 1
+            continue
+        if source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            i = n if end < 0 else end + 2
+            pending = True
+            continue
+        prev = out[-1][-1] if out else ''
+        if pending and out and prev not in '{};,>:' and c not in '{};,>':
+            out.append(' ')
+        pending = False
+        if c in '"\'':
+            end = _scan_string(source, i)
+        else:
+            end = i + 1
+            if c == '}' and out and out[-1] == ';':
+                out.pop()
+        out.append(source[i:end])
+        i = end
+    return ''.join(out) + '\n'
+
+
+MINIFIERS = {'.js': minify_js, '.css': minify_css}
+
+
+def fingerprint(name: str, content: bytes) -> str:
+    stem, ext = os.path.splitext(name)
+    return f'{stem}.{hashlib.sha256(content).hexdigest()[:HASH_LENGTH]}{ext}'
+
+
+def compressors():
+    """(suffix, compress(bytes) -> bytes) for the available encodings"""
+    found = [('.gz', lambda data: gzip.compress(data, 9, mtime=0))]
+    if brotli is not None:
+        found.append(('.br', lambda data: brotli.compress(data, quality=11)))
+    return found
+
+
+def _write_if_changed(path, data: bytes) -> bool:
+    try:
+        with open(path, 'rb') as f:
+            if f.read() == data:
+                return False
+    except OSError:
+        pass
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+    return True
+
+
+def _source_files(src):
+    for directory, _, files in os.walk(src):
+        for filename in sorted(files):
+            path = os.path.join(directory, filename)
+            yield os.path.relpath(path, src).replace(os.sep, '/'), path
+
+
+def headers_file(manifest, url_prefix='/static/'):
+    """Netlify _headers rules giving each fingerprinted file a year-long immutable cache"""
+    lines = []
+    for name in sorted(manifest.values()):
+        lines += [url_prefix + name, f'  Cache-Control: {IMMUTABLE}']
+    return '\n'.join(lines) + '\n'
+
+
+def build(src=SRC, dst=DST, headers_path=HEADERS_FILE, compress=True):
+    """Build every asset; returns the manifest, the paths written and the stale outputs removed"""
+    manifest, outputs, written, sizes = {}, set(), [], {}
+    encodings = compressors() if compress else []
+
+    for name, path in _source_files(src):
+        with open(path, 'rb') as f:
+            data = f.read()
+        if _write_if_changed(os.path.join(dst, name), data):
+            written.append(name)
+
+        ext = os.path.splitext(name)[1].lower()
+        minify = MINIFIERS.get(ext)
+        built = minify(data.decode('utf-8')).encode('utf-8') if minify else data
+        hashed = fingerprint(name, built)
+        manifest[name] = hashed
+        outputs.add(hashed)
+        sizes[name] = {'source': len(data), 'built': len(built)}
+        # Hashed names are content-addressed: an existing file is already up to date
+        if _write_if_changed(os.path.join(dst, hashed), built):
+            written.append(hashed)
+
+        if ext in COMPRESSIBLE:
+            for suffix, encode in encodings:
+                target = os.path.join(dst, hashed + suffix)
+                if not os.path.exists(target):
+                    encoded = encode(built)
+                    if len(encoded) >= len(built):
+                        continue
+                    _write_if_changed(target, encoded)
+                    written.append(hashed + suffix)
+                outputs.add(hashed + suffix)
+                sizes[name][suffix.lstrip('.')] = os.path.getsize(target)
+
+    removed = []
+    for name, path in _source_files(dst):
+        if FINGERPRINTED.search(name) and name not in outputs:
+            os.remove(path)
+            removed.append(name)
+
+    if _write_if_changed(os.path.join(dst, MANIFEST_NAME), (json.dumps(manifest, indent=2, sort_keys=True) + '\n').encode()):
+        written.append(MANIFEST_NAME)
+    if headers_path and _write_if_changed(headers_path, headers_file(manifest).encode()):
+        written.append(os.path.relpath(headers_path, os.path.dirname(dst)))
+    return {'manifest': manifest, 'written': written, 'removed': removed, 'sizes': sizes}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Minify, fingerprint and precompress static assets.')
+    parser.add_argument('--src', default=SRC)
+    parser.add_argument('--dst', default=DST)
+    parser.add_argument('--no-compress', action='store_true', help='Skip the .gz/.br siblings')
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.src):
+        print(f'Source static directory not found: {args.src}', file=sys.stderr)
+        sys.exit(1)
+    headers_path = HEADERS_FILE if os.path.abspath(args.dst) == DST else None
+    report = build(args.src, args.dst, headers_path, compress=not args.no_compress)
+
+    for name, size in report['sizes'].items():
+        extra = ''.join(f"  {k} {v}" for k, v in size.items() if k in ('gz', 'br'))
+        print(f"{name:>16} -> {report['manifest'][name]:<28} {size['source']:>7} -> {size['built']:>7} B{extra}")
+    if brotli is None and not args.no_compress:
+        print('brotli not installed; skipped .br files')
+    print(f"Wrote {len(report['written'])} file(s), removed {len(report['removed'])} stale file(s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""Cold-start import profile for the web app and the Netlify function.
+
+Imports a module in fresh interpreters and serves one request through the
+Flask test client, the way a cold Netlify function handles its first hit:
+
+- import and first-request wall time (best of --repeat runs);
+- the slowest imports beneath the module, from `python -X importtime`;
+- heavy dependencies that must stay lazy (LAZY_MODULES) but were loaded by the
+  import or by the request.
+
+    python scripts/import_profile.py                                  # `import app` + GET /health
+    python scripts/import_profile.py --module netlify.functions.app
+    python scripts/import_profile.py --check --budget-ms 250          # exit 1 over budget or on eager heavy imports
+"""
+import os
+import sys
+import json
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_BUDGET_MS = 250
+
+# Loaded only by the routes that need them (chat in API mode, lead generation, quota, RQ, brand assessment)
+LAZY_MODULES = ['openai', 'httpx', 'requests', 'pyarrow', 'redis', 'rq', 'lead_gen', 'lead_gen_pro', 'quota',
+                'numpy', 'collide_core', 'plotly', 'visualization']
+
+CHILD = '''
+import json, sys, time
+start = time.perf_counter()
+module = __import__({module!r}, fromlist=['_'])
+imported = time.perf_counter()
+flask_app = getattr(module, 'flask_app', None) or module.app
+client = flask_app.test_client()
+before = set(sys.modules)
+requested = time.perf_counter()
+response = client.get({path!r})
+done = time.perf_counter()
+print(json.dumps({{
+    'import_ms': round((imported - start) * 1000, 2),
+    'request_ms': round((done - requested) * 1000, 2),
+    'status': response.status_code,
+    'import_modules': sorted(before),
+    'request_modules': sorted(set(sys.modules) - before),
+}}))
+'''
+
+
+def _run(module, path, importtime=False):
+    workdir = tempfile.mkdtemp(prefix='import_profile_')
+    env = dict(os.environ,
+               JOBS_DB_PATH=os.path.join(workdir, 'jobs.db'),
+               CAMPAIGN_DB_PATH=os.path.join(workdir, 'campaigns.db'))
+    cmd = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', CHILD.format(module=module, path=path)]
+    try:
+        proc = subprocess.run(cmd, cwd=ROOT, env=env, capture_output=True, text=True)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f'profiling {module} failed:\n{proc.stderr[-2000:]}')
+    return json.loads(proc.stdout.strip().splitlines()[-1]), proc.stderr
+
+
+def parse_importtime(stderr):
+    """`-X importtime` lines as (name, depth, self_us, cumulative_us), in output order."""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        entries.append((name.strip(), depth, int(self_us), int(cumulative_us)))
+    return entries
+
+
+def slowest_imports(entries, module, limit=10):
+    """The `limit` slowest imports triggered directly by `module`, in milliseconds."""
+    children, depth = [], None
+    # importtime prints children before their parent, so walk backwards from the module's line
+    for name, level, _, cumulative in reversed(entries):
+        if depth is None:
+            if name == module:
+                depth = level
+            continue
+        if level <= depth:
+            break
+        if level == depth + 1:
+            children.append((name, round(cumulative / 1000, 2)))
+    return sorted(children, key=lambda item: item[1], reverse=True)[:limit]
+
+
+def profile(module='app', path='/health', repeat=3):
+    runs = [_run(module, path)[0] for _ in range(repeat)]
+    best = min(runs, key=lambda run: run['import_ms'])
+    traced, stderr = _run(module, path, importtime=True)
+    loaded = set(best['import_modules']) | set(best['request_modules'])
+    return {
+        'module': module,
+        'path': path,
+        'status': best['status'],
+        'import_ms': best['import_ms'],
+        'request_ms': min(run['request_ms'] for run in runs),
+        'slowest_imports': slowest_imports(parse_importtime(stderr), module),
+        'eager_heavy_modules': sorted(m for m in LAZY_MODULES if m in loaded),
+        'module_count': len(traced['import_modules']),
+    }
+
+
+def check(report, budget_ms):
+    problems = []
+    if report['import_ms'] > budget_ms:
+        problems.append(f"import {report['module']} took {report['import_ms']}ms > {budget_ms}ms budget")
+    if report['eager_heavy_modules']:
+        problems.append(f"cold start loaded lazy dependencies: {', '.join(report['eager_heavy_modules'])}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Profile cold-start imports of the Flask app.')
+    parser.add_argument('--module', default='app', help='Module to import (app or netlify.functions.app)')
+    parser.add_argument('--path', default='/health', help='Path requested after the import')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs; the fastest is reported')
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument('--check', action='store_true', help='Exit 1 over budget or when lazy modules load eagerly')
+    args = parser.parse_args()
+
+    report = profile(args.module, args.path, args.repeat)
+    print(json.dumps(report, indent=2))
+    print(f"import {report['module']}: {report['import_ms']:.1f}ms, first GET {report['path']}: "
+          f"{report['request_ms']:.1f}ms ({report['status']})", file=sys.stderr)
+    for name, ms in report['slowest_imports']:
+        print(f"  {ms:8.1f}ms  {name}", file=sys.stderr)
+
+    if args.check:
+        problems = check(report, args.budget_ms)
+        for problem in problems:
+            print('COLD START:', problem, file=sys.stderr)
+        if problems:
+            sys.exit(1)
+        print(f"Within the {args.budget_ms:.0f}ms budget with no eager heavy imports", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
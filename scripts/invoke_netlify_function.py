@@ -1,6 +1,6 @@
 """Invoke the Netlify function handler directly with a proxy GET event.
 
-This avoids needing Netlify CLI and tests the awsgi wrapper -> Flask app path.
+This avoids needing Netlify CLI and tests the LambdaAdapter wrapper -> Flask app path.
 """
 import json
 import os
@@ -0,0 +1,460 @@
+#!/usr/bin/env python3
+"""HTTP load test for the Flask API.
+
+Hammers one endpoint at a time with --concurrency client threads (one
+keep-alive session each) for --duration seconds or --requests requests, and
+reports p50/p95/p99 latency, RPS and errors per scenario:
+
+    chat_rule            POST /api/chat, rule-based replies
+    chat_openai          POST /api/chat through a mock OpenAI server (--openai-latency per completion)
+    queue                POST /api/lead-gen/queue
+    job                  GET  /api/lead-gen/job/<id> over --seed-jobs queued jobs
+    admin_conversations  GET  /admin/api/conversations (logged in as admin)
+
+By default each gunicorn deployment (sync, threaded = gthread, async = gevent)
+is started in turn on a free port, with jobs.db / campaigns.db in a temporary
+directory and REDIS_URL unset; deployments whose worker class is not installed
+are skipped. chat_openai gets its own instance started with USE_OPENAI_API=1 and
+OPENAI_BASE_URL pointing at the mock. Use --server to test a running app instead
+(chat_openai then uses whatever OpenAI backend that server is configured with).
+
+    python scripts/load_test.py                                  # sync/threaded/async, all scenarios
+    python scripts/load_test.py --deploy threaded --scenarios chat_openai --concurrency 32
+    python scripts/load_test.py --server http://127.0.0.1:5001 --scenarios chat_rule job
+    python scripts/load_test.py --write-baseline                 # save benchmarks/load_baseline.json
+    python scripts/load_test.py --check                          # fail (exit 1) on >25% regression
+"""
+import os
+import sys
+import json
+import math
+import time
+import random
+import shutil
+import socket
+import argparse
+import platform
+import tempfile
+import itertools
+import threading
+import subprocess
+import importlib.util
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_DEPLOYMENTS = ['sync', 'threaded', 'async']
+DEFAULT_BASELINE = os.path.join(ROOT, 'benchmarks', 'load_baseline.json')
+DEFAULT_THRESHOLD = 0.25
+
+# p95 latencies below this are reported but never fail a check (timer noise)
+MIN_CHECKED_MS = 5.0
+
+ADMIN_LOGIN = {'username': 'admin', 'password': 'collide2025'}
+
+CHAT_MESSAGES = [
+    'How do I position a sustainable skincare brand?',
+    'What should my pricing strategy be?',
+    'Help me plan a product launch on Instagram',
+    'Who is my target audience?',
+    'Hello!',
+]
+
+QUEUE_PAYLOAD = {
+    'instagram_hashtags': ['#cleanbeauty'],
+    'linkedin_keywords': ['founder'],
+    'max_leads': 10,
+    'sources': ['fixture_instagram', 'fixture_linkedin'],
+}
+
+
+# Scenarios ----------------------------------------------------------------
+
+def chat_request(session, base_url, ctx):
+    return session.post(f'{base_url}/api/chat', timeout=ctx['timeout'], json={
+        'message': random.choice(CHAT_MESSAGES),
+        'session_id': f'load-{threading.get_ident()}',
+        'history': [],
+        'persona': 'strategist',
+    })
+
+
+def queue_request(session, base_url, ctx):
+    return session.post(f'{base_url}/api/lead-gen/queue', json=QUEUE_PAYLOAD, timeout=ctx['timeout'])
+
+
+def job_request(session, base_url, ctx):
+    return session.get(f"{base_url}/api/lead-gen/job/{random.choice(ctx['job_ids'])}", timeout=ctx['timeout'])
+
+
+def admin_conversations_request(session, base_url, ctx):
+    return session.get(f'{base_url}/admin/api/conversations', timeout=ctx['timeout'])
+
+
+# name -> (request function, server mode, needs an admin session)
+SCENARIOS = {
+    'chat_rule': (chat_request, 'rule', False),
+    'chat_openai': (chat_request, 'openai', False),
+    'queue': (queue_request, 'rule', False),
+    'job': (job_request, 'rule', False),
+    'admin_conversations': (admin_conversations_request, 'rule', True),
+}
+
+
+def admin_session(base_url, timeout=10):
+    session = requests.Session()
+    response = session.post(f'{base_url}/admin/login', data=ADMIN_LOGIN, timeout=timeout, allow_redirects=False)
+    if response.status_code != 302:
+        raise RuntimeError(f'admin login failed with HTTP {response.status_code}')
+    return session
+
+
+def seed_jobs(base_url, count, timeout=10):
+    """Queue `count` campaigns so the job scenario has ids to poll."""
+    job_ids = []
+    for _ in range(count):
+        response = requests.post(f'{base_url}/api/lead-gen/queue', json=QUEUE_PAYLOAD, timeout=timeout)
+        response.raise_for_status()
+        job_ids.append(response.json()['job_id'])
+    return job_ids
+
+
+# Measurement --------------------------------------------------------------
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies, errors, elapsed):
+    """Latencies are seconds per successful request; the summary is in milliseconds."""
+    latencies = sorted(latencies)
+    ms = [round(v * 1000, 2) for v in latencies]
+    total = len(latencies) + errors
+    return {
+        'requests': total,
+        'errors': errors,
+        'rps': round(total / elapsed, 1) if elapsed else 0.0,
+        'mean_ms': round(sum(ms) / len(ms), 2) if ms else 0.0,
+        'p50_ms': percentile(ms, 50),
+        'p95_ms': percentile(ms, 95),
+        'p99_ms': percentile(ms, 99),
+        'max_ms': ms[-1] if ms else 0.0,
+    }
+
+
+def run_scenario(base_url, name, concurrency=16, duration=10.0, total_requests=None, timeout=30.0, job_ids=None):
+    """
+    Run one scenario with `concurrency` threads until `duration` seconds pass
+    (or `total_requests` requests were sent) and return its summary.
+    """
+    send, _, needs_admin = SCENARIOS[name]
+    ctx = {'timeout': timeout, 'job_ids': job_ids or []}
+    if name == 'job' and not ctx['job_ids']:
+        ctx['job_ids'] = seed_jobs(base_url, 10, timeout)
+    sessions = [admin_session(base_url, timeout) if needs_admin else requests.Session()
+                for _ in range(concurrency)]
+
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+    counter = itertools.count()
+    deadline = time.perf_counter() + duration
+
+    def client(session):
+        mine, failed = [], 0
+        while True:
+            if total_requests is not None:
+                if next(counter) >= total_requests:
+                    break
+            elif time.perf_counter() >= deadline:
+                break
+            start = time.perf_counter()
+            try:
+                ok = send(session, base_url, ctx).status_code < 400
+            except requests.RequestException:
+                ok = False
+            if ok:
+                mine.append(time.perf_counter() - start)
+            else:
+                failed += 1
+        with lock:
+            latencies.extend(mine)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=client, args=(s,), daemon=True) for s in sessions]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    for s in sessions:
+        s.close()
+    return summarize(latencies, errors[0], elapsed)
+
+
+# Mock OpenAI --------------------------------------------------------------
+
+class MockOpenAI:
+    """
+    Minimal OpenAI-compatible server for POST /v1/chat/completions that sleeps
+    `latency` seconds per completion, so chat_openai measures how each
+    deployment copes with slow upstream calls rather than OpenAI itself.
+    """
+
+    def __init__(self, latency=0.3, host='127.0.0.1', port=0):
+        self.latency = latency
+        self.requests = 0
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+                mock.requests += 1
+                if mock.latency:
+                    time.sleep(mock.latency)
+                payload = json.dumps({
+                    'id': f'chatcmpl-load-{mock.requests}',
+                    'object': 'chat.completion',
+                    'created': int(time.time()),
+                    'model': body.get('model', 'gpt-4'),
+                    'choices': [{
+                        'index': 0,
+                        'message': {'role': 'assistant', 'content': 'Mock strategy advice for load testing.'},
+                        'finish_reason': 'stop',
+                    }],
+                    'usage': {'prompt_tokens': 120, 'completion_tokens': 40, 'total_tokens': 160},
+                }).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.url = f'http://{host}:{self.server.server_address[1]}/v1'
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+# Deployments --------------------------------------------------------------
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def deployment_command(deployment, port, workers=3, threads=4):
+    """Command line for a deployment, or None with the reason it cannot run here."""
+    if importlib.util.find_spec('gunicorn') is None:
+        return None, 'gunicorn is not installed'
+    base = [sys.executable, '-m', 'gunicorn', '-b', f'127.0.0.1:{port}', '-w', str(workers)]
+    if deployment == 'sync':
+        return base + ['-k', 'sync', 'app:app'], None
+    if deployment == 'threaded':
+        return base + ['-k', 'gthread', '--threads', str(threads), 'app:app'], None
+    if deployment == 'async':
+        if importlib.util.find_spec('gevent') is None:
+            return None, 'gevent is not installed'
+        return base + ['-k', 'gevent', '--worker-connections', '1000', 'app:app'], None
+    raise ValueError(f'Unknown deployment: {deployment}')
+
+
+class Deployment:
+    """One gunicorn instance of app:app with its own temporary databases."""
+
+    def __init__(self, command, workdir, openai_url=None, startup_timeout=30.0):
+        self.command = command
+        self.port = int(command[command.index('-b') + 1].rsplit(':', 1)[1])
+        self.url = f'http://127.0.0.1:{self.port}'
+        self.startup_timeout = startup_timeout
+        self.log_path = os.path.join(workdir, f'server-{self.port}.log')
+        self.env = dict(os.environ,
+                        JOBS_DB_PATH=os.path.join(workdir, 'jobs.db'),
+                        CAMPAIGN_DB_PATH=os.path.join(workdir, 'campaigns.db'),
+                        # Shared by all workers so the admin session cookie is valid on each
+                        SECRET_KEY='load-test',
+                        USE_OPENAI_API='1' if openai_url else '0')
+        self.env.pop('REDIS_URL', None)
+        if openai_url:
+            self.env.update(OPENAI_API_KEY='load-test', OPENAI_BASE_URL=openai_url)
+
+    def __enter__(self):
+        self.log = open(self.log_path, 'w')
+        self.process = subprocess.Popen(self.command, cwd=ROOT, env=self.env, stdout=self.log,
+                                        stderr=subprocess.STDOUT)
+        deadline = time.time() + self.startup_timeout
+        while time.time() < deadline:
+            if self.process.poll() is not None:
+                break
+            try:
+                if requests.get(f'{self.url}/health', timeout=1).status_code == 200:
+                    return self
+            except requests.RequestException:
+                pass
+            time.sleep(0.2)
+        self.__exit__()
+        with open(self.log_path) as f:
+            tail = f.read()[-2000:]
+        raise RuntimeError(f'server did not start: {" ".join(self.command)}\n{tail}')
+
+    def __exit__(self, *exc):
+        if self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        self.log.close()
+
+
+# Runner -------------------------------------------------------------------
+
+def _print_row(deployment, scenario, stats):
+    print(f"{deployment:>9} {scenario:<20} {stats['requests']:>7} req  {stats['rps']:>8.1f} rps  "
+          f"p50 {stats['p50_ms']:>8.1f}  p95 {stats['p95_ms']:>8.1f}  p99 {stats['p99_ms']:>8.1f} ms  "
+          f"{stats['errors']} errors", file=sys.stderr)
+
+
+def run_scenarios(base_url, scenarios, args, label):
+    results = {}
+    job_ids = seed_jobs(base_url, args.seed_jobs) if 'job' in scenarios else None
+    for name in scenarios:
+        results[name] = run_scenario(base_url, name, args.concurrency, args.duration, args.requests,
+                                     args.timeout, job_ids)
+        _print_row(label, name, results[name])
+    return results
+
+
+def run_deployment(deployment, scenarios, args):
+    """Start `deployment` (a rule-based and, if needed, an OpenAI-mode instance) and run `scenarios`."""
+    command, reason = deployment_command(deployment, _free_port(), args.workers, args.threads)
+    if command is None:
+        print(f'{deployment:>9} skipped: {reason}', file=sys.stderr)
+        return {'skipped': reason}
+
+    results = {}
+    workdir = tempfile.mkdtemp(prefix='load_test_')
+    try:
+        rule = [s for s in scenarios if SCENARIOS[s][1] == 'rule']
+        if rule:
+            with Deployment(command, workdir) as server:
+                results.update(run_scenarios(server.url, rule, args, deployment))
+        if 'chat_openai' in scenarios:
+            command, _ = deployment_command(deployment, _free_port(), args.workers, args.threads)
+            with MockOpenAI(args.openai_latency) as mock, Deployment(command, workdir, mock.url) as server:
+                results.update(run_scenarios(server.url, ['chat_openai'], args, deployment))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return {name: results[name] for name in scenarios}
+
+
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Regressions of `current` against `baseline` beyond `threshold` (0.25 = 25%):
+    higher p95 latency, lower RPS, or errors where the baseline had none.
+    Deployments or scenarios missing (or skipped) on either side are ignored.
+    """
+    problems = []
+    for deployment, base_scenarios in baseline.get('results', {}).items():
+        now_scenarios = current.get('results', {}).get(deployment) or {}
+        if 'skipped' in base_scenarios or 'skipped' in now_scenarios:
+            continue
+        for name, base in base_scenarios.items():
+            now = now_scenarios.get(name)
+            if not now:
+                continue
+            where = f'{deployment}/{name}'
+            if max(now['p95_ms'], base['p95_ms']) >= MIN_CHECKED_MS and now['p95_ms'] > base['p95_ms'] * (1 + threshold):
+                problems.append(f"{where}: p95 {now['p95_ms']}ms > {base['p95_ms']}ms")
+            if now['rps'] < base['rps'] * (1 - threshold):
+                problems.append(f"{where}: {now['rps']} rps < {base['rps']} rps")
+            if now['errors'] and not base['errors']:
+                problems.append(f"{where}: {now['errors']} errors")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the Flask API.')
+    parser.add_argument('--server', help='Test this running server instead of starting deployments')
+    parser.add_argument('--deploy', default=','.join(DEFAULT_DEPLOYMENTS),
+                        help='Comma-separated gunicorn deployments: sync, threaded, async')
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--concurrency', type=int, default=16, help='Concurrent client threads')
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds per scenario')
+    parser.add_argument('--requests', type=int, help='Requests per scenario (overrides --duration)')
+    parser.add_argument('--timeout', type=float, default=30.0, help='Per-request timeout in seconds')
+    parser.add_argument('--workers', type=int, default=3, help='gunicorn workers (Procfile uses 3)')
+    parser.add_argument('--threads', type=int, default=4, help='Threads per worker for the threaded deployment')
+    parser.add_argument('--openai-latency', type=float, default=0.3, help='Seconds per mock OpenAI completion')
+    parser.add_argument('--seed-jobs', type=int, default=20, help='Jobs queued up front for the job scenario')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--write-baseline', action='store_true', help='Save results as the new baseline')
+    parser.add_argument('--check', action='store_true', help='Exit 1 on regressions against the baseline')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument('--output', help='Also write results to this JSON file')
+    args = parser.parse_args()
+    if args.check and not args.write_baseline and not os.path.exists(args.baseline):
+        # Fail before spending minutes on a run that has nothing to compare against
+        sys.exit(f"No baseline at {args.baseline}; run `make load-test-baseline` first")
+
+    if args.server:
+        results = {'server': run_scenarios(args.server.rstrip('/'), args.scenarios, args, 'server')}
+    else:
+        results = {d: run_deployment(d, args.scenarios, args) for d in args.deploy.split(',') if d}
+
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'concurrency': args.concurrency,
+            'duration': args.duration,
+            'requests': args.requests,
+            'workers': args.workers,
+            'threads': args.threads,
+            'openai_latency': args.openai_latency,
+            'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+    print(json.dumps(report, indent=2))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.write_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+            f.write('\n')
+        print(f"Baseline written to {args.baseline}", file=sys.stderr)
+    if args.check:
+        with open(args.baseline) as f:
+            problems = compare(report, json.load(f), args.threshold)
+        for problem in problems:
+            print('REGRESSION:', problem, file=sys.stderr)
+        if problems:
+            sys.exit(1)
+        print(f"No regressions beyond {args.threshold:.0%}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -12,8 +12,8 @@ if ! command -v netlify >/dev/null 2>&1; then
   exit 2
 fi
 
-echo "Syncing static files..."
-python3 scripts/sync_static.py
+echo "Building static assets..."
+python3 scripts/build_assets.py
 
 echo "Starting netlify dev on port ${PORT} (in background)..."
 # Start netlify dev; it will serve functions and static. We background it so we can run tests.
@@ -13,8 +13,8 @@ echo "\n--- Installing Python dependencies ---"
 python3 -m pip install --upgrade pip || true
 python3 -m pip install -r requirements.txt
 
-echo "\n--- Running static sync ---"
-python3 scripts/sync_static.py || true
+echo "\n--- Building static assets ---"
+python3 scripts/build_assets.py || true
 
 echo "\n--- Root listing ---"
 ls -la
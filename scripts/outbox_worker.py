@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""Outreach sender worker: drains the outbox table in jobs.db over pooled SMTP.
+
+Run alongside scripts/worker.py (or the RQ worker); web requests and campaign
+jobs only queue messages, this process delivers them.
+"""
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import sqlite3
+
+import outbox
+from lead_gen import LeadGenerator
+
+SLEEP_SECONDS = 5
+BATCH_SIZE = int(os.getenv('OUTBOX_BATCH_SIZE', '50'))
+
+
+def main():
+    outbox.init_outbox()
+    generator = LeadGenerator()
+    print('Starting outbox worker — draining outreach from', outbox.DB_PATH)
+
+    while True:
+        conn = sqlite3.connect(outbox.DB_PATH, isolation_level=None)
+        recovered = outbox.recover_stale(conn)
+        conn.close()
+        if recovered:
+            print('Re-queued', recovered, 'stale messages')
+
+        handled = outbox.drain(generator.send_emails, batch_size=BATCH_SIZE)
+        if handled:
+            print('Processed', handled, 'outreach messages')
+        else:
+            time.sleep(SLEEP_SECONDS)
+
+
+if __name__ == '__main__':
+    main()
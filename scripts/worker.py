@@ -2,19 +2,28 @@
 """Background worker to process queued lead generation jobs from jobs.db.
 
 Run this on a machine with the repo checked out (not on Netlify Functions).
+Each poll also enqueues any scheduled campaigns that are due (see scheduler.py);
+set RUN_SCHEDULER=0 when the scheduler runs as its own process.
 """
 import time
 import sqlite3
-import json
 import os
 from datetime import datetime
 
-ROOT = os.path.dirname(os.path.dirname(__file__))
-DB_PATH = os.path.join(ROOT, 'jobs.db')
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
-from lead_gen import LeadGenerator
+import sys
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import jobs
+import json_backend
+import scheduler
+import tracing
+from tasks import process_lead_campaign
 
 SLEEP_SECONDS = 5
+RUN_SCHEDULER = os.getenv('RUN_SCHEDULER', '1') != '0'
 
 
 def fetch_pending_job(conn):
@@ -34,42 +43,45 @@ def mark_in_progress(conn, id):
 def mark_done(conn, id, result):
     now = datetime.now().isoformat()
     c = conn.cursor()
-    c.execute("UPDATE jobs SET status = 'done', updated_at = ?, result = ? WHERE id = ?", (now, json.dumps(result), id))
+    c.execute("UPDATE jobs SET status = 'done', updated_at = ?, result = ? WHERE id = ?", (now, json_backend.dumps(result), id))
     conn.commit()
 
 
 def mark_failed(conn, id, error):
     now = datetime.now().isoformat()
     c = conn.cursor()
-    c.execute("UPDATE jobs SET status = 'failed', updated_at = ?, result = ? WHERE id = ?", (now, json.dumps({'error': str(error)}), id))
+    c.execute("UPDATE jobs SET status = 'failed', updated_at = ?, result = ? WHERE id = ?", (now, json_backend.dumps({'error': str(error)}), id))
     conn.commit()
 
 
 def process_job(job_row):
     id, job_id, payload_json = job_row
-    payload = json.loads(payload_json or '{}')
-    generator = LeadGenerator()
-
-    # Extract expected fields with defaults
-    instagram_hashtags = payload.get('instagram_hashtags', [])
-    linkedin_keywords = payload.get('linkedin_keywords', [])
-    max_leads = int(payload.get('max_leads', 50))
-    auto_outreach = payload.get('auto_outreach', False)
+    payload = json_backend.loads(payload_json or '{}')
+    # Same task the RQ worker runs: publishes progress events and stores the stage trace
+    return process_lead_campaign(payload, job_id=job_id)
 
-    results = generator.run_lead_generation_campaign(
-        instagram_hashtags=instagram_hashtags,
-        linkedin_keywords=linkedin_keywords,
-        max_leads=max_leads,
-        auto_outreach=auto_outreach
-    )
 
-    return results
+def print_trace(job_id):
+    job = jobs.get_job(job_id)
+    if job and job.get('trace'):
+        stages = tracing.stage_totals(job['trace'])
+        print('  stages:', ', '.join(f'{name} {ms / 1000:.2f}s' for name, ms in stages.items()))
 
 
 def main():
-    print('Starting worker — watching for jobs in', DB_PATH)
+    print('Starting worker — watching for jobs in', jobs.DB_PATH)
+    jobs.init_jobs_db()
+    if RUN_SCHEDULER:
+        scheduler.init_schedules()
     while True:
-        conn = sqlite3.connect(DB_PATH)
+        if RUN_SCHEDULER:
+            try:
+                for outcome in scheduler.run_due():
+                    print('Schedule', outcome['name'], outcome['status'], outcome['job_id'])
+            except Exception as e:
+                print('Scheduler error', str(e))
+
+        conn = sqlite3.connect(jobs.DB_PATH)
         row = fetch_pending_job(conn)
         if not row:
             conn.close()
@@ -83,9 +95,11 @@ def main():
             result = process_job(row)
             mark_done(conn, id, result)
             print('Job done', id)
+            print_trace(row[1])
         except Exception as e:
             print('Job failed', id, str(e))
             mark_failed(conn, id, e)
+            print_trace(row[1])
         finally:
             conn.close()
 
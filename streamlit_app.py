@@ -1,38 +1,89 @@
 import streamlit as st
-from collide_core import run_collide_demo
 
+import dashboard
+from collide_core import MATURITY_LEVELS, COLLIDEAdvisor
+from visualization import figure, scores_for
 
-@st.cache_data(show_spinner=False)
-def load_demo_results():
-    """Run the demo consultation once and cache the result for the session."""
-    return run_collide_demo()
 
+@st.cache_resource
+def get_advisor():
+    """One advisor (and its compiled scoring model) shared by every session."""
+    return COLLIDEAdvisor()
 
-st.set_page_config(page_title="COLLIDE AI Demo", page_icon="🤖", layout="wide")
-st.title("COLLIDE AI – Brand Advisory Demo")
-st.markdown("Click **Run Demo** to execute the consultation flow and view results.")
 
-if st.button("Run Demo", type="primary"):
-    with st.spinner("Running consultation..."):
-        results = load_demo_results()
+@st.cache_data(show_spinner="Assessing portfolio...", max_entries=16)
+def assess_portfolio(key: str, _raw: bytes):
+    """Assess a portfolio once per input. Streamlit keys the cache on `key`, the digest of `_raw`."""
+    brands = dashboard.load_brands(_raw) if _raw else dashboard.demo_brands()
+    return dashboard.assess(brands, get_advisor())
 
-    assessment = results.get("assessment", {})
-    report = results.get("report", {})
 
-    st.success("Demo completed")
+st.set_page_config(page_title="COLLIDE AI Portfolio", page_icon="🤖", layout="wide")
+st.title("COLLIDE AI – Brand Portfolio")
 
-    cols = st.columns(3)
-    cols[0].metric("Overall Score", f"{assessment.get('overall_score', 0):.1f}")
-    cols[1].metric("Maturity Level", assessment.get("maturity_level", "N/A"))
-    cols[2].metric("Top Priority", report.get("executive_summary", "").split("Immediate priorities:")[-1].strip())
+advisor = get_advisor()
+pillars = {pillar["key"]: pillar["label"] for pillar in advisor.model.spec}
 
-    st.subheader("Assessment")
-    st.json(assessment)
+with st.sidebar:
+    st.header("Brands")
+    source = st.radio("Source", ["Upload CSV", "Server portfolio", "Demo brand"])
+    raw = b""
+    if source == "Upload CSV":
+        upload = st.file_uploader("Portfolio CSV", type="csv",
+                                  help="One row per brand: brand_name plus the checklist columns")
+        if upload is None:
+            st.info("Upload a portfolio CSV, or pick another source.")
+            st.stop()
+        raw = upload.getvalue()
+    elif source == "Server portfolio":
+        raw = dashboard.read_portfolio_file()
+        if not raw:
+            st.warning(f"No portfolio file at {dashboard.PORTFOLIO_PATH} (set COLLIDE_PORTFOLIO_PATH).")
+            st.stop()
 
-    st.subheader("Strategy")
-    st.json(results.get("strategy", {}))
+    st.header("Filter")
+    search = st.text_input("Brand name contains")
+    levels = st.multiselect("Maturity level", MATURITY_LEVELS)
+    sort_columns = {"overall_score": "Overall score", **pillars, "brand_name": "Brand name"}
+    sort_by = st.selectbox("Sort by", list(sort_columns), format_func=sort_columns.get)
+    descending = st.toggle("Descending", value=sort_by != "brand_name")
+    page_size = st.selectbox("Rows per page", dashboard.PAGE_SIZES, index=1)
 
-    st.subheader("Executive Summary")
-    st.write(report.get("executive_summary", ""))
-else:
-    st.info("Press the button to start the demo.")
+try:
+    rows = assess_portfolio(dashboard.digest(raw) if raw else "demo", raw)
+except (UnicodeDecodeError, ValueError, TypeError) as e:
+    st.error(f"Could not assess this portfolio: {e}")
+    st.stop()
+
+if not rows:
+    st.warning("The portfolio has no brands.")
+    st.stop()
+
+stats = dashboard.summary(rows, list(pillars))
+cols = st.columns(2 + len(pillars))
+cols[0].metric("Brands", f"{stats['count']:,}")
+cols[1].metric("Mean Overall Score", f"{stats['overall_score']:.1f}")
+for col, (key, label) in zip(cols[2:], pillars.items()):
+    col.metric(label, f"{stats['pillars'][key]:.1f}")
+st.bar_chart({"brands": stats["maturity_levels"]}, horizontal=True)
+
+indexes = dashboard.select(rows, search, levels, sort_by, descending)
+page = st.number_input("Page", min_value=1, value=1, step=1)
+shown, pages = dashboard.paginate(indexes, page, page_size)
+st.caption(f"{len(indexes):,} of {len(rows):,} brands · page {min(page, pages)} of {pages}")
+
+# Only the current page is sent to the browser; st.dataframe virtualizes its rows
+score_column = st.column_config.ProgressColumn(min_value=0, max_value=100, format="%.1f")
+st.dataframe([rows[i] for i in shown], width="stretch", hide_index=True,
+             column_config={"overall_score": score_column, **{key: score_column for key in pillars}})
+
+if shown:
+    st.subheader("Brand Detail")
+    choice = st.selectbox("Brand", shown, format_func=lambda i: rows[i]["brand_name"])
+    row = rows[choice]
+    left, right = st.columns([2, 3])
+    left.metric("Overall Score", f"{row['overall_score']:.1f}")
+    left.metric("Maturity Level", row["maturity_level"])
+    left.markdown("\n".join(f"{n}. {row[key]}" for n, key in
+                            enumerate(("top_priority", "secondary_priority", "tertiary_priority"), start=1)))
+    right.plotly_chart(figure(list(pillars.values()), scores_for(row, advisor.model)))
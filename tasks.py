@@ -2,28 +2,55 @@
 
 Functions should be pure-ish and return JSON-serializable dicts.
 """
-import os
-from lead_gen import LeadGenerator
+import jobs
+import tracing
 
 
-def process_lead_campaign(payload: dict):
+def _current_rq_job_id():
+    try:
+        from rq import get_current_job
+    except ImportError:
+        return None
+    job = get_current_job()
+    return job.get_id() if job else None
+
+
+def process_lead_campaign(payload: dict, job_id: str = None):
     """Run the lead generation campaign and return results dict.
 
-    Expected payload keys: instagram_hashtags, linkedin_keywords, max_leads, auto_outreach
+    Expected payload keys: instagram_hashtags, linkedin_keywords, max_leads, auto_outreach, incremental, sources
+    Partial results are published as job events under `job_id` (the current RQ
+    job when run by an RQ worker), and the campaign's stage trace is stored on
+    that job once it finishes or fails.
     """
+    from lead_gen import LeadGenerator  # deferred: pulls in requests and the provider clients
+
     generator = LeadGenerator()
+    job_id = job_id or _current_rq_job_id()
 
     instagram_hashtags = payload.get('instagram_hashtags', [])
     linkedin_keywords = payload.get('linkedin_keywords', [])
     max_leads = int(payload.get('max_leads', 50))
     auto_outreach = payload.get('auto_outreach', False)
+    incremental = payload.get('incremental', False)
+    sources = payload.get('sources')
 
-    results = generator.run_lead_generation_campaign(
-        instagram_hashtags=instagram_hashtags,
-        linkedin_keywords=linkedin_keywords,
-        max_leads=max_leads,
-        auto_outreach=auto_outreach
-    )
+    root = None
+    try:
+        with tracing.trace('campaign', max_leads=max_leads, incremental=incremental) as root:
+            results = generator.run_lead_generation_campaign(
+                instagram_hashtags=instagram_hashtags,
+                linkedin_keywords=linkedin_keywords,
+                max_leads=max_leads,
+                auto_outreach=auto_outreach,
+                incremental=incremental,
+                sources=sources,
+                on_progress=jobs.job_progress(job_id) if job_id else None
+            )
+            root.set(qualified=results['qualified'], total_found=results['total_found'])
+    finally:
+        if job_id and root is not None:
+            jobs.set_job_trace(job_id, root.to_dict())
 
     # Optionally transform or redact sensitive fields here
     return results
@@ -0,0 +1,27 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import app as app_module
+import jobs
+import outbox
+import quota
+
+
+@pytest.fixture(autouse=True)
+def isolated_databases(tmp_path, monkeypatch):
+    """
+    Point the jobs database (jobs, job events, outbox, schedules, provider
+    usage) at a throwaway file, so no test touches the repo's jobs.db. The app
+    creates its tables again on the first request of each test.
+    """
+    path = str(tmp_path / 'jobs.db')
+    monkeypatch.setattr(jobs, 'DB_PATH', path)
+    monkeypatch.setattr(outbox, 'DB_PATH', path)
+    monkeypatch.setattr(quota, 'DB_PATH', path)
+    monkeypatch.setattr(quota, '_manager', None)
+    monkeypatch.setattr(app_module, '_databases_ready', False)
+    return path
@@ -0,0 +1,45 @@
+import os
+import sys
+import json
+import subprocess
+import importlib.util
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+SCRIPT = os.path.join(ROOT, 'scripts', 'bench_pipeline.py')
+
+spec = importlib.util.spec_from_file_location('bench_pipeline', SCRIPT)
+bench_pipeline = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(bench_pipeline)
+
+
+def _report(throughput=1000.0, rss=100.0, **stages):
+    return {'results': {'1000': {'throughput_leads_per_s': throughput, 'peak_rss_mb': rss,
+                                 'stages': stages or {'qualify': 0.5}}}}
+
+
+def test_compare_flags_regressions_beyond_threshold():
+    baseline = _report(qualify=0.5, search=0.01)
+    assert bench_pipeline.compare(_report(900.0, 110.0, qualify=0.6, search=0.04), baseline) == []
+
+    problems = bench_pipeline.compare(_report(700.0, 130.0, qualify=0.7, search=0.04), baseline)
+    assert len(problems) == 3
+    assert any('throughput' in p for p in problems)
+    assert any('peak RSS' in p for p in problems)
+    assert any('qualify' in p for p in problems)
+
+
+def test_compare_skips_sizes_not_in_both_reports():
+    assert bench_pipeline.compare({'results': {}}, _report()) == []
+
+
+def test_single_size_run_reports_every_stage(tmp_path):
+    output = subprocess.run([sys.executable, SCRIPT, '--run-size', '300', '--search-latency', '0'],
+                            check=True, capture_output=True, text=True, cwd=tmp_path).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+
+    assert result['found'] == 300
+    assert result['duplicates_dropped'] == 30
+    assert result['qualified'] > 0
+    assert result['queued'] == 10
+    assert list(result['stages']) == bench_pipeline.STAGES
+    assert result['peak_rss_mb'] > 0
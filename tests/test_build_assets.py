@@ -0,0 +1,118 @@
+import os
+import sys
+import gzip
+import json
+import shutil
+import subprocess
+import importlib.util
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+SCRIPT = os.path.join(ROOT, 'scripts', 'build_assets.py')
+sys.path.insert(0, ROOT)
+
+spec = importlib.util.spec_from_file_location('build_assets', SCRIPT)
+build_assets = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(build_assets)
+
+import assets
+import page_cache
+import app as app_module
+
+
+def test_minify_js_keeps_strings_regexes_and_line_breaks():
+    source = """
+// greeting
+let url = 'http://example.com/*not a comment*/';   /* block */
+function f(text) {
+    text = text.replace(/\\*\\*(.+?)\\*\\*/g, '<b>$1</b>');
+    return a + +b
+}
+const t = `a  //  ${url}`
+"""
+    minified = build_assets.minify_js(source)
+    assert minified == ("let url='http://example.com/*not a comment*/';"
+                        "function f(text){text=text.replace(/\\*\\*(.+?)\\*\\*/g,'<b>$1</b>');return a+ +b}\n"
+                        "const t=`a  //  ${url}`\n")
+
+
+# Programs whose result (`out`) must not change when minified: regexes after
+# blocks, division after object literals, and templates nesting templates,
+# strings and comments in their substitutions
+JS_CORPUS = {
+    'regex_after_block': "var s = 'a/b/c', out = 0;\nif (s) {\n  out++\n}\n/b\\/c/.test(s) && out++;\n",
+    'regex_after_else_block': "var out = 0;\nif (!out) {} else { out = 5 }\n/=/.test('=') && (out += 1);\n",
+    'regex_after_arrow_body': "var f = () => { return 4 }\n/4/.test(f()) ? out = 'yes' : out = 'no';\nvar out;\n",
+    'division_after_object': "var out = {valueOf: function () { return 9 }} / 3 + ' / '.length; // x'\n",
+    'division_across_lines': "var g = 2, b = 8, out = b\n/2/g;\n",
+    'nested_template': "var name = 'x';\n"
+                       "var out = `a ${ `b ${ name /* } ` */ } c` } d ${ {k: '}'}.k } // kept`;\n",
+    'template_with_quotes': "var out = `${ '`' + \"}\" }  ${ [1, 2].map(n => `<${n}>`).join('') }`;\n",
+    'comments_and_keywords': "// lead\nfunction f(s) {\n  /* note */ return /a\\/b/.test(s) // tail\n}\n"
+                             "var out = [f('a/b'), typeof /x/, 10 / 2 / 5];\n",
+}
+
+
+@pytest.mark.parametrize('name', sorted(JS_CORPUS))
+def test_minify_js_corpus(name):
+    source = JS_CORPUS[name]
+    minified = build_assets.minify_js(source)
+    assert '/*' not in minified.replace('/* } ` */', '') and '// tail' not in minified
+    if shutil.which('node') is None:
+        pytest.skip('node is not installed')
+
+    def run(program):
+        result = subprocess.run(['node', '-e', program + ';console.log(JSON.stringify(out))'],
+                                capture_output=True, text=True, timeout=30)
+        assert result.returncode == 0, result.stderr
+        return result.stdout
+    assert run(minified) == run(source)
+
+
+def test_minify_css():
+    source = '/* theme */\n.a > .b ,\n.c:hover {\n  content: "x ; y";\n  margin: 0 auto;\n}\n@media (max-width: 600px) { .a { color: red; } }\n'
+    assert build_assets.minify_css(source) == \
+        '.a>.b,.c:hover{content:"x ; y";margin:0 auto}@media (max-width:600px){.a{color:red}}\n'
+
+
+def test_build_is_fingerprinted_incremental_and_prunes_stale_outputs(tmp_path):
+    src, dst, headers = tmp_path / 'static', tmp_path / 'public' / 'static', tmp_path / 'public' / '_headers'
+    src.mkdir()
+    (src / 'style.css').write_text('body {\n  color: red;\n}\n' * 80)
+    (src / 'logo.png').write_bytes(b'\x89PNG\r\n')
+
+    first = build_assets.build(str(src), str(dst), str(headers))
+    hashed = first['manifest']['style.css']
+    assert first['manifest']['logo.png'].startswith('logo.') and hashed.startswith('style.')
+    assert gzip.decompress((dst / (hashed + '.gz')).read_bytes()) == (dst / hashed).read_bytes()
+    assert (dst / 'style.css').read_text() == (src / 'style.css').read_text()
+    assert json.loads((dst / 'manifest.json').read_text()) == first['manifest']
+    assert f'/static/{hashed}\n  Cache-Control: public, max-age=31536000, immutable' in headers.read_text()
+
+    assert build_assets.build(str(src), str(dst), str(headers))['written'] == []
+
+    (src / 'style.css').write_text('body { color: blue; }\n')
+    third = build_assets.build(str(src), str(dst), str(headers))
+    assert third['manifest']['style.css'] != hashed
+    assert set(third['written']) == {'style.css', third['manifest']['style.css'], 'manifest.json', '_headers'}
+    assert set(third['removed']) == {hashed, hashed + '.gz'}
+
+
+def test_templates_use_fingerprinted_urls(tmp_path, monkeypatch):
+    client = app_module.app.test_client()
+    monkeypatch.setattr(assets, 'BUILD_DIR', str(tmp_path))
+    assets.reload()
+    page_cache.clear()
+    assert '/static/style.css"' in client.get('/').get_data(as_text=True)
+
+    build_assets.build(os.path.join(ROOT, 'static'), str(tmp_path), None, compress=False)
+    assets.reload()
+    page_cache.clear()
+    try:
+        hashed = assets.manifest()['style.css']
+        assert f'/static/{hashed}"' in client.get('/').get_data(as_text=True)
+        assert client.get(f'/static/{hashed}').get_data() == (tmp_path / hashed).read_bytes()
+    finally:
+        assets.reload()
+        page_cache.clear()
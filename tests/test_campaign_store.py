@@ -0,0 +1,108 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import campaign_store
+from campaign_store import CampaignStore, lead_key
+from lead_gen import LeadGenerator
+from lead_rules import Ruleset, rescore_campaign
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    path = str(tmp_path / 'campaigns.db')
+    monkeypatch.setattr(campaign_store, 'DB_PATH', path)
+    return CampaignStore(path)
+
+
+def _lead(i, **extra):
+    lead = {
+        'name': f'Founder {i}',
+        'platform': 'instagram',
+        'profile_url': f'https://instagram.com/brand{i}',
+        'website': f'https://www.brand{i}.com/about',
+        'email': f'Founder{i}@brand{i}.com',
+        'qualification_score': 40 + i,
+        'qualified': 40 + i >= 50,
+    }
+    lead.update(extra)
+    return lead
+
+
+def test_save_and_query(store):
+    store.save_campaign('c1', [_lead(i) for i in range(20)], total_found=25)
+    store.save_campaign('c2', [_lead(3)])
+
+    campaign = store.get_campaign('c1')
+    assert campaign['total_found'] == 25
+    assert campaign['qualified'] == 10
+    assert len(campaign['leads']) == 20
+
+    assert [lead['name'] for lead in store.query_leads(domain='brand3.com')] == ['Founder 3', 'Founder 3']
+    assert store.query_leads(email='founder5@BRAND5.com')[0]['name'] == 'Founder 5'
+    top = store.query_leads(campaign_id='c1', min_score=55)
+    assert [lead['qualification_score'] for lead in top] == [59, 58, 57, 56, 55]
+    assert [c['campaign_id'] for c in store.list_campaigns()] == ['c2', 'c1']
+
+
+def test_iter_leads_streams_in_chunks(store):
+    store.save_campaign('big', [_lead(i) for i in range(2500)])
+    names = [lead['name'] for lead in store.iter_leads(campaign_id='big', chunk_size=1000)]
+    assert len(names) == 2500
+    assert names[0] == 'Founder 0' and names[-1] == 'Founder 2499'
+
+
+def test_seen_lead_uses_stable_key(store):
+    store.save_campaign('c1', [_lead(1)])
+    assert store.seen_lead({'profile_url': 'http://www.instagram.com/brand1/'})
+    assert not store.seen_lead(_lead(2))
+    assert lead_key({'platform': 'linkedin', 'name': 'Sam Lee'}) == 'linkedin:sam lee'
+
+
+def test_campaign_run_persists_to_store(store):
+    results = LeadGenerator().run_lead_generation_campaign(instagram_hashtags=['#cleanbeauty'], max_leads=10)
+    campaign = store.get_campaign(results['campaign_id'])
+    assert campaign['params']['instagram_hashtags'] == ['#cleanbeauty']
+    assert campaign['leads'][0]['email'] == 'sarah@sustainablebeautyco.com'
+
+
+def test_rescore_stored_campaign(store):
+    store.save_campaign('c1', [_lead(i, followers=i * 1000) for i in range(20)])
+    strict = Ruleset({'threshold': 30, 'rules': [
+        {'type': 'tiers', 'field': 'followers', 'tiers': [{'min': 15000, 'points': 30}]}
+    ]})
+    summary = rescore_campaign('c1', strict, store=store)
+    assert summary['total'] == 20
+    assert summary['qualified_before'] == 10
+    assert summary['qualified_after'] == 5
+
+
+def test_store_endpoints_require_admin(store):
+    from app import app as flask_app
+
+    store.save_campaign('c1', [_lead(i) for i in range(3)])
+    with flask_app.test_client() as client:
+        for url in ('/api/lead-gen/campaigns', '/api/lead-gen/campaigns/c1', '/api/lead-gen/leads?campaign_id=c1'):
+            assert client.get(url).status_code == 302
+
+        with client.session_transaction() as session:
+            session['admin_logged_in'] = True
+        assert [c['campaign_id'] for c in client.get('/api/lead-gen/campaigns').get_json()['campaigns']] == ['c1']
+        assert client.get('/api/lead-gen/campaigns/c1').get_json()['campaign_id'] == 'c1'
+        assert client.get('/api/lead-gen/leads?campaign_id=c1').get_json()['count'] == 3
+
+
+def test_schema_is_created_once_per_database(tmp_path, monkeypatch):
+    calls = []
+    init_db = CampaignStore._init_db
+    monkeypatch.setattr(CampaignStore, '_init_db', lambda self: calls.append(self.db_path) or init_db(self))
+
+    first, second = str(tmp_path / 'a.db'), str(tmp_path / 'b.db')
+    for path in (first, first, second, first):
+        CampaignStore(path)
+    assert calls == [first, second]
+    CampaignStore(first).save_campaign('c1', [_lead(1)])
+    assert CampaignStore(first).get_campaign('c1')['leads'][0]['name'] == 'Founder 1'
@@ -0,0 +1,224 @@
+import os
+import sys
+import json
+import sqlite3
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import app as app_module
+import campaign_store
+import jobs
+from campaign_store import CampaignStore
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(campaign_store, 'DB_PATH', str(tmp_path / 'campaigns.db'))
+    monkeypatch.setattr(app_module, 'CAMPAIGN_POLL_INTERVAL', 0.01)
+    monkeypatch.setattr(app_module, 'JOB_WORKER', True)
+    jobs.init_jobs_db()
+    app_module.app.config['TESTING'] = True
+    with app_module.app.test_client() as c:
+        yield c
+
+
+def _set_status(job_id, status, result=None):
+    conn = sqlite3.connect(jobs.DB_PATH)
+    conn.execute('UPDATE jobs SET status = ?, result = ? WHERE job_id = ?',
+                 (status, json.dumps(result) if result is not None else None, job_id))
+    conn.commit()
+    conn.close()
+
+
+def _fake_worker(monkeypatch, run):
+    """Process each enqueued job in a thread, the way scripts/worker.py would."""
+    def enqueue(payload):
+        job_id = jobs.enqueue_job(payload)
+        threading.Thread(target=run, args=(job_id, payload)).start()
+        return job_id
+    monkeypatch.setattr(app_module, 'enqueue_job', enqueue)
+
+
+def _ndjson(response):
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def test_campaign_streams_progress_then_result(client, monkeypatch):
+    lead = {'name': 'Glow Co', 'platform': 'instagram', 'profile_url': 'https://instagram.com/glow',
+            'qualification_score': 80, 'qualified': True, 'email': 'hi@glow.co'}
+
+    def run(job_id, payload):
+        progress = jobs.job_progress(job_id)
+        _set_status(job_id, 'in_progress')
+        progress('search', {'platform': 'instagram', 'found': 3})
+        progress('qualified', {'campaign_id': 'c1', 'total_found': 3, 'skipped_known': 0, 'qualified': 1})
+        progress('lead', lead)
+        CampaignStore().save_campaign('c1', [lead], total_found=3)
+        _set_status(job_id, 'done', {'campaign_id': 'c1', 'total_found': 3, 'qualified': 1, 'outreach_sent': 0})
+
+    _fake_worker(monkeypatch, run)
+    response = client.post('/api/lead-gen/campaign', json={'instagram_hashtags': ['#glow'], 'max_leads': 5})
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+
+    events = _ndjson(response)
+    assert [e['event'] for e in events] == ['queued', 'search', 'qualified', 'lead', 'result']
+    assert events[0]['data']['poll_url'] == f"/api/lead-gen/job/{response.headers['X-Job-Id']}"
+    assert events[3]['data']['name'] == 'Glow Co'
+
+    result = events[-1]['data']
+    assert result['success'] is True
+    assert result['campaign_id'] == 'c1'
+    assert result['total_found'] == 3
+    assert [l['name'] for l in result['top_leads']] == ['Glow Co']
+
+
+def test_campaign_times_out_to_polling(client, monkeypatch):
+    monkeypatch.setattr(app_module, 'CAMPAIGN_STREAM_TIMEOUT', 0.05)
+    response = client.post('/api/lead-gen/campaign', json={'max_leads': 5},
+                           headers={'Accept': 'text/event-stream'})
+    assert response.mimetype == 'text/event-stream'
+
+    body = response.get_data(as_text=True)
+    assert body.startswith('event: queued\n')
+    assert 'event: timeout\n' in body
+
+    job_id = response.headers['X-Job-Id']
+    job = client.get(f'/api/lead-gen/job/{job_id}').get_json()
+    assert job['status'] == 'pending'
+    assert job['events'] == []
+
+
+def test_campaign_reports_failed_job(client, monkeypatch):
+    def run(job_id, payload):
+        jobs.add_job_event(job_id, 'search', {'platform': 'linkedin', 'found': 0})
+        time.sleep(0.02)
+        _set_status(job_id, 'failed', {'error': 'Hunter quota exhausted'})
+
+    _fake_worker(monkeypatch, run)
+    events = _ndjson(client.post('/api/lead-gen/campaign', json={'linkedin_keywords': ['CMO']}))
+    assert events[-1] == {'event': 'error', 'data': {'success': False, 'job_id': events[0]['data']['job_id'],
+                                                     'error': 'Hunter quota exhausted'}}
+
+
+def test_campaign_is_queued_without_a_stream_when_it_cannot_stream(client, monkeypatch):
+    def never_polled(*args):
+        raise AssertionError('a buffered response must not wait for the job')
+    monkeypatch.setattr(app_module, '_campaign_events', never_polled)
+
+    response = client.post('/api/lead-gen/campaign', json={'max_leads': 5},
+                           environ_base={'lambda_adapter.buffered': True})
+    assert response.status_code == 202
+    data = response.get_json()
+    assert data['poll_url'] == response.headers['Location'] == f"/api/lead-gen/job/{data['job_id']}"
+    assert jobs.get_job(data['job_id'])['status'] == 'pending'
+
+    monkeypatch.setattr(app_module, 'JOB_WORKER', False)
+    assert client.post('/api/lead-gen/campaign', json={'max_leads': 5}).status_code == 202
+
+
+def test_lambda_adapter_marks_responses_as_buffered():
+    from lambda_adapter import LambdaAdapter
+
+    seen = {}
+
+    def wsgi_app(environ, start_response):
+        seen['buffered'] = environ.get('lambda_adapter.buffered')
+        start_response('200 OK', [('Content-Type', 'text/plain')])
+        return [b'ok']
+    LambdaAdapter(wsgi_app)({'httpMethod': 'GET', 'path': '/'}, None)
+    assert seen['buffered'] is True
+
+
+def test_job_status_returns_events_after_cursor(client):
+    job_id = jobs.enqueue_job({})
+    jobs.add_job_event(job_id, 'search', {'found': 1})
+    jobs.add_job_event(job_id, 'lead', {'name': 'A'})
+
+    events = client.get(f'/api/lead-gen/job/{job_id}').get_json()['events']
+    assert [e['event'] for e in events] == ['search', 'lead']
+
+    later = client.get(f"/api/lead-gen/job/{job_id}?after={events[0]['id']}").get_json()['events']
+    assert [e['event'] for e in later] == ['lead']
+
+
+class RedisListStandIn:
+    """The list commands job events use, on a dict shared like one Redis server."""
+
+    def __init__(self):
+        self.lists, self.ttl = {}, {}
+
+    def pipeline(self):
+        return self
+
+    def rpush(self, key, value):
+        self.lists.setdefault(key, []).append(value)
+
+    def expire(self, key, seconds):
+        self.ttl[key] = seconds
+
+    def execute(self):
+        pass
+
+    def lrange(self, key, start, end):
+        return self.lists.get(key, [])[start:None if end == -1 else end + 1]
+
+
+def test_rq_job_events_go_through_redis(client, monkeypatch):
+    redis_conn = RedisListStandIn()
+    monkeypatch.setattr(jobs, '_events_redis', lambda: redis_conn)
+    # An RQ worker on another host: its events must not land in this host's SQLite file
+    progress = jobs.job_progress('rq-job-1')
+    progress('search', {'found': 2})
+    progress('lead', {'name': 'Glow Co'})
+    assert redis_conn.ttl['collide:job_events:rq-job-1'] == jobs.EVENTS_TTL_SECONDS
+
+    events = jobs.get_job_events('rq-job-1')
+    assert [(e['id'], e['event']) for e in events] == [(1, 'search'), (2, 'lead')]
+    assert events[1]['data'] == {'name': 'Glow Co'}
+    assert [e['data'] for e in jobs.get_job_events('rq-job-1', after=1)] == [{'name': 'Glow Co'}]
+    assert jobs.get_job_events('rq-job-1', after=2) == []
+
+    monkeypatch.setattr(jobs, '_events_redis', lambda: None)
+    assert jobs.get_job_events('rq-job-1') == []
+
+
+def test_generator_reports_progress_per_stage(client):
+    from lead_gen import LeadGenerator
+
+    events = []
+    results = LeadGenerator().run_lead_generation_campaign(
+        instagram_hashtags=['#cleanbeauty'], on_progress=lambda event, data: events.append((event, data))
+    )
+
+    names = [event for event, _ in events]
+    assert names[:2] == ['search', 'qualified']
+    assert names.count('lead') == results['qualified']
+    assert events[1][1]['campaign_id'] == results['campaign_id']
+
+
+def test_sqlite_worker_uses_the_jobs_database(client, monkeypatch):
+    import importlib.util
+    spec = importlib.util.spec_from_file_location(
+        'worker', os.path.join(os.path.dirname(__file__), '..', 'scripts', 'worker.py'))
+    worker = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(worker)
+
+    class Idle(Exception):
+        pass
+
+    def idle(seconds):
+        raise Idle()
+    monkeypatch.setattr(worker, 'RUN_SCHEDULER', False)
+    monkeypatch.setattr(worker, 'process_job', lambda row: {'qualified': 0})
+    monkeypatch.setattr(worker.time, 'sleep', idle)
+
+    job_id = jobs.enqueue_job({'instagram_hashtags': ['#cleanbeauty']})
+    with pytest.raises(Idle):
+        worker.main()
+    assert jobs.get_job(job_id)['status'] == 'done'
+    assert jobs.get_job(job_id)['result'] == {'qualified': 0}
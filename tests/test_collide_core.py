@@ -0,0 +1,116 @@
+import os
+import sys
+import csv
+import io
+import random
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import app as app_module
+from collide_core import PILLAR_SPEC, SCORING_MODEL, COLLIDEAdvisor, COLLIDEConsultation, ScoringModel
+
+FLAGS = list(SCORING_MODEL.features)
+
+
+def random_brands(count, seed=7):
+    rng = random.Random(seed)
+    return [dict({key: rng.choice([0, 1, True, False]) for key in FLAGS if rng.random() < 0.9},
+                 brand_name=f'Brand {i}') for i in range(count)]
+
+
+def test_assess_many_matches_single_assessments():
+    advisor = COLLIDEAdvisor()
+    brands = random_brands(300) + [{}, COLLIDEConsultation()._collect_basic_info()]
+
+    for brand, result in zip(brands, advisor.assess_many(brands)):
+        single = advisor.assess_brand_maturity(brand)
+        assert {k: v for k, v in result.items() if k != 'priorities'} == single
+        assert result['priorities'] == [advisor._get_top_priority(single), advisor._get_secondary_priority(single),
+                                        advisor._get_tertiary_priority(single)]
+    assert advisor.assess_many([]) == []
+
+
+def portfolio_csv(brands):
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=['brand_name'] + FLAGS)
+    writer.writeheader()
+    for brand in brands:
+        writer.writerow({key: {True: 'yes', False: 'no'}.get(value, value) if isinstance(value, bool) else value
+                         for key, value in brand.items()})
+    return out.getvalue()
+
+
+def test_assess_batch_endpoint_accepts_csv_uploads():
+    client = app_module.app.test_client()
+    brands = random_brands(50)
+    expected = COLLIDEAdvisor().assess_many(brands)
+
+    response = client.post('/api/collide/assess-batch',
+                           data={'file': (io.BytesIO(portfolio_csv(brands).encode()), 'portfolio.csv')})
+    body = response.get_json()
+    assert response.status_code == 200
+    assert body['count'] == 50
+    assert body['results'][3]['brand_name'] == 'Brand 3'
+    assert body['results'][3]['overall_score'] == expected[3]['overall_score']
+    assert body['results'][3]['priorities'] == expected[3]['priorities']
+
+    as_csv = client.post('/api/collide/assess-batch?format=csv', data=portfolio_csv(brands),
+                         content_type='text/csv')
+    rows = list(csv.DictReader(io.StringIO(as_csv.get_data(as_text=True))))
+    assert as_csv.mimetype == 'text/csv'
+    assert len(rows) == 50
+    assert rows[0]['maturity_level'] == expected[0]['maturity_level']
+
+
+def test_assess_batch_rejects_bad_input():
+    client = app_module.app.test_client()
+    bad_flag = client.post('/api/collide/assess-batch', data='brand_name,logo_finalized\nA,maybe\n',
+                           content_type='text/csv')
+    assert bad_flag.status_code == 400
+    assert 'line 2' in bad_flag.get_json()['error']
+
+    assert client.post('/api/collide/assess-batch', data='brand_name\n', content_type='text/csv').status_code == 400
+    assert client.post('/api/collide/assess-batch', json={'brands': 'nope'}).status_code == 400
+    ok = client.post('/api/collide/assess-batch', json={'brands': [{'brand_name': 'A', 'mission_clear': 1}]})
+    assert ok.get_json()['results'][0]['authenticity'] == 25
+
+
+def test_demo_brand_scores_are_unchanged():
+    assessment = COLLIDEAdvisor().assess_brand_maturity(COLLIDEConsultation()._collect_basic_info())
+    assert assessment == {'overall_score': 50.0, 'strategic_positioning': 75, 'visual_identity': 0,
+                          'business_metrics': 25, 'authenticity': 100, 'maturity_level': 'Emerging Brand'}
+    assert [type(v) for v in assessment.values()] == [float, int, int, int, int, str]
+
+
+def test_fractional_flags_score_like_the_per_pillar_formula():
+    rng = random.Random(3)
+    brands = [{key: rng.choice([0, 0.1, 0.3, 0.5, 1]) for key in FLAGS} for _ in range(2000)]
+    advisor = COLLIDEAdvisor()
+
+    for brand, result in zip(brands, advisor.assess_many(brands)):
+        single = advisor.assess_brand_maturity(brand)
+        # The original formula: the pillar's flags summed, then times its points per item
+        for pillar in PILLAR_SPEC:
+            weight = next(iter(pillar['features'].values()))
+            assert single[pillar['key']] == sum([brand.get(key, 0) for key in pillar['features']]) * weight
+        assert {k: v for k, v in result.items() if k != 'priorities'} == single
+        assert result['priorities'] == [advisor._get_top_priority(single), advisor._get_secondary_priority(single),
+                                        advisor._get_tertiary_priority(single)]
+
+
+def test_custom_spec_adds_a_pillar_without_new_methods():
+    community = {'key': 'community', 'title': 'Community', 'label': 'Community', 'topics': ['Engagement'],
+                 'features': {'community_engagement': 60, 'social_impact_focus': 40, 'mission_clear': 10},
+                 'priorities': ('Grow the community', 'Run community events', 'Partner with advocates')}
+    advisor = COLLIDEAdvisor(ScoringModel(PILLAR_SPEC + (community,)))
+    brands = [dict(brand, social_impact_focus=i % 2, community_engagement=i % 3 == 0)
+              for i, brand in enumerate(random_brands(40))]
+
+    for brand, result in zip(brands, advisor.assess_many(brands)):
+        single = advisor.assess_brand_maturity(brand)
+        assert single['community'] == 60 * brand['community_engagement'] + 40 * brand['social_impact_focus'] \
+            + 10 * brand.get('mission_clear', 0)
+        assert single['overall_score'] == sum(single[p['key']] for p in advisor.model.spec) / 5
+        assert {k: v for k, v in result.items() if k != 'priorities'} == single
+        assert result['priorities'][0] == advisor._get_top_priority(single)
+    assert 'Community' in advisor.brand_pillars
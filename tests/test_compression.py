@@ -0,0 +1,89 @@
+import os
+import sys
+import gzip
+import json
+import zlib
+
+import pytest
+from flask import Flask, Response, jsonify, stream_with_context
+from werkzeug.datastructures import Accept
+from werkzeug.http import parse_accept_header
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import compression
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    compression.init_app(app)
+    leads = [{'name': f'Lead {i}', 'email': f'lead{i}@example.com', 'score': 70 + i % 30} for i in range(200)]
+
+    @app.route('/leads')
+    def leads_view():
+        return jsonify(leads)
+
+    @app.route('/small')
+    def small():
+        return jsonify({'ok': True})
+
+    @app.route('/raw')
+    @compression.compress(enabled=False)
+    def raw():
+        return jsonify(leads)
+
+    @app.route('/tiny-threshold')
+    @compression.compress(min_bytes=10)
+    def tiny_threshold():
+        return jsonify({'status': 'queued', 'job_id': 'abc'})
+
+    @app.route('/stream')
+    def stream():
+        def events():
+            for lead in leads[:5]:
+                yield json.dumps({'event': 'lead', 'data': lead}) + '\n'
+        return Response(stream_with_context(events()), mimetype='application/x-ndjson')
+
+    with app.test_client() as c:
+        yield c
+
+
+def test_negotiation_honours_quality_values():
+    accept = lambda header: parse_accept_header(header, Accept)
+    assert compression.negotiate(accept('gzip, deflate')) == 'gzip'
+    assert compression.negotiate(accept('gzip;q=0, identity')) is None
+    assert compression.negotiate(accept('')) is None
+    assert compression.negotiate(accept('*')) in compression.available_encodings()
+
+
+def test_large_json_is_compressed_small_json_is_not(client):
+    plain = client.get('/leads')
+    compressed = client.get('/leads', headers={'Accept-Encoding': 'gzip'})
+
+    assert 'Content-Encoding' not in plain.headers
+    assert plain.headers['Vary'] == 'Accept-Encoding'
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(compressed.get_data()) == plain.get_data()
+    assert int(compressed.headers['Content-Length']) < len(plain.get_data()) / 4
+
+    assert 'Content-Encoding' not in client.get('/small', headers={'Accept-Encoding': 'gzip'}).headers
+
+
+def test_route_settings(client):
+    assert 'Content-Encoding' not in client.get('/raw', headers={'Accept-Encoding': 'gzip'}).headers
+    assert client.get('/tiny-threshold', headers={'Accept-Encoding': 'gzip'}).headers['Content-Encoding'] == 'gzip'
+
+
+def test_streamed_chunks_decode_as_they_arrive(client):
+    response = client.get('/stream', headers={'Accept-Encoding': 'gzip'}, buffered=False)
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in response.headers
+
+    decoder = zlib.decompressobj(31)
+    chunks = list(response.response)
+    # Each chunk is flushed, so the first event decodes before the stream ends
+    first = decoder.decompress(chunks[0])
+    assert json.loads(first)['data']['name'] == 'Lead 0'
+    rest = b''.join(decoder.decompress(chunk) for chunk in chunks[1:]) + decoder.flush()
+    assert len((first + rest).splitlines()) == 5
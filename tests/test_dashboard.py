@@ -0,0 +1,54 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import dashboard
+from collide_core import SCORING_MODEL, COLLIDEAdvisor
+
+from test_collide_core import portfolio_csv, random_brands
+
+
+def test_portfolio_rows_match_the_batch_assessment():
+    brands = random_brands(500)
+    raw = portfolio_csv(brands).encode()
+    rows = dashboard.assess(dashboard.load_brands(raw), COLLIDEAdvisor())
+    expected = COLLIDEAdvisor().assess_many(brands)
+
+    assert len(rows) == 500
+    assert rows[7]['brand_name'] == 'Brand 7'
+    assert rows[7]['overall_score'] == expected[7]['overall_score']
+    assert [rows[7]['top_priority'], rows[7]['secondary_priority'], rows[7]['tertiary_priority']] \
+        == expected[7]['priorities']
+    assert dashboard.digest(raw) == dashboard.digest(portfolio_csv(brands).encode()) != dashboard.digest(b'')
+
+    demo = dashboard.assess(dashboard.demo_brands(), COLLIDEAdvisor())
+    assert demo[0]['brand_name'] == 'EcoLux Fashion' and demo[0]['overall_score'] == 50.0
+
+
+def test_select_filters_sorts_and_pages():
+    rows = dashboard.assess(random_brands(300), COLLIDEAdvisor())
+    indexes = dashboard.select(rows, search='brand 1', levels=['Emerging Brand', 'Developing Brand'])
+
+    assert indexes
+    assert all('Brand 1' in rows[i]['brand_name'] and rows[i]['maturity_level'] in ('Emerging Brand',
+                                                                                      'Developing Brand')
+               for i in indexes)
+    scores = [rows[i]['overall_score'] for i in indexes]
+    assert scores == sorted(scores, reverse=True)
+    by_name = dashboard.select(rows, sort_by='brand_name', descending=False)
+    assert rows[by_name[0]]['brand_name'] == 'Brand 0' and len(by_name) == 300
+
+    page, pages = dashboard.paginate(by_name, 3, 100)
+    assert pages == 3 and list(page) == by_name[200:]
+    assert dashboard.paginate(by_name, 99, 100) == (by_name[200:], 3)
+    assert dashboard.paginate([], 1, 50) == ([], 1)
+
+
+def test_summary_and_missing_server_portfolio(tmp_path):
+    rows = dashboard.assess(random_brands(40), COLLIDEAdvisor())
+    stats = dashboard.summary(rows, SCORING_MODEL.pillars)
+    assert stats['count'] == 40
+    assert sum(stats['maturity_levels'].values()) == 40
+    assert abs(stats['overall_score'] - sum(r['overall_score'] for r in rows) / 40) < 1e-9
+    assert dashboard.read_portfolio_file(str(tmp_path / 'missing.csv')) == b''
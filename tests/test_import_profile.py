@@ -0,0 +1,37 @@
+import os
+import importlib.util
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+SCRIPT = os.path.join(ROOT, 'scripts', 'import_profile.py')
+
+spec = importlib.util.spec_from_file_location('import_profile', SCRIPT)
+import_profile = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(import_profile)
+
+IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       100 |        100 |     werkzeug.local
+import time:       900 |       5000 |   flask
+import time:        50 |         50 |     jinja2.utils
+import time:       300 |        350 |   jinja2
+import time:      1200 |       6600 | app
+import time:        10 |         10 | json
+"""
+
+
+def test_slowest_imports_are_direct_children():
+    entries = import_profile.parse_importtime(IMPORTTIME)
+    assert entries[0] == ('werkzeug.local', 2, 100, 100)
+    assert import_profile.slowest_imports(entries, 'app') == [('flask', 5.0), ('jinja2', 0.35)]
+
+
+def test_check_reports_budget_and_eager_modules():
+    report = {'module': 'app', 'import_ms': 400.0, 'eager_heavy_modules': ['openai']}
+    assert len(import_profile.check(report, 250)) == 2
+    assert import_profile.check(dict(report, import_ms=100.0, eager_heavy_modules=[]), 250) == []
+
+
+def test_health_cold_start_skips_heavy_dependencies():
+    report = import_profile.profile('app', '/health', repeat=1)
+    assert report['status'] == 200
+    assert report['eager_heavy_modules'] == []
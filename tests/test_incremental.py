@@ -0,0 +1,91 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import campaign_store
+from campaign_store import CampaignStore
+from incremental import IncrementalTracker
+from lead_gen import LeadGenerator
+from lead_gen_pro import LeadGeneratorPro
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    path = str(tmp_path / 'campaigns.db')
+    monkeypatch.setattr(campaign_store, 'DB_PATH', path)
+    return CampaignStore(path)
+
+
+def _post(i, posted_at, hashtag='#cleanbeauty'):
+    return {'name': f'brand{i}', 'platform': 'instagram', 'profile_url': f'https://instagram.com/brand{i}',
+            'hashtag': hashtag, 'posted_at': posted_at}
+
+
+def test_high_water_marks_skip_old_posts(store):
+    first = IncrementalTracker(store)
+    assert len(first.new_items('instagram', [_post(1, 100), _post(2, 200)])) == 2
+    first.commit()
+    assert store.get_marks('instagram') == {'cleanbeauty': 200}
+
+    second = IncrementalTracker(store)
+    assert second.since('instagram', '#cleanbeauty') == 200
+    fresh = second.new_items('instagram', [_post(2, 200), _post(3, 300), _post(4, 50, '#slowfashion')])
+    assert [lead['name'] for lead in fresh] == ['brand3', 'brand4']
+    assert second.skipped_old == 1
+
+
+def test_marks_ignore_the_hash_and_are_kept_per_source(store):
+    first = IncrementalTracker(store)
+    # RapidAPI and Apify are searched without the '#', so their leads carry the bare tag
+    first.new_items('rapidapi_instagram', [_post(1, 100, hashtag='fashion')])
+    first.new_items('instagram', [_post(2, 500, hashtag='#fashion')])
+    first.commit()
+
+    second = IncrementalTracker(store)
+    assert second.since('rapidapi_instagram', '#fashion') == 100
+    assert second.since('instagram', '#fashion') == 500
+    assert second.since('synthetic', '#fashion') is None
+
+
+def test_incremental_campaign_passes_marks_to_the_source(store):
+    first = LeadGenerator().run_lead_generation_campaign(instagram_hashtags=['#cleanbeauty'], max_leads=20,
+                                                         incremental=True, sources=['synthetic'])
+    assert first['total_found'] == 10
+    assert set(store.get_marks('synthetic')) == {'cleanbeauty'}
+    assert store.get_marks('instagram') == {}
+
+    # The source filters by the stored mark itself, so nothing is fetched twice
+    second = LeadGenerator().run_lead_generation_campaign(instagram_hashtags=['#cleanbeauty'], max_leads=20,
+                                                          incremental=True, sources=['synthetic'])
+    assert second['total_found'] == 0
+    assert second['skipped_known'] == 0
+
+
+def test_drop_known_leads(store):
+    store.save_campaign('c1', [_post(1, 100)])
+    tracker = IncrementalTracker(store)
+    fresh, skipped = tracker.drop_known([_post(1, 100), _post(2, 100), _post(2, 100)])
+    assert [lead['name'] for lead in fresh] == ['brand2']
+    assert skipped == 2
+
+
+def test_incremental_campaign_skips_leads_from_previous_run(store):
+    generator = LeadGenerator()
+    first = generator.run_lead_generation_campaign(instagram_hashtags=['#cleanbeauty'], incremental=True)
+    assert first['total_found'] == 1
+
+    second = LeadGenerator().run_lead_generation_campaign(instagram_hashtags=['#cleanbeauty'], incremental=True)
+    assert second['total_found'] == 0
+    assert second['skipped_known'] == 1
+
+    full = LeadGenerator().run_lead_generation_campaign(instagram_hashtags=['#cleanbeauty'])
+    assert full['total_found'] == 1
+
+
+def test_pro_search_filters_by_since():
+    leads = [{'posted_at': LeadGeneratorPro._post_timestamp('2025-10-17T12:00:00Z')}, {'posted_at': None}]
+    assert LeadGeneratorPro._newer_than(leads, leads[0]['posted_at']) == [{'posted_at': None}]
+    assert LeadGeneratorPro._newer_than(leads, 0) == leads
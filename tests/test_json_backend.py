@@ -0,0 +1,61 @@
+import os
+import sys
+import uuid
+import decimal
+import importlib.util
+from datetime import datetime
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+import app as app_module
+import jobs
+import json_backend
+
+spec = importlib.util.spec_from_file_location('bench_json', os.path.join(ROOT, 'scripts', 'bench_json.py'))
+bench_json = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(bench_json)
+
+BACKENDS = ['json'] + (['orjson'] if json_backend.orjson is not None else [])
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request, monkeypatch):
+    if request.param == 'json':
+        monkeypatch.setattr(json_backend, 'orjson', None)
+    return request.param
+
+
+def test_backends_encode_identically(backend):
+    value = {'name': 'Glow Lab', 3: 'int key', 'created': datetime(2026, 10, 19, 12, 30, 5, 120000),
+             'price': decimal.Decimal('19.90'), 'id': uuid.UUID(int=1), 'tags': ['é', '✓'], 'score': 82.5}
+    assert json_backend.backend() == backend
+    assert json_backend.dumps(value) == (
+        '{"name":"Glow Lab","3":"int key","created":"2026-10-19T12:30:05.120000","price":"19.90",'
+        '"id":"00000000-0000-0000-0000-000000000001","tags":["é","✓"],"score":82.5}')
+    assert json_backend.dumpb(value) == json_backend.dumps(value).encode('utf-8')
+    assert json_backend.loads(json_backend.dumpb({'a': [1]})) == {'a': [1]}
+    assert json_backend.dumps({'a': [1]}, indent=True) == '{\n  "a": [\n    1\n  ]\n}'
+    with pytest.raises(TypeError):
+        json_backend.dumps(object())
+
+
+def test_flask_and_job_storage_use_the_backend(backend, tmp_path, monkeypatch):
+    monkeypatch.setattr(jobs, 'DB_PATH', str(tmp_path / 'jobs.db'))
+    jobs.init_jobs_db()
+    job_id = jobs.enqueue_job({'instagram_hashtags': ['#cleanbeauty'], 'note': 'café'})
+    assert jobs.get_job(job_id)['payload'] == {'instagram_hashtags': ['#cleanbeauty'], 'note': 'café'}
+
+    client = app_module.app.test_client()
+    response = client.get(f'/api/lead-gen/job/{job_id}')
+    assert response.get_json()['payload']['note'] == 'café'
+    assert response.mimetype == 'application/json'
+
+
+def test_bench_reports_each_backend():
+    results = bench_json.run(number=2, repeat=1)
+    assert set(results) == {'lead', 'campaign_result', 'leads_1000'}
+    assert set(results['lead']) == set(BACKENDS)
+    assert results['leads_1000']['json']['bytes'] > 100000
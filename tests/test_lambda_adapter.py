@@ -0,0 +1,105 @@
+import os
+import sys
+import gzip
+import json
+import base64
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from lambda_adapter import LambdaAdapter
+
+
+def echo_app(environ, start_response):
+    """Replies with the request it saw, or with binary/large bodies on request."""
+    path = environ['PATH_INFO']
+    if path == '/binary':
+        start_response('200 OK', [('Content-Type', 'image/png')])
+        return [b'\x89PNG\r\n\x1a\n\x00\xff']
+    if path == '/large':
+        start_response('200 OK', [('Content-Type', 'application/json')])
+        return [json.dumps({'rows': ['lead'] * 2000}).encode()]
+    body = environ['wsgi.input'].read(int(environ.get('CONTENT_LENGTH') or 0))
+    start_response('201 Created', [('Content-Type', 'application/json'),
+                                   ('Set-Cookie', 'a=1'), ('Set-Cookie', 'b=2')])
+    return [json.dumps({
+        'method': environ['REQUEST_METHOD'], 'path': path, 'query': environ['QUERY_STRING'],
+        'cookie': environ.get('HTTP_COOKIE'), 'content_type': environ.get('CONTENT_TYPE'),
+        'body': body.decode(), 'ip': environ['REMOTE_ADDR'],
+    }).encode()]
+
+
+def v1_event(path, method='GET', headers=None, body=None, **extra):
+    return dict({'httpMethod': method, 'path': path, 'headers': headers or {}, 'body': body,
+                 'isBase64Encoded': False, 'requestContext': {'identity': {'sourceIp': '203.0.113.9'}}}, **extra)
+
+
+def v2_event(path, method='GET', headers=None, body=None, **extra):
+    return dict({'version': '2.0', 'rawPath': path, 'rawQueryString': '', 'headers': headers or {}, 'body': body,
+                 'isBase64Encoded': False,
+                 'requestContext': {'http': {'method': method, 'path': path, 'sourceIp': '198.51.100.4'}}}, **extra)
+
+
+def test_v1_request_and_multi_value_response():
+    event = v1_event('/leads', 'POST', {'Content-Type': 'application/json', 'Cookie': 'session=x'},
+                     body=base64.b64encode(b'{"a": 1}').decode(), isBase64Encoded=True,
+                     multiValueQueryStringParameters={'tag': ['a', 'b']})
+    response = LambdaAdapter(echo_app)(event, None)
+
+    assert response['statusCode'] == 201
+    assert response['isBase64Encoded'] is False
+    seen = json.loads(response['body'])
+    assert seen == {'method': 'POST', 'path': '/leads', 'query': 'tag=a&tag=b', 'cookie': 'session=x',
+                    'content_type': 'application/json', 'body': '{"a": 1}', 'ip': '203.0.113.9'}
+    assert response['multiValueHeaders']['Set-Cookie'] == ['a=1', 'b=2']
+
+
+def test_v2_request_cookies_and_response_cookies():
+    event = v2_event('/leads', 'PUT', {'content-type': 'text/plain'}, body='hi',
+                     rawQueryString='min_score=70', cookies=['session=x', 'theme=dark'])
+    response = LambdaAdapter(echo_app)(event, None)
+
+    seen = json.loads(response['body'])
+    assert (seen['method'], seen['query'], seen['cookie'], seen['ip']) == (
+        'PUT', 'min_score=70', 'session=x; theme=dark', '198.51.100.4')
+    assert response['cookies'] == ['a=1', 'b=2']
+    assert 'multiValueHeaders' not in response
+
+
+def test_binary_and_gzip_responses_are_base64():
+    adapter = LambdaAdapter(echo_app)
+
+    binary = adapter(v2_event('/binary'), None)
+    assert binary['isBase64Encoded'] is True
+    assert base64.b64decode(binary['body']) == b'\x89PNG\r\n\x1a\n\x00\xff'
+
+    plain = adapter(v2_event('/large'), None)
+    assert plain['isBase64Encoded'] is False and 'Content-Encoding' not in plain['headers']
+
+    compressed = adapter(v2_event('/large', headers={'accept-encoding': 'gzip, br'}), None)
+    assert compressed['isBase64Encoded'] is True
+    assert compressed['headers']['Content-Encoding'] == 'gzip'
+    assert compressed['headers']['Vary'] == 'Accept-Encoding'
+    assert gzip.decompress(base64.b64decode(compressed['body'])).decode() == plain['body']
+
+
+def test_fast_routes_skip_the_wsgi_app():
+    def never_called(environ, start_response):
+        raise AssertionError('WSGI app should not run')
+
+    adapter = LambdaAdapter(never_called)
+    adapter.fast_route('/health', lambda: (200, {'Content-Type': 'application/json'}, b'{"status":"ok"}'))
+    response = adapter(v1_event('/health'), None)
+    assert (response['statusCode'], response['body']) == (200, '{"status":"ok"}')
+    assert adapter(v2_event('/health', 'HEAD'), None)['body'] == ''
+
+
+def test_netlify_handler_serves_flask_routes_over_v2():
+    from netlify.functions.app import handler
+
+    response = handler(v2_event('/api/chat', 'POST', {'content-type': 'application/json'},
+                                body=json.dumps({'message': 'pricing strategy'})), None)
+    assert response['statusCode'] == 200
+    assert 'response' in json.loads(response['body'])
+
+    health = handler(v2_event('/health'), None)
+    assert json.loads(health['body'])['status'] == 'ok'
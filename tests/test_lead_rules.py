@@ -0,0 +1,106 @@
+import os
+import re
+import sys
+import json
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import lead_rules
+from lead_rules import Ruleset, RulesetError, get_ruleset, rescore_campaign_file
+from lead_gen import LeadGenerator
+from lead_gen_pro import LeadGeneratorPro
+
+
+SAMPLE_LEAD = {
+    'platform': 'instagram',
+    'name': 'Sarah Chen',
+    'followers': 15000,
+    'bio': 'Founder of sustainable beauty brand | Clean skincare',
+    'website': 'sustainablebeautyco.com',
+    'engagement_rate': 3.5,
+    'recent_posts': 12,
+}
+
+
+def test_default_rules_match_legacy_scoring():
+    lead = LeadGenerator().qualify_lead(dict(SAMPLE_LEAD))
+    assert lead['qualification_score'] == 95
+    assert lead['qualified'] is True
+    assert lead['qualification_reasons'] == [
+        'Strong following (15,000)', 'Has website', 'In beauty industry',
+        'Is founder', 'High engagement (3.5%)', 'Active poster'
+    ]
+
+    weak = LeadGenerator().qualify_lead({'name': 'x', 'followers': 1200, 'engagement_rate': 2.0, 'recent_posts': 5})
+    assert weak['qualification_score'] == 20
+    assert weak['qualified'] is False
+
+
+def test_generators_share_ruleset():
+    assert LeadGeneratorPro().target_industries == LeadGenerator().target_industries
+    pro_lead = LeadGeneratorPro().qualify_lead(dict(SAMPLE_LEAD))
+    assert pro_lead['qualification_score'] == 95
+
+
+def test_hot_reload(tmp_path, monkeypatch):
+    monkeypatch.setattr(lead_rules, 'RELOAD_CHECK_SECONDS', 0)
+    path = tmp_path / 'rules.json'
+    path.write_text(json.dumps({'threshold': 10, 'rules': [
+        {'type': 'present', 'field': 'website', 'points': 15, 'reason': 'Has website'}
+    ]}))
+    assert get_ruleset(str(path)).qualify({'website': 'x.com'})['qualified'] is True
+
+    path.write_text(json.dumps({'threshold': 20, 'rules': [
+        {'type': 'present', 'field': 'website', 'points': 15, 'reason': 'Has website'}
+    ]}))
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1_000_000))
+    assert get_ruleset(str(path)).qualify({'website': 'x.com'})['qualified'] is False
+
+    # A broken edit keeps the last good ruleset active
+    path.write_text('{not json')
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 2_000_000))
+    assert get_ruleset(str(path)).threshold == 20
+
+    for n, spec in enumerate(({'target_industries': 5}, {'rules': [{'x': 1}]}, {'threshold': None}), start=3):
+        path.write_text(json.dumps(spec))
+        os.utime(path, ns=(0, os.stat(path).st_mtime_ns + n * 1_000_000))
+        assert get_ruleset(str(path)).threshold == 20
+
+
+@pytest.mark.parametrize('spec, message', [
+    ({'target_industries': 5}, 'target_industries must be list'),
+    ({'target_titles': ['ceo', 3]}, 'target_titles items must be str'),
+    ({'threshold': None}, 'threshold must be int or float'),
+    ({'rules': {'type': 'present'}}, 'rules must be list'),
+    ({'rules': ['present']}, 'Rule 0: must be a mapping'),
+    ({'rules': [{'x': 1}]}, "Rule 0: unknown type None"),
+    ({'rules': [{'type': 'present', 'field': 'website', 'points': '15'}]}, 'Rule 0 (present): points must be'),
+    ({'rules': [{'type': 'tiers', 'field': 'followers', 'tiers': [{'min': 'many', 'points': 5}]}]},
+     'Rule 0 (tiers): min must be'),
+    ({'rules': [{'type': 'keywords', 'field': 'bio', 'keywords': 'missing_list', 'points': 5}],
+      'missing_list': 'beauty'}, 'Rule 0 (keywords): keywords must be list'),
+])
+def test_malformed_specs_raise_ruleset_error(spec, message):
+    with pytest.raises(RulesetError, match=re.escape(message)):
+        Ruleset(spec)
+
+
+def test_rescore_campaign_file_is_dry_run(tmp_path):
+    path = tmp_path / 'campaign.json'
+    leads = [dict(SAMPLE_LEAD, qualification_score=95, qualified=True),
+             {'name': 'Low', 'followers': 100, 'qualification_score': 60, 'qualified': True}]
+    path.write_text(json.dumps({'leads': leads}))
+    original = path.read_text()
+
+    strict = Ruleset({'threshold': 100, 'rules': [
+        {'type': 'tiers', 'field': 'followers', 'tiers': [{'min': 10000, 'points': 100}]}
+    ]})
+    summary = rescore_campaign_file(str(path), strict)
+
+    assert summary['total'] == 2
+    assert summary['qualified_before'] == 2
+    assert summary['qualified_after'] == 1
+    assert [c['name'] for c in summary['changed']] == ['Sarah Chen', 'Low']
+    assert path.read_text() == original
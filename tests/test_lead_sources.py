@@ -0,0 +1,93 @@
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import campaign_store
+import lead_sources
+from lead_sources import LeadSource, SyntheticSource, get_source, search_all, select_sources
+from lead_gen import LeadGenerator
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(campaign_store, 'DB_PATH', str(tmp_path / 'campaigns.db'))
+    return campaign_store.CampaignStore()
+
+
+def test_registry_builds_sources_with_options():
+    assert {'instagram', 'linkedin', 'fixture_instagram', 'synthetic', 'rapidapi_linkedin'} <= set(
+        lead_sources.registered_sources())
+
+    source = get_source('synthetic:count=5,latency=0.25,seed=7')
+    assert (source.count, source.latency, source.seed) == (5, 0.25, 7)
+    assert get_source('synthetic_linkedin').platform == 'linkedin'
+
+    with pytest.raises(KeyError):
+        get_source('myspace')
+
+
+def test_sources_satisfy_protocol():
+    for name in ('instagram', 'linkedin', 'fixture_instagram', 'fixture_linkedin', 'synthetic', 'rapidapi_instagram'):
+        source = get_source(name)
+        assert isinstance(source, LeadSource)
+        assert source.platform in ('instagram', 'linkedin')
+
+
+def test_select_sources_defaults_and_capabilities(monkeypatch):
+    assert [s.name for s in select_sources()] == ['instagram', 'linkedin']
+
+    monkeypatch.setenv('LEAD_SOURCES', 'fixture_instagram, synthetic')
+    assert [s.name for s in select_sources()] == ['fixture_instagram', 'synthetic']
+    assert [s.name for s in select_sources(['instagram', 'synthetic'], require=['since'])] == ['synthetic']
+
+
+def test_fixture_source_replays_recorded_responses():
+    source = get_source('fixture_instagram')
+    leads = search_all([(source, ['#cleanbeauty'], 10, None)])[0]
+    assert [l['name'] for l in leads] == ['glowbotanics', 'slowthreadstudio', 'terra.beauty.co', 'urbanbloomwear']
+    assert all(l['hashtag'] == '#cleanbeauty' for l in leads)
+
+    newer = search_all([(source, ['#cleanbeauty'], 10, {'#cleanbeauty': leads[1]['posted_at']})])[0]
+    assert [l['name'] for l in newer] == ['terra.beauty.co', 'urbanbloomwear']
+
+    people = search_all([(get_source('fixture_linkedin'), ['founder'], 2, None)])[0]
+    assert [p['first_name'] for p in people] == ['Priya', 'Chloe']
+
+
+def test_synthetic_source_is_deterministic_and_bounded():
+    first = search_all([(SyntheticSource(count=1000, seed=3), ['#a', '#b'], 10 ** 9, None)])[0]
+    again = search_all([(SyntheticSource(count=1000, seed=3), ['#a', '#b'], 10 ** 9, None)])[0]
+    assert len(first) == 1000
+    assert first == again
+    assert {l['hashtag'] for l in first} == {'#a', '#b'}
+    assert len({l['profile_url'] for l in first}) == 1000
+
+    assert len(search_all([(SyntheticSource(count=1000), ['#a'], 10, None)])[0]) == 10
+
+
+def test_slow_sources_are_searched_concurrently():
+    slow = [SyntheticSource(latency=0.05, page_size=10, seed=i) for i in range(4)]
+    start = time.perf_counter()
+    results = search_all([(source, ['#a'], 30, None) for source in slow])
+    elapsed = time.perf_counter() - start
+
+    assert [len(r) for r in results] == [30, 30, 30, 30]
+    # 3 pages x 50ms each; sequentially this would take 0.6s
+    assert elapsed < 0.45
+
+
+def test_campaign_uses_selected_sources(store):
+    results = LeadGenerator().run_lead_generation_campaign(
+        instagram_hashtags=['#cleanbeauty'],
+        linkedin_keywords=['founder'],
+        max_leads=20,
+        sources=['fixture_instagram', 'fixture_linkedin', 'synthetic:count=3']
+    )
+
+    assert results['total_found'] == 4 + 4 + 3
+    campaign = store.get_campaign(results['campaign_id'])
+    assert campaign['params']['sources'] == ['fixture_instagram', 'fixture_linkedin', 'synthetic']
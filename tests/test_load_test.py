@@ -0,0 +1,91 @@
+import os
+import sys
+import threading
+import importlib.util
+
+import pytest
+from werkzeug.serving import make_server
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+SCRIPT = os.path.join(ROOT, 'scripts', 'load_test.py')
+sys.path.insert(0, ROOT)
+
+import app as app_module
+import campaign_store
+import jobs
+
+spec = importlib.util.spec_from_file_location('load_test', SCRIPT)
+load_test = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(load_test)
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    """The app on a threaded werkzeug server with throwaway databases."""
+    monkeypatch.setattr(jobs, 'DB_PATH', str(tmp_path / 'jobs.db'))
+    monkeypatch.setattr(campaign_store, 'DB_PATH', str(tmp_path / 'campaigns.db'))
+    monkeypatch.setattr(app_module, 'conversations', [])
+    jobs.init_jobs_db()
+    httpd = make_server('127.0.0.1', 0, app_module.app, threaded=True)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f'http://127.0.0.1:{httpd.server_port}'
+    httpd.shutdown()
+
+
+def _report(p95=20.0, rps=100.0, errors=0):
+    return {'results': {'sync': {'chat_rule': {'p95_ms': p95, 'rps': rps, 'errors': errors}},
+                        'async': {'skipped': 'gevent is not installed'}}}
+
+
+def test_summarize_percentiles():
+    stats = load_test.summarize([i / 1000 for i in range(1, 101)], errors=5, elapsed=2.0)
+    assert (stats['p50_ms'], stats['p95_ms'], stats['p99_ms'], stats['max_ms']) == (50.0, 95.0, 99.0, 100.0)
+    assert stats['requests'] == 105
+    assert stats['rps'] == 52.5
+    assert load_test.summarize([], 0, 1.0)['p95_ms'] == 0.0
+
+
+def test_compare_flags_regressions_beyond_threshold():
+    baseline = _report()
+    assert load_test.compare(_report(p95=24.0, rps=80.0), baseline) == []
+
+    problems = load_test.compare(_report(p95=30.0, rps=70.0, errors=3), baseline)
+    assert len(problems) == 3
+    assert all(p.startswith('sync/chat_rule') for p in problems)
+    # Sub-noise latencies never fail
+    assert load_test.compare(_report(p95=4.0), _report(p95=1.0)) == []
+
+
+def test_scenarios_run_against_the_app(server):
+    for name in ('chat_rule', 'queue', 'job', 'admin_conversations'):
+        stats = load_test.run_scenario(server, name, concurrency=4, total_requests=20)
+        assert stats['requests'] == 20, name
+        assert stats['errors'] == 0, name
+        assert 0 < stats['p50_ms'] <= stats['p95_ms'] <= stats['p99_ms']
+
+    assert len(app_module.conversations) == 20
+
+
+def test_chat_through_mock_openai(server, monkeypatch):
+    with load_test.MockOpenAI(latency=0.05) as mock:
+        monkeypatch.setenv('OPENAI_BASE_URL', mock.url)
+        monkeypatch.setattr(app_module, '_openai_clients', {})
+        monkeypatch.setitem(app_module.settings, 'use_api', True)
+        monkeypatch.setitem(app_module.settings, 'openai_api_key', 'test')
+
+        stats = load_test.run_scenario(server, 'chat_openai', concurrency=4, total_requests=8)
+
+    assert stats['errors'] == 0
+    assert mock.requests == 8
+    assert stats['p50_ms'] >= 50
+    assert app_module.conversations[-1]['bot_response'] == 'Mock strategy advice for load testing.'
+
+
+def test_check_without_baseline_fails_before_running(tmp_path, monkeypatch):
+    def no_run(*args, **kwargs):
+        raise AssertionError('no deployment should start without a baseline')
+    monkeypatch.setattr(load_test, 'run_deployment', no_run)
+    monkeypatch.setattr(sys, 'argv', ['load_test.py', '--check', '--baseline', str(tmp_path / 'missing.json')])
+    with pytest.raises(SystemExit) as exit_info:
+        load_test.main()
+    assert 'make load-test-baseline' in str(exit_info.value.code)
@@ -0,0 +1,83 @@
+import os
+import re
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import app as app_module
+import jobs
+import metrics
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(app_module, 'conversations', [])
+    jobs.init_jobs_db()
+    app_module.app.config['TESTING'] = True
+    with app_module.app.test_client() as c:
+        yield c
+
+
+def sample(client, name, **labels):
+    """Value of one series on /metrics (0 when absent); metrics are process-global."""
+    text = client.get('/metrics').get_data(as_text=True)
+    for line in text.splitlines():
+        match = re.match(r'^(\w+)(?:\{(.*)\})? (\S+)$', line)
+        if not match or match.group(1) != name:
+            continue
+        found = dict(re.findall(r'(\w+)="((?:[^"\\]|\\.)*)"', match.group(2) or ''))
+        if all(found.get(k) == str(v) for k, v in labels.items()):
+            return float(match.group(3))
+    return 0.0
+
+
+def test_request_latency_is_recorded_per_route(client):
+    route = dict(method='POST', route='/api/chat', status='200')
+    before = sample(client, 'http_request_duration_seconds_count', **route)
+    client.post('/api/chat', json={'message': 'pricing strategy'})
+    client.post('/api/chat', json={'message': 'hello'})
+    client.post('/api/chat', json={})
+
+    assert sample(client, 'http_request_duration_seconds_count', **route) == before + 2
+    assert sample(client, 'http_request_duration_seconds_count', method='POST', route='/api/chat', status='400') >= 1
+    assert sample(client, 'http_request_duration_seconds_bucket', le='+Inf', **route) == before + 2
+    # Job ids are collapsed into the route pattern
+    client.get('/api/lead-gen/job/does-not-exist')
+    assert sample(client, 'http_request_duration_seconds_count', method='GET',
+                  route='/api/lead-gen/job/<job_id>', status='404') >= 1
+    assert sample(client, 'http_requests_in_flight', method='POST', route='/api/chat') == 0
+
+
+def test_dependency_timings_and_errors(client):
+    before = sample(client, 'dependency_duration_seconds_count', dependency='sqlite', operation='enqueue_job')
+    client.post('/api/lead-gen/queue', json={'max_leads': 5})
+    assert sample(client, 'dependency_duration_seconds_count', dependency='sqlite', operation='enqueue_job') == before + 1
+
+    with pytest.raises(ConnectionError):
+        with metrics.track('smtp', 'send'):
+            raise ConnectionError('relay down')
+    assert sample(client, 'dependency_errors_total', dependency='smtp', operation='send') >= 1
+
+
+def test_openai_calls_record_latency_and_tokens(client, monkeypatch):
+    class Completions:
+        def create(self, **kwargs):
+            return SimpleNamespace(
+                choices=[SimpleNamespace(message=SimpleNamespace(content='Position on provenance.'))],
+                usage=SimpleNamespace(prompt_tokens=120, completion_tokens=30, total_tokens=150))
+
+    monkeypatch.setattr(app_module, 'get_openai_client', lambda key: SimpleNamespace(chat=SimpleNamespace(
+        completions=Completions())))
+    monkeypatch.setitem(app_module.settings, 'use_api', True)
+    monkeypatch.setitem(app_module.settings, 'openai_api_key', 'test')
+    monkeypatch.setitem(app_module.settings, 'model', 'gpt-test')
+
+    response = client.post('/api/chat', json={'message': 'How should I position my brand?'})
+    assert response.get_json()['response'] == 'Position on provenance.'
+
+    assert sample(client, 'openai_tokens_total', model='gpt-test', kind='prompt') == 120
+    assert sample(client, 'openai_tokens_total', model='gpt-test', kind='completion') == 30
+    assert sample(client, 'dependency_duration_seconds_count', dependency='openai', operation='chat.completions') >= 1
@@ -0,0 +1,94 @@
+import os
+import sys
+import json
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import outbox
+from app import app as flask_app
+
+
+@pytest.fixture
+def db():
+    outbox.init_outbox()
+    return outbox.DB_PATH
+
+
+def _message(to):
+    return {'to': to, 'subject': 'Hello', 'body': 'Hi there', 'lead': {'name': to}}
+
+
+def test_enqueue_is_idempotent_per_lead_and_campaign(db):
+    first = outbox.enqueue_messages([_message('a@example.com'), _message('b@example.com')], 'camp-1')
+    again = outbox.enqueue_messages([_message('A@example.com')], 'camp-1')
+    other = outbox.enqueue_messages([_message('a@example.com')], 'camp-2')
+
+    assert [m['duplicate'] for m in first] == [False, False]
+    assert again[0]['duplicate'] is True
+    assert again[0]['id'] == first[0]['id']
+    assert other[0]['duplicate'] is False
+    assert first[0]['lead'] == {'name': 'a@example.com'}
+
+
+def test_drain_marks_sent_and_schedules_retries(db):
+    outbox.enqueue_messages([_message('ok@example.com'), _message('bad@example.com')], 'camp-1')
+
+    def send_batch(messages):
+        return [{'to': m['to'], 'success': m['to'].startswith('ok')} for m in messages]
+
+    assert outbox.drain(send_batch) == 2
+    sent, retry = outbox.get_message(1), outbox.get_message(2)
+    assert sent['status'] == 'sent' and sent['sent_at']
+    assert retry['status'] == 'pending' and retry['attempts'] == 1
+    assert retry['next_attempt_at'] > retry['created_at']
+
+    # Not due yet, so nothing to drain
+    assert outbox.drain(send_batch) == 0
+
+
+def test_drain_fails_after_max_attempts(db, monkeypatch):
+    monkeypatch.setattr(outbox, 'RETRY_BASE_SECONDS', 0)
+    outbox.enqueue_messages([_message('bad@example.com')], 'camp-1')
+    for _ in range(outbox.MAX_ATTEMPTS):
+        outbox.drain(lambda messages: [{'success': False, 'error': 'relay down'}])
+    message = outbox.get_message(1)
+    assert message['status'] == 'failed'
+    assert message['last_error'] == 'relay down'
+
+
+def test_outreach_endpoint_returns_202_without_sending(db):
+    flask_app.config['TESTING'] = True
+    lead = {'name': 'Emily Rodriguez', 'company': 'Lumière Lifestyle', 'email': 'emily@lumiere.com'}
+    with flask_app.test_client() as client:
+        r = client.post('/api/lead-gen/outreach', data=json.dumps({'lead': lead}), content_type='application/json')
+        assert r.status_code == 202
+        body = r.get_json()
+        assert body['status'] == 'pending'
+        assert body['duplicate'] is False
+
+        status = client.get(f"/api/lead-gen/outreach/{body['message_id']}").get_json()
+        assert status['to_email'] == 'emily@lumiere.com'
+        assert status['status'] == 'pending'
+
+        # A later manual send to the same address is queued again...
+        later = client.post('/api/lead-gen/outreach', json={'lead': lead}).get_json()
+        assert later['duplicate'] is False and later['message_id'] != body['message_id']
+
+        # ...while a retried request with the same Idempotency-Key is not
+        headers = {'Idempotency-Key': 'click-1'}
+        first = client.post('/api/lead-gen/outreach', json={'lead': lead}, headers=headers).get_json()
+        retry = client.post('/api/lead-gen/outreach', json={'lead': lead}, headers=headers).get_json()
+        assert first['duplicate'] is False
+        assert retry['duplicate'] is True and retry['message_id'] == first['message_id']
+
+
+def test_drain_records_the_sender_error(db):
+    from lead_gen import LeadGenerator
+
+    generator = LeadGenerator()
+    generator.email_user = generator.email_password = ''
+    outbox.enqueue_messages([_message('a@example.com')], 'camp-1')
+    assert outbox.drain(generator.send_emails) == 1
+    assert outbox.get_message(1)['last_error'] == 'Email credentials not configured'
@@ -0,0 +1,116 @@
+import os
+import sys
+import socket
+import threading
+from email.mime.text import MIMEText
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from aiosmtpd.controller import Controller
+
+from outreach import OutreachSender
+
+
+class RecordingHandler:
+    def __init__(self):
+        self.messages = []
+        self.lock = threading.Lock()
+
+    async def handle_DATA(self, server, session, envelope):
+        with self.lock:
+            self.messages.append(envelope.rcpt_tos[0])
+        return '250 OK'
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    handler = RecordingHandler()
+    controller = Controller(handler, hostname='127.0.0.1', port=_free_port())
+    controller.start()
+    yield controller, handler
+    controller.stop()
+
+
+def _message(to):
+    msg = MIMEText('Hello from the outreach tests')
+    msg['From'] = 'team@collide.test'
+    msg['To'] = to
+    msg['Subject'] = 'Hello'
+    return msg
+
+
+def test_send_many_reuses_pooled_connections(smtp_server):
+    controller, handler = smtp_server
+    sender = OutreachSender(controller.hostname, controller.port, pool_size=2, rate_limit=0, use_tls=False)
+
+    recipients = [f'lead{i}@example.com' for i in range(20)]
+    results = sender.send_many(_message(to) for to in recipients)
+    sender.close()
+
+    assert [r['to'] for r in results] == recipients
+    assert all(r['success'] for r in results)
+    assert sorted(handler.messages) == sorted(recipients)
+    assert sender.pool.connections_opened <= 2
+
+
+def test_send_reconnects_after_dropped_connection(smtp_server):
+    controller, handler = smtp_server
+    sender = OutreachSender(controller.hostname, controller.port, pool_size=1, rate_limit=0, use_tls=False)
+
+    assert sender.send(_message('first@example.com'))
+
+    # Simulate the relay dropping the idle connection
+    server, _ = sender.pool._idle.queue[0]
+    server.sock.shutdown(socket.SHUT_RDWR)
+
+    assert sender.send(_message('second@example.com'))
+    assert handler.messages == ['first@example.com', 'second@example.com']
+    assert sender.pool.connections_opened == 2
+    sender.close()
+
+
+def test_rejected_recipient_is_not_retried(smtp_server):
+    controller, handler = smtp_server
+    attempts = []
+
+    async def reject_some(server, session, envelope, address, rcpt_options):
+        attempts.append(address)
+        if address.startswith('bounce'):
+            return '550 5.1.1 No such user'
+        envelope.rcpt_tos.append(address)
+        return '250 OK'
+    handler.handle_RCPT = reject_some
+    sender = OutreachSender(controller.hostname, controller.port, pool_size=1, rate_limit=0, use_tls=False)
+
+    assert not sender.send(_message('bounce@example.com'))
+    assert attempts == ['bounce@example.com']
+    # send_many reports the relay's reply, which the outbox stores as last_error
+    [result] = sender.send_many([_message('bounce2@example.com')])
+    assert result['success'] is False
+    assert result['error'].startswith('SMTPRecipientsRefused') and 'No such user' in result['error']
+    # The connection survives the rejection and is reused
+    assert sender.send(_message('ok@example.com'))
+    assert handler.messages == ['ok@example.com']
+    assert sender.pool.connections_opened == 1
+    assert 'error' not in sender.send_many([_message('ok2@example.com')])[0]
+    sender.close()
+
+
+def test_senders_use_starttls_unless_disabled(monkeypatch):
+    import outreach
+
+    monkeypatch.setattr(outreach, '_senders', {})
+    monkeypatch.delenv('SMTP_STARTTLS', raising=False)
+    assert outreach.get_sender('relay.example.com', 2525).pool.use_tls is True
+    assert OutreachSender('relay.example.com', 25).pool.use_tls is True
+
+    monkeypatch.setenv('SMTP_STARTTLS', '0')
+    assert outreach.get_sender('relay.example.com', 2526).pool.use_tls is False
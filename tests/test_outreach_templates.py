@@ -0,0 +1,45 @@
+import os
+import sys
+import json
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from outreach_templates import get_templates
+from app import app as flask_app
+
+
+LEAD = {'name': 'Emily Rodriguez', 'company': 'Lumière <Lifestyle>', 'industry': 'lifestyle', 'email': 'emily@lumiere.com'}
+
+
+def test_render_channels():
+    templates = get_templates()
+    email = templates.render(LEAD, 'email')
+    assert email['subject'] == "Elevate Lumière <Lifestyle>'s Brand Strategy"
+    assert email['body'].startswith('Hi Emily,\n\nI came across Lumière <Lifestyle>')
+
+    assert 'lifestyle' in templates.render(LEAD, 'linkedin')['message']
+    assert templates.render({'username': '@studio'}, 'instagram')['message'].startswith('Love what you\'re building with @studio!')
+    assert templates.render(LEAD, 'fax') == {'message': "Hi Emily, let's connect!"}
+
+
+def test_build_emails_skips_leads_without_address():
+    messages = get_templates().build_emails([LEAD, {'name': 'No Email'}], 'team@collide.test')
+    assert len(messages) == 1
+    msg = messages[0]
+    assert msg['To'] == 'emily@lumiere.com'
+    plain, html = msg.get_payload()
+    assert '&lt;Lifestyle&gt;' in html.get_payload(decode=True).decode()
+    assert '<br>' in html.get_payload(decode=True).decode()
+
+
+def test_preview_endpoint():
+    flask_app.config['TESTING'] = True
+    with flask_app.test_client() as client:
+        r = client.post('/api/lead-gen/outreach/preview',
+                        data=json.dumps({'leads': [LEAD, {'name': 'Sam Lee'}], 'channel': 'email'}),
+                        content_type='application/json')
+        assert r.status_code == 200
+        previews = r.get_json()['previews']
+        assert len(previews) == 2
+        assert previews[1]['body'].startswith('Hi Sam,')
+        assert '<br>' in previews[0]['html']
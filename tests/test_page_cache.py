@@ -0,0 +1,75 @@
+import os
+import sys
+import gzip
+import importlib.util
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+import app as app_module
+import assets
+import page_cache
+
+spec = importlib.util.spec_from_file_location('build_assets', os.path.join(ROOT, 'scripts', 'build_assets.py'))
+build_assets = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(build_assets)
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(assets, 'BUILD_DIR', str(tmp_path))
+    assets.reload()
+    page_cache.clear()
+    with app_module.app.test_client() as c:
+        yield c
+    assets.reload()
+    page_cache.clear()
+
+
+def test_pages_are_rendered_once_and_revalidated(client, monkeypatch):
+    first = client.get('/lead-gen')
+    assert first.status_code == 200
+    assert first.headers['Cache-Control'] == page_cache.CACHE_CONTROL
+    etag = first.headers['ETag']
+
+    def no_render(*args, **kwargs):
+        raise AssertionError('page should come from the cache')
+    monkeypatch.setattr(page_cache, 'render_template', no_render)
+
+    assert client.get('/lead-gen').get_data() == first.get_data()
+    revalidated = client.get('/lead-gen', headers={'If-None-Match': etag})
+    assert revalidated.status_code == 304
+    assert revalidated.get_data() == b''
+
+
+def test_pages_are_gzipped_when_accepted(client):
+    plain = client.get('/')
+    compressed = client.get('/', headers={'Accept-Encoding': 'gzip, deflate'})
+
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in compressed.headers['Vary']
+    assert gzip.decompress(compressed.get_data()) == plain.get_data()
+    assert compressed.headers['ETag'] != plain.headers['ETag']
+    assert client.get('/', headers={'Accept-Encoding': 'gzip',
+                                    'If-None-Match': compressed.headers['ETag']}).status_code == 304
+
+
+def test_fingerprinted_static_files_are_immutable_and_precompressed(client, tmp_path):
+    build_assets.build(os.path.join(ROOT, 'static'), str(tmp_path), None)
+    assets.reload()
+    hashed = assets.manifest()['style.css']
+
+    plain = client.get(f'/static/{hashed}')
+    assert plain.headers['Cache-Control'] == assets.IMMUTABLE
+    assert plain.headers['Content-Type'].startswith('text/css')
+    assert 'Content-Encoding' not in plain.headers
+
+    compressed = client.get(f'/static/{hashed}', headers={'Accept-Encoding': 'gzip'})
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert compressed.headers['Content-Type'].startswith('text/css')
+    assert gzip.decompress(compressed.get_data()) == plain.get_data()
+
+    source = client.get('/static/style.css')
+    assert 'immutable' not in source.headers.get('Cache-Control', '')
@@ -0,0 +1,159 @@
+import os
+import sys
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import quota
+from quota import AdaptiveRateLimiter, parse_rate_limit_headers
+from lead_gen_pro import LeadGeneratorPro
+
+
+class ProviderStandIn:
+    """
+    Plays a rate-limited provider for requests.request: answers with the
+    provider's rate-limit headers, a 429 (with Retry-After) when `throttle_next`
+    is set, and 429s once the monthly quota is used up.
+    """
+
+    def __init__(self, monthly_limit, body=None, used=0):
+        self.monthly_limit = monthly_limit
+        self.body = body or {}
+        self.used = used
+        self.calls = []
+        self.throttle_next = 0
+
+    def __call__(self, method, url, **kwargs):
+        self.calls.append((method, url, kwargs.get('params', {})))
+        if self.throttle_next:
+            self.throttle_next -= 1
+            return self._response(429, {}, {'Retry-After': '0'})
+        if self.used + len(self.calls) > self.monthly_limit:
+            return self._response(429, {})
+        return self._response(200, self.body(kwargs.get('params', {})) if callable(self.body) else self.body)
+
+    def _response(self, status, body, extra=None):
+        headers = {
+            'X-RateLimit-Requests-Limit': str(self.monthly_limit),
+            'X-RateLimit-Requests-Remaining': str(max(0, self.monthly_limit - self.used - len(self.calls))),
+            'X-RateLimit-Requests-Reset': '86400',
+        }
+        headers.update(extra or {})
+        return SimpleNamespace(status_code=status, headers=headers, json=lambda: body, text='')
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    monkeypatch.setattr(quota, 'DB_PATH', str(tmp_path / 'jobs.db'))
+    monkeypatch.setattr(quota, '_manager', None)
+    return quota.get_quota_manager()
+
+
+def test_parse_rate_limit_headers():
+    assert parse_rate_limit_headers({
+        'x-ratelimit-requests-limit': '500', 'X-RateLimit-Requests-Remaining': '42',
+        'X-RateLimit-Requests-Reset': '3600', 'Retry-After': '2'
+    }) == {'limit': 500, 'remaining': 42, 'reset': 3600, 'retry_after': 2}
+    assert parse_rate_limit_headers({'RateLimit-Remaining': '7'})['remaining'] == 7
+    assert parse_rate_limit_headers({}) == {'limit': None, 'remaining': None, 'reset': None, 'retry_after': None}
+
+
+def test_usage_is_counted_per_billing_window(manager):
+    october, november = datetime(2025, 10, 31, 23, 0), datetime(2025, 11, 1, 0, 5)
+    manager.record('hunter', 200, now=october)
+    manager.record('hunter', 200, now=october)
+    manager.record('hunter', 200, now=november)
+
+    assert manager.usage('hunter', now=october)['calls'] == 2
+    assert manager.usage('hunter', now=november)['calls'] == 1
+    assert manager.remaining('hunter', now=october) == 23
+
+
+def test_reported_remaining_overrides_configured_limit(manager):
+    manager.record('rapidapi_linkedin', 200, {'X-RateLimit-Requests-Limit': '100',
+                                              'X-RateLimit-Requests-Remaining': '3'})
+    assert manager.remaining('rapidapi_linkedin') == 3
+    # Calls without headers still count down the last reported figure
+    manager.record('rapidapi_linkedin', 200, {})
+    assert manager.remaining('rapidapi_linkedin') == 2
+
+
+def test_exhausted_bucket_is_trusted_only_until_its_reset(manager):
+    start = datetime(2025, 10, 6, 12, 0)
+    manager.record('apify', 200, {'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': '60'}, now=start)
+    assert manager.remaining('apify', now=start + timedelta(seconds=30)) == 0
+    assert manager.remaining('apify', now=start + timedelta(seconds=61)) is None
+
+    # Hunter's monthly limit still applies once its per-minute bucket has reset
+    just_now = datetime.now() - timedelta(seconds=5)
+    manager.record('hunter', 200, {'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': '1'}, now=just_now)
+    assert manager.acquire('hunter')
+    assert manager.remaining('hunter') == 24
+    manager.record('hunter', 200, {})
+    assert manager.usage('hunter')['reported_remaining'] is None
+    assert manager.remaining('hunter') == 23
+
+
+def test_adaptive_limiter_backs_off_and_recovers():
+    limiter = AdaptiveRateLimiter(rate=8.0)
+    limiter.slow_down()
+    limiter.slow_down()
+    assert limiter.rate == 2.0
+    for _ in range(50):
+        limiter.recover()
+    assert limiter.rate == 8.0
+    limiter.slow_down(retry_after=120)
+    assert limiter.pause_remaining() > 100
+
+
+def test_prioritize_funds_highest_value_first(manager, monkeypatch):
+    monkeypatch.setenv('QUOTA_HUNTER_LIMIT', '2')
+    leads = [{'name': n, 'qualification_score': s} for n, s in (('low', 40), ('top', 95), ('mid', 70))]
+    funded, deferred = manager.prioritize(leads, 'hunter')
+    assert [l['name'] for l in funded] == ['top', 'mid']
+    assert [l['name'] for l in deferred] == ['low']
+
+
+def test_hunter_budget_goes_to_best_leads(manager, monkeypatch):
+    hunter = ProviderStandIn(monthly_limit=3, used=2,
+                             body=lambda params: {'data': {'email': f"hi@{params['domain']}"}})
+    monkeypatch.setattr('requests.request', hunter)
+    generator = LeadGeneratorPro()
+    generator.hunter_api_key = 'test'
+
+    # Two lookups were already spent this month
+    manager.record('hunter', 200, {'X-RateLimit-Requests-Limit': '3', 'X-RateLimit-Requests-Remaining': '1'})
+
+    leads = [
+        {'name': 'Low', 'website': 'https://low.com', 'qualification_score': 55},
+        {'name': 'Top', 'website': 'https://www.top.com/about', 'qualification_score': 90},
+    ]
+    generator.find_emails_hunter(leads)
+
+    assert len(hunter.calls) == 1
+    assert hunter.calls[0][2]['domain'] == 'top.com'
+    assert leads[1]['email'] == 'hi@top.com'
+    assert leads[0].get('email') is None and leads[0]['email_deferred'] is True
+    # The stand-in's header said 0 left; further lookups are refused without calling it
+    assert generator.find_email_hunter('other.com') is None
+    assert len(hunter.calls) == 1
+
+
+def test_rapidapi_429_slows_down_and_is_recorded(manager, monkeypatch):
+    instagram = ProviderStandIn(monthly_limit=100, body={'data': {'items': []}})
+    instagram.throttle_next = 1
+    monkeypatch.setattr('requests.request', instagram)
+    generator = LeadGeneratorPro()
+    generator.rapidapi_key = 'test'
+
+    assert generator.search_instagram_rapidapi('cleanbeauty') == []
+    assert generator.search_instagram_rapidapi('cleanbeauty') == []
+
+    usage = manager.usage('rapidapi_instagram')
+    assert usage['calls'] == 2
+    assert usage['throttled'] == 1
+    assert usage['reported_remaining'] == 98
+    assert manager.limiter('rapidapi_instagram').rate < manager.quota('rapidapi_instagram')['rate']
@@ -0,0 +1,116 @@
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import jobs
+import scheduler
+from scheduler import CronError, CronSchedule
+from app import app as flask_app
+
+
+@pytest.fixture
+def db():
+    jobs.init_jobs_db()
+    scheduler.init_schedules()
+    return jobs.DB_PATH
+
+
+def test_cron_next_after():
+    assert CronSchedule('*/15 * * * *').next_after(datetime(2025, 1, 1, 10, 7)) == datetime(2025, 1, 1, 10, 15)
+    assert CronSchedule('0 9 * * *').next_after(datetime(2025, 1, 1, 9, 0)) == datetime(2025, 1, 2, 9, 0)
+    # 2025-01-04 is a Saturday; next weekday 09:30 is Monday the 6th
+    assert CronSchedule('30 9 * * 1-5').next_after(datetime(2025, 1, 4, 12, 0)) == datetime(2025, 1, 6, 9, 30)
+    assert CronSchedule('0 0 1 3,6 *').next_after(datetime(2025, 3, 2)) == datetime(2025, 6, 1)
+    assert CronSchedule('0 8 * * 7').next_after(datetime(2025, 1, 1)) == datetime(2025, 1, 5, 8, 0)
+
+
+def test_cron_weekday_ranges_ending_on_sunday_as_7():
+    assert CronSchedule('0 8 * * 1-7').weekdays == frozenset(range(7))
+    assert CronSchedule('0 8 * * 5-7').weekdays == {5, 6, 0}
+    # Saturday 2025-01-04 -> Sunday the 5th, then Friday the 10th
+    assert CronSchedule('0 8 * * 5-7').next_after(datetime(2025, 1, 4, 9, 0)) == datetime(2025, 1, 5, 8, 0)
+    assert CronSchedule('0 8 * * 5-7').next_after(datetime(2025, 1, 5, 9, 0)) == datetime(2025, 1, 10, 8, 0)
+
+
+@pytest.mark.parametrize('expression', ['* * * *', '60 * * * *', '*/0 * * * *', 'a * * * *', '0 8 * * 8', '0 8 * * 7-1'])
+def test_cron_rejects_bad_expressions(expression):
+    with pytest.raises(CronError):
+        CronSchedule(expression)
+
+
+def test_run_due_enqueues_and_reschedules_with_jitter(db):
+    scheduler.add_schedule('daily', '0 9 * * *', {'max_leads': 5}, jitter_seconds=120,
+                           now=datetime(2025, 1, 1, 8, 0))
+    schedule = scheduler.get_schedule('daily')
+    assert datetime(2025, 1, 1, 9, 0) <= datetime.fromisoformat(schedule['next_run_at']) <= datetime(2025, 1, 1, 9, 2)
+
+    assert scheduler.run_due(now=datetime(2025, 1, 1, 8, 30)) == []
+
+    outcomes = scheduler.run_due(now=datetime(2025, 1, 1, 9, 5))
+    assert [o['status'] for o in outcomes] == ['enqueued']
+
+    job = jobs.get_job(outcomes[0]['job_id'])
+    assert job['status'] == 'pending'
+    assert job['payload'] == {'max_leads': 5, 'schedule': 'daily'}
+
+    schedule = scheduler.get_schedule('daily')
+    assert schedule['last_job_id'] == outcomes[0]['job_id']
+    assert datetime.fromisoformat(schedule['next_run_at']) >= datetime(2025, 1, 2, 9, 0)
+    # Already claimed for today
+    assert scheduler.run_due(now=datetime(2025, 1, 1, 9, 6)) == []
+
+
+def test_run_due_skips_while_previous_run_is_active(db):
+    statuses = {}
+    enqueued = []
+
+    def enqueue(payload):
+        enqueued.append(payload)
+        job_id = f'job-{len(enqueued)}'
+        statuses[job_id] = 'in_progress'
+        return job_id
+
+    def get_job(job_id):
+        return {'job_id': job_id, 'status': statuses[job_id]}
+
+    scheduler.add_schedule('hourly', '0 * * * *', {}, jitter_seconds=0, now=datetime(2025, 1, 1, 8, 30))
+
+    first = scheduler.run_due(now=datetime(2025, 1, 1, 9, 0), enqueue=enqueue, get_job=get_job)
+    assert first == [{'name': 'hourly', 'status': 'enqueued', 'job_id': 'job-1'}]
+
+    second = scheduler.run_due(now=datetime(2025, 1, 1, 10, 0), enqueue=enqueue, get_job=get_job)
+    assert second == [{'name': 'hourly', 'status': 'skipped', 'job_id': 'job-1'}]
+    assert scheduler.get_schedule('hourly')['last_status'] == 'skipped'
+
+    statuses['job-1'] = 'done'
+    third = scheduler.run_due(now=datetime(2025, 1, 1, 11, 0), enqueue=enqueue, get_job=get_job)
+    assert third == [{'name': 'hourly', 'status': 'enqueued', 'job_id': 'job-2'}]
+    assert len(enqueued) == 2
+
+
+def test_disabled_schedules_never_run(db):
+    scheduler.add_schedule('off', '* * * * *', {}, jitter_seconds=0, enabled=False, now=datetime(2025, 1, 1))
+    assert scheduler.run_due(now=datetime(2025, 1, 2)) == []
+
+
+def test_schedule_endpoints(db):
+    flask_app.config['TESTING'] = True
+    with flask_app.test_client() as client:
+        bad = client.post('/api/lead-gen/schedules', json={'name': 'x', 'cron': 'every day'})
+        assert bad.status_code == 400
+
+        created = client.post('/api/lead-gen/schedules', json={
+            'name': 'weekly', 'cron': '0 9 * * 1', 'payload': {'linkedin_keywords': ['CMO']}
+        })
+        assert created.status_code == 201
+        assert created.get_json()['schedule']['payload'] == {'linkedin_keywords': ['CMO']}
+
+        listed = client.get('/api/lead-gen/schedules').get_json()['schedules']
+        assert [s['name'] for s in listed] == ['weekly']
+
+        assert client.delete('/api/lead-gen/schedules/weekly').status_code == 200
+        assert client.delete('/api/lead-gen/schedules/weekly').status_code == 404
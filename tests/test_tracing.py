@@ -0,0 +1,109 @@
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import app as app_module
+import campaign_store
+import jobs
+import quota
+import tasks
+import tracing
+from lead_gen_pro import LeadGeneratorPro
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(jobs, 'DB_PATH', str(tmp_path / 'jobs.db'))
+    monkeypatch.setattr(campaign_store, 'DB_PATH', str(tmp_path / 'campaigns.db'))
+    monkeypatch.setattr(quota, 'DB_PATH', str(tmp_path / 'jobs.db'))
+    monkeypatch.setattr(quota, '_manager', None)
+    jobs.init_jobs_db()
+    app_module.app.config['TESTING'] = True
+    with app_module.app.test_client() as c:
+        yield c
+
+
+def test_spans_nest_and_record_counts_and_errors():
+    with tracing.span('outside') as s:
+        s.set(ignored=True)
+    assert tracing.current() is None
+
+    with tracing.trace('campaign') as root:
+        with tracing.span('qualify', leads=3) as s:
+            time.sleep(0.01)
+            s.set(qualified=2)
+        with pytest.raises(ValueError):
+            with tracing.span('save'):
+                raise ValueError('disk full')
+
+    data = root.to_dict()
+    qualify, save = data['children']
+    assert qualify['attrs'] == {'leads': 3, 'qualified': 2}
+    assert qualify['duration_ms'] >= 10
+    assert save['error'] == 'ValueError: disk full'
+    assert save['start_ms'] >= qualify['duration_ms']
+    assert list(tracing.stage_totals(data)) == ['qualify', 'save']
+
+
+def test_many_children_are_folded():
+    with tracing.trace('campaign') as root:
+        for _ in range(tracing.MAX_CHILDREN + 30):
+            with tracing.span('hunter'):
+                pass
+    data = root.to_dict()
+    assert len(data['children']) == tracing.MAX_CHILDREN
+    assert data['folded']['hunter']['count'] == 30
+
+
+def test_provider_calls_are_spans(client, monkeypatch):
+    monkeypatch.setattr('requests.request', lambda method, url, **kw: SimpleNamespace(
+        status_code=200, headers={}, json=lambda: {'data': {'items': []}}))
+    generator = LeadGeneratorPro()
+    generator.rapidapi_key = 'test'
+
+    with tracing.trace('campaign') as root:
+        generator.search_instagram_rapidapi('cleanbeauty')
+
+    [call] = root.to_dict()['children']
+    assert call['name'] == 'rapidapi_instagram'
+    assert call['attrs'] == {'method': 'GET', 'status': 200}
+
+
+def test_campaign_trace_is_stored_on_the_job(client):
+    payload = {'instagram_hashtags': ['#cleanbeauty'], 'linkedin_keywords': ['founder'], 'max_leads': 20,
+               'sources': ['fixture_instagram', 'fixture_linkedin']}
+    job_id = jobs.enqueue_job(payload)
+    tasks.process_lead_campaign(payload, job_id=job_id)
+
+    job = client.get(f'/api/lead-gen/job/{job_id}').get_json()
+    trace = job['trace']
+    assert trace['name'] == 'campaign'
+    assert [stage['name'] for stage in trace['children']] == ['search', 'qualify', 'email_find', 'save']
+    search = trace['children'][0]
+    # Sources are searched concurrently; each gets its own span under the search stage
+    assert {c['name']: c['attrs']['found'] for c in search['children']} == {'fixture_instagram': 4,
+                                                                          'fixture_linkedin': 4}
+    assert search['attrs']['found'] == 8
+    assert trace['attrs']['total_found'] == 8
+    assert set(job['stages']) == {'search', 'qualify', 'email_find', 'save'}
+
+
+def test_failed_campaign_keeps_its_trace(client, monkeypatch):
+    job_id = jobs.enqueue_job({})
+
+    def broken_save(self, *args, **kwargs):
+        raise RuntimeError('store unavailable')
+    monkeypatch.setattr(campaign_store.CampaignStore, 'save_campaign', broken_save)
+
+    with pytest.raises(RuntimeError):
+        tasks.process_lead_campaign({'instagram_hashtags': ['#a'], 'sources': ['synthetic:count=5']},
+                                    job_id=job_id)
+
+    trace = jobs.get_job(job_id)['trace']
+    assert trace['error'] == 'RuntimeError: store unavailable'
+    assert trace['children'][-1]['name'] == 'save'
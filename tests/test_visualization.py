@@ -0,0 +1,73 @@
+import os
+import sys
+import json
+import xml.etree.ElementTree as ET
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import app as app_module
+import visualization
+from collide_core import SCORING_MODEL, COLLIDEAdvisor, COLLIDEConsultation
+
+DEMO = {'strategic_positioning': 75, 'visual_identity': 0, 'business_metrics': 25, 'authenticity': 100}
+
+
+@pytest.fixture
+def client():
+    visualization.clear()
+    with app_module.app.test_client() as c:
+        yield c
+    visualization.clear()
+
+
+def test_charts_are_rendered_once_per_score_set(client, monkeypatch):
+    first = client.get('/api/collide/chart.svg', query_string=DEMO)
+    assert first.status_code == 200
+    assert first.mimetype == 'image/svg+xml'
+    root = ET.fromstring(first.get_data())
+    assert root.find('{http://www.w3.org/2000/svg}title').text.startswith('Strategic Positioning 75')
+    assert len(root.findall('.//{http://www.w3.org/2000/svg}polygon')) == len(visualization.GRID) + 1
+
+    def no_render(*args, **kwargs):
+        raise AssertionError('chart should come from the cache')
+    monkeypatch.setattr(visualization, 'svg', no_render)
+
+    # Another brand with the same scores, in a different parameter order
+    again = client.get('/api/collide/chart.svg?authenticity=100.0&business_metrics=25&strategic_positioning=75')
+    assert again.get_data() == first.get_data()
+    assert again.headers['ETag'] == first.headers['ETag']
+    assert 'max-age' in again.headers['Cache-Control']
+    assert client.get('/api/collide/chart.svg', query_string=DEMO,
+                      headers={'If-None-Match': first.headers['ETag']}).status_code == 304
+
+
+def test_json_chart_is_the_plotly_figure_of_the_assessment(client):
+    assessment = COLLIDEAdvisor().assess_brand_maturity(COLLIDEConsultation()._collect_basic_info())
+    chart = visualization.render(assessment, 'json')
+    response = client.get('/api/collide/chart.json', query_string=DEMO)
+
+    figure = json.loads(response.get_data())
+    assert response.get_data() == chart.body
+    assert figure['data'][0]['r'] == [75, 0, 25, 100]
+    assert figure['data'][0]['theta'] == [pillar['label'] for pillar in SCORING_MODEL.spec]
+    assert figure['layout']['polar']['radialaxis']['range'] == [0, 100]
+
+
+def test_bad_chart_requests(client):
+    assert client.get('/api/collide/chart.png').status_code == 404
+    assert client.get('/api/collide/chart.svg?visual_identity=high').status_code == 400
+    assert client.get('/api/collide/chart.svg?visual_identity=nan').status_code == 400
+    assert visualization.scores_for({'visual_identity': 250, 'authenticity': -3, 'business_metrics': 33.333}) \
+        == (0.0, 100.0, 33.3, 0.0)
+
+
+def test_cache_is_bounded(monkeypatch):
+    visualization.clear()
+    monkeypatch.setattr(visualization, 'CACHE_SIZE', 3)
+    charts = [visualization.render({'authenticity': score}) for score in range(5)]
+    assert len(visualization._charts) == 3
+    assert visualization.render({'authenticity': 4}) is charts[4]
+    assert visualization.render({'authenticity': 0}) is not charts[0]
+    visualization.clear()
@@ -0,0 +1,134 @@
+"""
+COLLIDE AI - Campaign Tracing
+Nested spans with durations and counts around the stages of a lead campaign
+(search per source, provider calls, qualify, email find, outreach, save), so a
+slow job shows which stage dominated. The finished trace is stored on the job
+record (see jobs.set_job_trace) and returned by /api/lead-gen/job/<id>.
+
+    with tracing.trace('campaign') as root:
+        with tracing.span('qualify', leads=len(leads)) as s:
+            ...
+            s.set(qualified=n)
+    root.to_dict()
+
+span() outside a trace() is a no-op, so instrumented code costs nothing when
+nobody is tracing. The current span follows contextvars, so spans opened in
+asyncio tasks and asyncio.to_thread calls nest under the span that started them.
+"""
+
+import time
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+# Children kept per span; further ones (e.g. one Hunter lookup per lead) are
+# folded into per-name count/duration totals
+MAX_CHILDREN = 50
+
+_current: contextvars.ContextVar = contextvars.ContextVar('collide_trace_span', default=None)
+_lock = threading.Lock()
+
+
+class Span:
+    __slots__ = ('name', 'attrs', 'error', 'children', 'folded', '_origin', '_start', '_end')
+
+    def __init__(self, name: str, attrs: Dict, origin: Optional[float] = None):
+        self.name = name
+        self.attrs = dict(attrs)
+        self.error = None
+        self.children = []
+        self.folded = {}
+        self._start = time.perf_counter()
+        self._origin = self._start if origin is None else origin
+        self._end = None
+
+    def set(self, **attrs):
+        """Attach counts or other attributes to the span."""
+        self.attrs.update(attrs)
+
+    @property
+    def duration_ms(self) -> float:
+        end = self._end if self._end is not None else time.perf_counter()
+        return round((end - self._start) * 1000, 2)
+
+    def _add(self, child: 'Span'):
+        with _lock:
+            if len(self.children) < MAX_CHILDREN:
+                self.children.append(child)
+                return
+            folded = self.folded.setdefault(child.name, {'count': 0, 'duration_ms': 0.0, 'errors': 0})
+            folded['count'] += 1
+            folded['duration_ms'] = round(folded['duration_ms'] + child.duration_ms, 2)
+            folded['errors'] += 1 if child.error else 0
+
+    def to_dict(self) -> Dict:
+        data = {
+            'name': self.name,
+            'start_ms': round((self._start - self._origin) * 1000, 2),
+            'duration_ms': self.duration_ms,
+        }
+        if self.attrs:
+            data['attrs'] = self.attrs
+        if self.error:
+            data['error'] = self.error
+        if self.children:
+            data['children'] = [child.to_dict() for child in self.children]
+        if self.folded:
+            data['folded'] = self.folded
+        return data
+
+
+class _NoopSpan:
+    def set(self, **attrs):
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+@contextmanager
+def _enter(span: Span, parent: Optional[Span]):
+    token = _current.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.error = f'{type(e).__name__}: {e}'
+        raise
+    finally:
+        span._end = time.perf_counter()
+        _current.reset(token)
+        if parent is not None:
+            parent._add(span)
+
+
+@contextmanager
+def trace(name: str, **attrs):
+    """Start a new trace; spans opened inside it (in this context) nest under its root span."""
+    with _enter(Span(name, attrs), None) as root:
+        yield root
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """A child of the current span, or a no-op outside trace()."""
+    parent = _current.get()
+    if parent is None:
+        yield _NOOP
+        return
+    with _enter(Span(name, attrs, parent._origin), parent) as child:
+        yield child
+
+
+def current() -> Optional[Span]:
+    return _current.get()
+
+
+def stage_totals(trace_dict: Dict) -> Dict[str, float]:
+    """Milliseconds per top-level stage name, largest first, from a stored trace."""
+    totals = {}
+    for child in trace_dict.get('children', []):
+        totals[child['name']] = round(totals.get(child['name'], 0.0) + child['duration_ms'], 2)
+    for name, folded in trace_dict.get('folded', {}).items():
+        totals[name] = round(totals.get(name, 0.0) + folded['duration_ms'], 2)
+    return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
@@ -0,0 +1,160 @@
+"""
+COLLIDE AI - Assessment Charts
+Radar charts of brand assessments, rendered on the server.
+
+A chart depends only on the pillar labels and scores, so each one is rendered
+once per process and kept as bytes in an LRU cache keyed by a hash of the
+scores; the same hash is the chart's ETag. Two formats:
+
+- 'svg'  a static image, drawn here without Plotly (for <img> tags and exports);
+- 'json' the Plotly figure spec that COLLIDEAdvisor.visualize_brand_assessment
+         shows, for Plotly.js or st.plotly_chart on the client.
+
+Scores are clamped to 0-100 and rounded to one decimal before hashing, so a
+portfolio of brands shares a few hundred charts at most.
+
+    GET /api/collide/chart.svg?strategic_positioning=75&visual_identity=0&...
+"""
+
+import os
+import html
+import math
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Sequence, Tuple
+
+import json_backend
+
+FORMATS = {'svg': 'image/svg+xml', 'json': 'application/json'}
+
+# Rendered charts kept per process
+CACHE_SIZE = int(os.getenv('CHART_CACHE_SIZE', '4096'))
+
+# Radial grid lines, as scores
+GRID = (20, 40, 60, 80, 100)
+
+# SVG canvas: labels sit outside the radius, so the width leaves room for them
+WIDTH, HEIGHT, RADIUS = 480, 360, 120
+FILL, LINE = 'rgba(99,110,250,0.5)', '#636efa'
+
+
+class Chart:
+    """A rendered chart: body bytes, mimetype and ETag"""
+
+    __slots__ = ('body', 'mimetype', 'etag')
+
+    def __init__(self, body: bytes, mimetype: str, etag: str):
+        self.body = body
+        self.mimetype = mimetype
+        self.etag = etag
+
+
+_charts: 'OrderedDict[Tuple[str, str], Chart]' = OrderedDict()
+_lock = threading.Lock()
+
+
+def _model(model):
+    if model is None:
+        from collide_core import SCORING_MODEL
+        return SCORING_MODEL
+    return model
+
+
+def scores_for(assessment: Dict, model=None) -> Tuple[float, ...]:
+    """Pillar scores of an assessment in pillar order, clamped to 0-100 and rounded to one decimal"""
+    scores = []
+    for key in _model(model).pillars:
+        score = float(assessment.get(key, 0))
+        if math.isnan(score):
+            raise ValueError(f'{key} is not a number')
+        scores.append(round(min(max(score, 0.0), 100.0), 1))
+    return tuple(scores)
+
+
+def chart_key(labels: Sequence[str], scores: Iterable[float]) -> str:
+    """Hash of the labels and scores a chart is drawn from"""
+    text = '\x1f'.join(labels) + '\x1e' + ','.join(f'{score:g}' for score in scores)
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:32]
+
+
+def figure(labels: Sequence[str], scores: Sequence[float]) -> Dict:
+    """Plotly figure spec (data + layout) of the radar chart, as plain dicts"""
+    return {
+        'data': [{'type': 'scatterpolar', 'r': list(scores), 'theta': list(labels), 'fill': 'toself',
+                  'name': 'Current'}],
+        'layout': {'polar': {'radialaxis': {'visible': True, 'range': [0, 100]}}, 'showlegend': False},
+    }
+
+
+def _point(index: int, count: int, radius: float) -> Tuple[float, float]:
+    # The first pillar points straight up and the rest follow clockwise
+    angle = 2 * math.pi * index / count - math.pi / 2
+    return WIDTH / 2 + radius * math.cos(angle), HEIGHT / 2 + radius * math.sin(angle)
+
+
+def _polygon(points) -> str:
+    return ' '.join(f'{x:.1f},{y:.1f}' for x, y in points)
+
+
+def svg(labels: Sequence[str], scores: Sequence[float]) -> str:
+    """The radar chart as a standalone SVG document"""
+    count = len(labels)
+    title = html.escape(', '.join(f'{label} {score:g}' for label, score in zip(labels, scores)))
+    parts = [f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {WIDTH} {HEIGHT}" '
+             f'width="{WIDTH}" height="{HEIGHT}" role="img" font-family="sans-serif" font-size="12">',
+             f'<title>{title}</title>',
+             '<g fill="none" stroke="#d0d4dc" stroke-width="1">']
+    for level in GRID:
+        parts.append(f'<polygon points="{_polygon(_point(i, count, RADIUS * level / 100) for i in range(count))}"/>')
+    for i in range(count):
+        x, y = _point(i, count, RADIUS)
+        parts.append(f'<line x1="{WIDTH / 2:.1f}" y1="{HEIGHT / 2:.1f}" x2="{x:.1f}" y2="{y:.1f}"/>')
+    parts.append('</g>')
+
+    values = _polygon(_point(i, count, RADIUS * score / 100) for i, score in enumerate(scores))
+    parts.append(f'<polygon points="{values}" fill="{FILL}" stroke="{LINE}" stroke-width="2"/>')
+
+    parts.append('<g fill="#444">')
+    for level in GRID:
+        parts.append(f'<text x="{WIDTH / 2 + 3:.1f}" y="{HEIGHT / 2 - RADIUS * level / 100 - 2:.1f}" '
+                     f'font-size="9" fill="#999">{level}</text>')
+    for i, label in enumerate(labels):
+        x, y = _point(i, count, RADIUS + 14)
+        anchor = 'middle' if abs(x - WIDTH / 2) < 1 else ('start' if x > WIDTH / 2 else 'end')
+        parts.append(f'<text x="{x:.1f}" y="{y + 4:.1f}" text-anchor="{anchor}">{html.escape(label)}</text>')
+    parts.append('</g></svg>')
+    return ''.join(parts)
+
+
+def render(assessment: Dict, fmt: str = 'svg', model=None) -> Chart:
+    """The chart of an assessment's pillar scores, from the cache when it has been rendered before"""
+    if fmt not in FORMATS:
+        raise ValueError(f'unknown chart format {fmt!r}; expected one of {", ".join(FORMATS)}')
+    model = _model(model)
+    labels = [pillar['label'] for pillar in model.spec]
+    scores = scores_for(assessment, model)
+    key = chart_key(labels, scores)
+
+    with _lock:
+        chart = _charts.get((fmt, key))
+        if chart is not None:
+            _charts.move_to_end((fmt, key))
+            return chart
+
+    if fmt == 'svg':
+        body = svg(labels, scores).encode('utf-8')
+    else:
+        body = json_backend.dumpb(figure(labels, scores))
+    chart = Chart(body, FORMATS[fmt], key)
+    with _lock:
+        _charts[(fmt, key)] = chart
+        while len(_charts) > CACHE_SIZE:
+            _charts.popitem(last=False)
+    return chart
+
+
+def clear():
+    """Drop rendered charts (after a style change, or in tests)"""
+    with _lock:
+        _charts.clear()